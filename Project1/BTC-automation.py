@@ -1,5 +1,24 @@
-import requests
 import json
+import os
+import sys
+
+from upbit_backfill import backfill
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from http_cache import HttpCache
+from transport import default_transport
+
+# 여러 해의 과거 데이터가 필요하면 시작일(UTC)을 지정하세요 (예: '2019-01-01').
+# 지정하면 to 커서를 200개 단위로 옮겨가며 병렬로 받아 하나의 파일로 저장합니다.
+BACKFILL_START = None
+
+# True면 JSON 옆에 컬럼형 바이너리(.ucb)도 함께 저장합니다. (numpy 필요)
+WRITE_COLUMNAR = False
+if WRITE_COLUMNAR:
+    from candle_columnar import columnar_path, write_columnar
+
+# 응답 캐시 폴더. TTL(일봉 5분) 안에 다시 실행하면 요청하지 않고 캐시를 씁니다. None이면 캐시 없이 요청
+HTTP_CACHE_DIR = '.http_cache'
 
 # KRW-BTC 마켓에 2025년 3월 24일(UTC) 이전 일봉 100개를 요청
 url = "https://api.upbit.com/v1/candles/days"
@@ -10,7 +29,27 @@ params = {
 }  
 headers = {"accept": "application/json"}
 
-response = requests.get(url, params=params, headers=headers)
+# 요청은 공용 Transport로 (keep-alive 연결 재사용, gzip, 429/5xx 재시도)
+transport = default_transport()
+
+if BACKFILL_START:
+    candles = backfill(params['market'], BACKFILL_START, params['to'], verbose=True)  # 재시도는 토큰 버킷을 거쳐서
+    data = list(reversed(candles))  # 업비트 응답과 같은 최신순
+    to_date = params['to'].split(' ')[0]
+    filename = f"{params['market']}_{to_date}_{len(data)}.json"
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+    print(f"데이터가 {filename} 파일로 저장되었습니다.")
+    if WRITE_COLUMNAR:
+        write_columnar(columnar_path(filename), data, unit='days')
+    raise SystemExit(0)
+
+if HTTP_CACHE_DIR:
+    cache = HttpCache(HTTP_CACHE_DIR)
+    response = cache.get(transport, url, params=params, headers=headers)
+    print(cache.summary())
+else:
+    response = transport.get(url, params=params, headers=headers)
 
 # 응답 확인
 if response.status_code == 200:
@@ -27,6 +66,10 @@ if response.status_code == 200:
         json.dump(data, f, indent=4, ensure_ascii=False)
     
     print(f"데이터가 {filename} 파일로 저장되었습니다.")
+
+    if WRITE_COLUMNAR:
+        write_columnar(columnar_path(filename), data, unit='days')
+        print(f"컬럼형 바이너리도 {columnar_path(filename)} 파일로 저장되었습니다.")
 else:
     print(f"API 요청 실패: {response.status_code}")
     print(response.text)
\ No newline at end of file
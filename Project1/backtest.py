@@ -0,0 +1,274 @@
+# backtest.py
+# 캔들 시계열에 대한 벡터화 파라미터 스윕 백테스터
+# - 전략: 이동평균 교차(ma_cross), 돌파(breakout), RSI 역추세(rsi_reversion)
+# - 파라미터 조합 묶음(chunk)마다 포지션/손익을 2차원 numpy 배열 연산으로 한 번에 계산
+# - 조합 묶음을 프로세스 풀에 나눠 주고, 가격 배열은 복사 대신 공유 메모리로 공유
+# - 코어 수에 따른 처리 시간 비교 벤치마크 포함
+
+import argparse
+import itertools
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from indicators import arrays_from_candles, rsi, sma
+
+FIELDS = ("close", "high", "low")
+CELLS_PER_CHUNK = 4_000_000   # 조합 묶음 하나가 만드는 (조합 수 × 캔들 수) 상한
+DEFAULT_COST = 0.0005         # 편도 수수료 (업비트 원화 마켓 0.05%)
+METRICS = ("total_return", "sharpe", "max_drawdown", "trades")
+
+STRATEGIES = {
+    # 이름: (파라미터 이름, 유효 조건)
+    "ma_cross": (("fast", "slow"), lambda p: p[0] < p[1]),
+    "breakout": (("entry", "exit"), lambda p: True),
+    "rsi_reversion": (("period", "lower", "upper"), lambda p: p[1] < p[2]),
+}
+
+DEFAULT_GRIDS = {
+    "ma_cross": {"fast": range(2, 102), "slow": range(10, 210, 2)},
+    "breakout": {"entry": range(5, 105), "exit": range(2, 102)},
+    "rsi_reversion": {"period": range(2, 42), "lower": range(10, 50, 2), "upper": range(50, 90, 2)},
+}
+
+# 워커 프로세스 전역 상태 (공유 메모리 뷰와 지표 캐시)
+_DATA = {}
+_CACHE = {}
+
+
+# -----------------------------
+# 공유 메모리
+# -----------------------------
+def share_arrays(arrays):
+    """close/high/low를 공유 메모리 블록 하나에 복사합니다. (호출 측에서 close/unlink)"""
+    stacked = np.stack([np.asarray(arrays[f], dtype=np.float64) for f in FIELDS])
+    shm = shared_memory.SharedMemory(create=True, size=stacked.nbytes)
+    np.ndarray(stacked.shape, dtype=np.float64, buffer=shm.buf)[:] = stacked
+    return shm, stacked.shape
+
+
+def _attach(name: str, shape):
+    """워커 초기화: 공유 메모리를 복사 없이 numpy 뷰로 연결."""
+    shm = shared_memory.SharedMemory(name=name)
+    block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    _DATA.clear()
+    _CACHE.clear()
+    _DATA["_shm"] = shm  # 뷰가 살아 있는 동안 핸들 유지
+    _DATA.update({field: block[i] for i, field in enumerate(FIELDS)})
+
+
+def _use_local(arrays):
+    _DATA.clear()
+    _CACHE.clear()
+    _DATA.update({field: np.asarray(arrays[field], dtype=np.float64) for field in FIELDS})
+
+
+# -----------------------------
+# 지표 캐시 (워커마다 한 번만 계산)
+# -----------------------------
+def _cached(kind: str, n: int):
+    key = (kind, n)
+    if key not in _CACHE:
+        close = _DATA["close"]
+        if kind == "sma":
+            _CACHE[key] = sma(close, (n,))[n]
+        elif kind == "rsi":
+            _CACHE[key] = rsi(close, (n,))[n]
+        elif kind in ("high", "low"):
+            # 직전 n개 캔들의 최고가/최저가 (현재 캔들 제외)
+            values = np.full(len(close), np.nan)
+            if n < len(close):
+                view = sliding_window_view(_DATA[kind], n)[:-1]
+                values[n:] = view.max(axis=1) if kind == "high" else view.min(axis=1)
+            _CACHE[key] = values
+    return _CACHE[key]
+
+
+def _stack(kind: str, windows):
+    return np.stack([_cached(kind, int(w)) for w in windows])
+
+
+def _hold(enter, leave):
+    """
+    진입/청산 신호로 포지션(0/1)을 만듭니다.
+    마지막 신호를 앞으로 채우는(forward fill) 방식이라 행 단위 루프가 없습니다.
+    """
+    signal = np.where(enter, 1, np.where(leave, 0, -1)).astype(np.int8)
+    signal[:, 0] = np.where(signal[:, 0] == -1, 0, signal[:, 0])
+    idx = np.where(signal != -1, np.arange(signal.shape[1]), 0)
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    return np.take_along_axis(signal, idx, axis=1)
+
+
+# -----------------------------
+# 전략별 포지션
+# -----------------------------
+def positions(strategy: str, params):
+    """params(조합 수 × 파라미터 수)에 대한 포지션 행렬(조합 수 × 캔들 수, 0/1)."""
+    close = _DATA["close"]
+    if strategy == "ma_cross":
+        with np.errstate(invalid="ignore"):
+            return (_stack("sma", params[:, 0]) > _stack("sma", params[:, 1])).astype(np.int8)
+    if strategy == "breakout":
+        with np.errstate(invalid="ignore"):
+            enter = close > _stack("high", params[:, 0])
+            leave = close < _stack("low", params[:, 1])
+        return _hold(enter, leave)
+    if strategy == "rsi_reversion":
+        values = _stack("rsi", params[:, 0])
+        with np.errstate(invalid="ignore"):
+            enter = values < params[:, 1:2]
+            leave = values > params[:, 2:3]
+        return _hold(enter, leave)
+    raise ValueError(f"알 수 없는 전략입니다: {strategy}")
+
+
+def evaluate(pos, cost: float, periods_per_year: float):
+    """
+    포지션 행렬의 성과 지표를 계산합니다.
+
+    Returns:
+        ndarray: (조합 수 × 4) total_return, sharpe, max_drawdown, trades
+    """
+    close = _DATA["close"]
+    log_ret = np.diff(np.log(close))
+    turnover = np.abs(np.diff(pos, axis=1))
+    strat = pos[:, :-1] * log_ret - cost * turnover
+    equity = np.cumsum(strat, axis=1)
+
+    out = np.empty((pos.shape[0], len(METRICS)))
+    out[:, 0] = np.expm1(equity[:, -1])
+    std = strat.std(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[:, 1] = np.where(std > 0, strat.mean(axis=1) / std * math.sqrt(periods_per_year), 0.0)
+    peak = np.maximum.accumulate(np.maximum(equity, 0), axis=1)
+    out[:, 2] = -np.expm1(-(peak - equity).max(axis=1))
+    out[:, 3] = (np.diff(pos, axis=1) > 0).sum(axis=1)
+    return out
+
+
+def _run_chunk(strategy: str, params, cost: float, periods_per_year: float):
+    return evaluate(positions(strategy, params), cost, periods_per_year)
+
+
+# -----------------------------
+# 스윕
+# -----------------------------
+def build_grid(strategy: str, grid=None):
+    """파라미터 딕셔너리의 모든 조합 중 유효한 것만 (조합 수 × 파라미터 수) 배열로."""
+    names, valid = STRATEGIES[strategy]
+    grid = grid or DEFAULT_GRIDS[strategy]
+    combos = [p for p in itertools.product(*(grid[n] for n in names)) if valid(p)]
+    return np.array(combos, dtype=np.int64).reshape(-1, len(names))
+
+
+def sweep(arrays, strategy: str, grid=None, workers: int | None = None,
+          cost: float = DEFAULT_COST, periods_per_year: float = 365):
+    """
+    파라미터 그리드 전체를 백테스트합니다.
+
+    Args:
+        arrays (dict): close/high/low numpy 배열 (indicators.arrays_from_candles 결과)
+        strategy (str): 'ma_cross' | 'breakout' | 'rsi_reversion'
+        grid (dict, optional): 파라미터 이름 → 값 목록. 생략하면 DEFAULT_GRIDS
+        workers (int, optional): 프로세스 수. 1이면 현재 프로세스에서 실행
+        cost (float): 편도 수수료
+        periods_per_year (float): 샤프 연율화 계수 (일봉 365, 시간봉 8760)
+
+    Returns:
+        dict: params(조합 배열), param_names, 그리고 METRICS별 배열
+    """
+    params = build_grid(strategy, grid)
+    workers = workers or os.cpu_count() or 1
+    n_candles = len(arrays["close"])
+    rows = max(1, min(CELLS_PER_CHUNK // n_candles, math.ceil(len(params) / (workers * 4))))
+    chunks = [params[i:i + rows] for i in range(0, len(params), rows)]
+
+    if workers == 1:
+        _use_local(arrays)
+        parts = [_run_chunk(strategy, c, cost, periods_per_year) for c in chunks]
+    else:
+        shm, shape = share_arrays(arrays)
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(shm.name, shape)) as pool:
+                parts = list(pool.map(_run_chunk, itertools.repeat(strategy), chunks,
+                                      itertools.repeat(cost), itertools.repeat(periods_per_year)))
+        finally:
+            shm.close()
+            shm.unlink()
+
+    metrics = np.concatenate(parts) if parts else np.empty((0, len(METRICS)))
+    result = {"params": params, "param_names": STRATEGIES[strategy][0]}
+    result.update({name: metrics[:, i] for i, name in enumerate(METRICS)})
+    return result
+
+
+def top(result, k: int = 10, by: str = "sharpe"):
+    """성과 상위 k개 조합을 dict 목록으로."""
+    order = np.argsort(result[by])[::-1][:k]
+    return [
+        {**dict(zip(result["param_names"], result["params"][i].tolist())),
+         **{m: float(result[m][i]) for m in METRICS}}
+        for i in order
+    ]
+
+
+def benchmark(arrays, strategy: str, grid=None, worker_counts=None, periods_per_year: float = 365):
+    """프로세스 수별 스윕 시간을 재서 (workers, 초, 배속) 목록으로 돌려줍니다."""
+    cores = os.cpu_count() or 1
+    worker_counts = worker_counts or sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1)))
+    rows = []
+    for workers in worker_counts:
+        t0 = time.perf_counter()
+        sweep(arrays, strategy, grid, workers=workers, periods_per_year=periods_per_year)
+        elapsed = time.perf_counter() - t0
+        rows.append((workers, elapsed, rows[0][1] / elapsed if rows else 1.0))
+    return rows
+
+
+def synthetic_arrays(n: int, seed: int = 0):
+    """벤치마크용 가상 가격 (기하 랜덤 워크)."""
+    rng = np.random.default_rng(seed)
+    close = 1e8 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    spread = np.abs(rng.normal(0, 0.01, n))
+    return {"close": close, "high": close * (1 + spread), "low": close * (1 - spread)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="캔들 파라미터 스윕 백테스트")
+    parser.add_argument("strategy", choices=sorted(STRATEGIES))
+    parser.add_argument("--json", default=None, help="캔들 JSON 파일 (생략하면 --synthetic)")
+    parser.add_argument("--synthetic", type=int, default=20000, help="가상 캔들 수")
+    parser.add_argument("--periods-per-year", type=float, default=365)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--bench", action="store_true", help="프로세스 수별 처리 시간 비교")
+    args = parser.parse_args()
+
+    if args.json:
+        with open(args.json, "r", encoding="utf-8") as f:
+            arrays = arrays_from_candles(json.load(f))
+    else:
+        arrays = synthetic_arrays(args.synthetic)
+    n_combos = len(build_grid(args.strategy))
+    print(f"{args.strategy}: 조합 {n_combos:,}개 × 캔들 {len(arrays['close']):,}개")
+
+    if args.bench:
+        for workers, elapsed, speedup in benchmark(arrays, args.strategy, periods_per_year=args.periods_per_year):
+            print(f"  프로세스 {workers:>2}개: {elapsed:6.2f}초 ({speedup:.1f}배, {n_combos / elapsed:,.0f} 조합/초)")
+        return
+
+    t0 = time.perf_counter()
+    result = sweep(arrays, args.strategy, workers=args.workers, periods_per_year=args.periods_per_year)
+    print(f"완료: {time.perf_counter() - t0:.2f}초")
+    for row in top(result, 10):
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
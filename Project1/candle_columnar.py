@@ -0,0 +1,251 @@
+# candle_columnar.py
+# 캔들 데이터를 위한 컬럼형 바이너리 포맷 (.ucb)
+# - 작은 고정 크기 헤더 + 고정 폭 float64/int64 컬럼 배열
+# - 시간순 정렬이라 메모리 매핑 후 searchsorted로 날짜 구간만 잘라 읽을 수 있음
+# - JSON(indent=4)과 크기/쓰기/읽기 시간을 비교하는 벤치마크 포함
+
+import argparse
+import json
+import os
+import struct
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+MAGIC = b"UPBC"
+VERSION = 1
+# magic, version, 예약, 행 수, 마켓(16바이트), 단위(16바이트)
+HEADER_STRUCT = struct.Struct("<4sHHQ16s16s")
+HEADER_SIZE = 64  # 컬럼 시작 위치를 8바이트 정렬로 맞추기 위해 여유를 둠
+
+# (컬럼 이름, dtype). time은 candle_date_time_utc의 epoch 초
+COLUMNS = [
+    ("time", "<i8"),
+    ("opening_price", "<f8"),
+    ("high_price", "<f8"),
+    ("low_price", "<f8"),
+    ("trade_price", "<f8"),
+    ("candle_acc_trade_volume", "<f8"),
+    ("candle_acc_trade_price", "<f8"),
+    ("timestamp", "<i8"),
+]
+
+KST = timedelta(hours=9)
+
+
+def _to_epoch(utc_text: str) -> int:
+    return int(datetime.strptime(utc_text, "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc).timestamp())
+
+
+def _epoch_arg(value) -> int:
+    """날짜 문자열/datetime/epoch 초를 epoch 초로 변환."""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, datetime):
+        dt = value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+        return int(dt.timestamp())
+    text = str(value).replace(" ", "T")
+    if len(text) == 10:
+        text += "T00:00:00"
+    return _to_epoch(text[:19])
+
+
+def write_columnar(path: str, candles, market: str | None = None, unit: str = "days") -> int:
+    """
+    업비트 캔들 목록을 컬럼형 바이너리 파일로 저장합니다.
+
+    Args:
+        path (str): 저장할 파일 경로 (보통 .ucb)
+        candles (list): 업비트 캔들 목록 (순서 무관, 시간순으로 정렬해서 저장)
+        market (str, optional): 마켓 코드. 생략하면 첫 캔들의 market
+        unit (str): 캔들 단위
+
+    Returns:
+        int: 저장한 행 수
+    """
+    rows = sorted(candles, key=lambda c: c["candle_date_time_utc"])
+    market = market or (rows[0]["market"] if rows else "")
+    n = len(rows)
+
+    header = HEADER_STRUCT.pack(MAGIC, VERSION, 0, n, market.encode("ascii"), unit.encode("ascii"))
+    with open(path, "wb") as f:
+        f.write(header.ljust(HEADER_SIZE, b"\0"))
+        for name, dtype in COLUMNS:
+            if name == "time":
+                col = np.array([c["candle_date_time_utc"] for c in rows], dtype="datetime64[s]").astype(dtype)
+            else:
+                col = np.fromiter((c[name] for c in rows), dtype=dtype, count=n)
+            col.tofile(f)
+    return n
+
+
+class ColumnarCandles:
+    """
+    .ucb 파일을 메모리 매핑해서 읽습니다. 컬럼은 복사 없이 numpy 뷰로 제공됩니다.
+
+    사용 예:
+        cc = ColumnarCandles("KRW-BTC_2025-09-24_100.ucb")
+        cols = cc.slice("2025-07-01", "2025-08-01")
+        cols["trade_price"].mean()
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            magic, version, _, n, market, unit = HEADER_STRUCT.unpack(f.read(HEADER_STRUCT.size))
+        if magic != MAGIC:
+            raise ValueError(f"컬럼형 캔들 파일이 아닙니다: {path}")
+        if version != VERSION:
+            raise ValueError(f"지원하지 않는 버전입니다: {version}")
+        self.path = path
+        self.market = market.rstrip(b"\0").decode("ascii")
+        self.unit = unit.rstrip(b"\0").decode("ascii")
+        self.n = n
+        self.columns = {}
+        offset = HEADER_SIZE
+        for name, dtype in COLUMNS:
+            if n:
+                self.columns[name] = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(n,))
+            else:
+                self.columns[name] = np.empty(0, dtype=dtype)
+            offset += n * np.dtype(dtype).itemsize
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, name: str):
+        return self.columns[name]
+
+    def index_range(self, start=None, end=None):
+        """[start, end) 구간에 해당하는 행 번호 범위 (이진 탐색)."""
+        times = self.columns["time"]
+        lo = 0 if start is None else int(np.searchsorted(times, _epoch_arg(start), side="left"))
+        hi = self.n if end is None else int(np.searchsorted(times, _epoch_arg(end), side="left"))
+        return lo, hi
+
+    def slice(self, start=None, end=None):
+        """[start, end) 구간의 컬럼 뷰 딕셔너리."""
+        lo, hi = self.index_range(start, end)
+        return {name: col[lo:hi] for name, col in self.columns.items()}
+
+    def to_records(self, start=None, end=None):
+        """구간을 업비트 응답과 같은 dict 목록으로 되돌립니다 (과거→최신 순)."""
+        cols = self.slice(start, end)
+        records = []
+        for i in range(len(cols["time"])):
+            utc = datetime.fromtimestamp(int(cols["time"][i]), tz=timezone.utc)
+            records.append({
+                "market": self.market,
+                "candle_date_time_utc": utc.strftime("%Y-%m-%dT%H:%M:%S"),
+                "candle_date_time_kst": (utc + KST).strftime("%Y-%m-%dT%H:%M:%S"),
+                "opening_price": float(cols["opening_price"][i]),
+                "high_price": float(cols["high_price"][i]),
+                "low_price": float(cols["low_price"][i]),
+                "trade_price": float(cols["trade_price"][i]),
+                "timestamp": int(cols["timestamp"][i]),
+                "candle_acc_trade_price": float(cols["candle_acc_trade_price"][i]),
+                "candle_acc_trade_volume": float(cols["candle_acc_trade_volume"][i]),
+            })
+        return records
+
+
+def columnar_path(json_path: str) -> str:
+    """JSON 내보내기 파일 옆에 둘 .ucb 경로."""
+    return os.path.splitext(json_path)[0] + ".ucb"
+
+
+# -----------------------------
+# 벤치마크
+# -----------------------------
+def _timeit(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def benchmark(candles, repeat: int = 5):
+    """
+    현재 JSON(indent=4) 저장 방식과 컬럼형 바이너리를 비교합니다.
+
+    Returns:
+        dict: 포맷별 크기(bytes), 쓰기/전체 읽기/구간 읽기 시간(초)
+    """
+    rows = sorted(candles, key=lambda c: c["candle_date_time_utc"])
+    mid_start = rows[len(rows) // 2]["candle_date_time_utc"]
+    mid_end = rows[min(len(rows) - 1, len(rows) // 2 + 30)]["candle_date_time_utc"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_file = os.path.join(tmp, "bench.json")
+        ucb_file = os.path.join(tmp, "bench.ucb")
+
+        def write_json():
+            with open(json_file, "w", encoding="utf-8") as f:
+                json.dump(candles, f, indent=4, ensure_ascii=False)
+
+        def load_json():
+            with open(json_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        def range_json():
+            return [c for c in load_json() if mid_start <= c["candle_date_time_utc"] < mid_end]
+
+        def load_ucb():
+            # np.asarray(memmap)은 페이지를 읽지 않으므로 복사해서 실제로 디스크 내용을 읽게 함 (JSON과 공정 비교)
+            cc = ColumnarCandles(ucb_file)
+            return {name: np.array(col) for name, col in cc.columns.items()}
+
+        def range_ucb():
+            return ColumnarCandles(ucb_file).slice(mid_start, mid_end)["trade_price"].sum()
+
+        results = {
+            "json": {"write": _timeit(write_json, repeat)},
+            "columnar": {"write": _timeit(lambda: write_columnar(ucb_file, candles), repeat)},
+        }
+        results["json"].update(size=os.path.getsize(json_file), load=_timeit(load_json, repeat),
+                               range=_timeit(range_json, repeat))
+        results["columnar"].update(size=os.path.getsize(ucb_file), load=_timeit(load_ucb, repeat),
+                                   range=_timeit(range_ucb, repeat))
+    return results
+
+
+def _synthesize(candles, n: int):
+    """벤치마크용으로 캔들을 n개까지 날짜를 바꿔가며 반복합니다."""
+    rows = sorted(candles, key=lambda c: c["candle_date_time_utc"])
+    base = datetime.strptime(rows[0]["candle_date_time_utc"], "%Y-%m-%dT%H:%M:%S")
+    out = []
+    for i in range(n):
+        c = dict(rows[i % len(rows)])
+        t = base + timedelta(days=i)
+        c["candle_date_time_utc"] = t.strftime("%Y-%m-%dT%H:%M:%S")
+        c["candle_date_time_kst"] = (t + KST).strftime("%Y-%m-%dT%H:%M:%S")
+        out.append(c)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="캔들 JSON → 컬럼형 바이너리 변환 및 벤치마크")
+    parser.add_argument("json_file", help="BTC-automation.py가 저장한 캔들 JSON")
+    parser.add_argument("--bench", type=int, default=0, help="N개로 늘려서 JSON과 비교 (0이면 변환만)")
+    args = parser.parse_args()
+
+    with open(args.json_file, "r", encoding="utf-8") as f:
+        candles = json.load(f)
+
+    out = columnar_path(args.json_file)
+    n = write_columnar(out, candles)
+    print(f"{n}행을 {out} 파일로 저장했습니다. ({os.path.getsize(args.json_file):,} → {os.path.getsize(out):,} bytes)")
+
+    if args.bench:
+        results = benchmark(_synthesize(candles, args.bench))
+        print(f"\n캔들 {args.bench:,}개 기준 (최솟값, 5회 반복)")
+        print(f"{'포맷':<10}{'크기(bytes)':>14}{'쓰기(ms)':>12}{'읽기(ms)':>12}{'구간(ms)':>12}")
+        for name, r in results.items():
+            print(f"{name:<10}{r['size']:>14,}{r['write'] * 1e3:>12.2f}{r['load'] * 1e3:>12.2f}{r['range'] * 1e3:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
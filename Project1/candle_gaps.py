@@ -0,0 +1,212 @@
+# candle_gaps.py
+# 캔들 시계열 검증 및 누락 구간 자동 복구
+# - 시계열 전체를 numpy 연산 한 번으로 검사: 누락/중복/순서 뒤바뀜
+# - 누락된 구간만 다시 요청해서 candle_store에 채워 넣음
+# - 야간 동기화 후 저장소의 모든 마켓을 빠르게 점검하는 CLI
+#
+# 참고: 분봉은 체결이 없던 시간의 캔들을 업비트가 만들지 않으므로,
+#       거래가 뜸한 마켓에서는 누락이 정상일 수 있습니다. 분봉은 복구 요청 후에도
+#       캔들이 없으면 해당 구간은 보유 구간(ranges)으로만 기록되고, 이후 검사/복구에서는 제외됩니다.
+#       일봉/주봉/월봉은 모든 시각에 캔들이 있어야 하므로 보유 구간 안의 빈 곳도 누락으로 봅니다.
+
+import argparse
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from candle_store import DEFAULT_ROOT, CandleStore
+from upbit_backfill import (
+    MAX_WORKERS, TokenBucket, fetch_page, parse_utc, plan_windows, stitch, unit_delta, upbit_transport,
+)
+
+_UTC_KEY = re.compile(r'"candle_date_time_utc":\s*"([0-9T:\-]{19})"')
+
+
+def to_epoch(keys) -> np.ndarray:
+    """candle_date_time_utc 문자열 목록 → epoch 초 int64 배열."""
+    return np.array(keys, dtype="datetime64[s]").astype(np.int64)
+
+
+def check_times(times, step_seconds: int):
+    """
+    저장된 순서 그대로의 시각 배열을 한 번에 검사합니다.
+
+    Args:
+        times (array): epoch 초 (파일/응답에 들어 있는 순서 그대로)
+        step_seconds (int): 캔들 간격(초)
+
+    Returns:
+        dict:
+            count          전체 개수
+            duplicates     중복된 시각 목록 (epoch 초)
+            out_of_order   주된 정렬 방향(오름/내림)을 거스르는 위치(index) 목록
+            missing        누락 구간 [(start, end), ...] (epoch 초, end 미포함)
+            missing_count  누락된 캔들 수
+    """
+    times = np.asarray(times, dtype=np.int64)
+    report = {"count": len(times), "duplicates": [], "out_of_order": [], "missing": [], "missing_count": 0}
+    if len(times) < 2:
+        return report
+
+    diff = np.diff(times)
+    direction = 1 if (diff > 0).sum() >= (diff < 0).sum() else -1
+    report["out_of_order"] = (np.nonzero(diff * direction < 0)[0] + 1).tolist()
+
+    ordered = np.sort(times)
+    step = np.diff(ordered)
+    report["duplicates"] = np.unique(ordered[1:][step == 0]).tolist()
+    gap = np.nonzero(step > step_seconds)[0]
+    report["missing"] = list(zip((ordered[gap] + step_seconds).tolist(), ordered[gap + 1].tolist()))
+    report["missing_count"] = int((step[gap] // step_seconds - 1).sum())
+    return report
+
+
+def check_candles(candles, unit: str = "days"):
+    """업비트 캔들 목록(응답/JSON 파일 순서 그대로)을 검사합니다."""
+    step = int(unit_delta(unit).total_seconds())
+    return check_times(to_epoch([c["candle_date_time_utc"] for c in candles]), step)
+
+
+def read_store_times(store: CandleStore, market: str, unit: str = "days"):
+    """
+    저장소 파일에서 JSON 전체를 파싱하지 않고 candle_date_time_utc만 뽑아 파일 순서 그대로 epoch 배열로.
+    (진행 중이던 캔들을 갱신한 줄, 나중에 복구로 덧붙인 과거 캔들도 그대로 → 중복/순서 오류로 보고, compact로 정리)
+    """
+    try:
+        with open(store.data_path(market, unit), "r", encoding="utf-8") as f:
+            keys = _UTC_KEY.findall(f.read())
+    except FileNotFoundError:
+        return np.empty(0, dtype=np.int64)
+    return to_epoch(keys)
+
+
+def subtract_ranges(gaps, ranges):
+    """
+    누락 구간에서 보유 구간(ranges)을 뺍니다. 보유 구간 안의 빈 곳은 이미 요청해서
+    캔들이 없음을 확인한 구간(체결 없던 분봉 등)이므로 다시 요청하지 않습니다.
+
+    Args:
+        gaps (list): [(start, end), ...] epoch 초, 시각 순
+        ranges (list): candle_store 보유 구간 [(start, end), ...] UTC 키 문자열, 합쳐진 상태
+
+    Returns:
+        list: 남은 누락 구간 [(start, end), ...] epoch 초
+    """
+    if not ranges:
+        return list(gaps)
+    starts = to_epoch([r[0] for r in ranges]).tolist()
+    ends = to_epoch([r[1] for r in ranges]).tolist()
+    left = []
+    j = 0
+    for start, end in gaps:
+        while j < len(ends) and ends[j] <= start:
+            j += 1
+        cursor, k = start, j
+        while k < len(starts) and starts[k] < end:
+            if starts[k] > cursor:
+                left.append((cursor, starts[k]))
+            cursor = max(cursor, ends[k])
+            k += 1
+        if cursor < end:
+            left.append((cursor, end))
+    return left
+
+
+def check_market(store: CandleStore, market: str, unit: str = "days"):
+    """
+    저장소의 마켓 하나를 검사합니다. 분봉이면 missing/missing_count는 보유 구간으로 확인된 빈 곳을 뺀 값이고,
+    held_count는 확인된 빈 곳의 캔들 수입니다. 빈 캔들이 없는 단위(일봉 등)는 빼지 않습니다 (held_count=0).
+    (동기화가 마지막 캔들~현재를 보유 구간으로 기록하므로, 그 안의 빈 곳이 페이지 커서 실수일 수 있음)
+    """
+    step = int(unit_delta(unit).total_seconds())
+    report = check_times(read_store_times(store, market, unit), step)
+    if not unit.startswith("minutes"):
+        report["held_count"] = 0
+        return report
+    missing = subtract_ranges(report["missing"], store.ranges(market, unit))
+    count = sum(-(-(b - a) // step) for a, b in missing)
+    report["held_count"] = report["missing_count"] - count
+    report["missing"], report["missing_count"] = missing, count
+    return report
+
+
+def check_store(store: CandleStore, unit: str = "days", markets=None):
+    """저장소의 모든(또는 지정한) 마켓을 검사합니다. {market: report}"""
+    return {m: check_market(store, m, unit) for m in (markets or store.markets())}
+
+
+def _iso(value):
+    if isinstance(value, (int, np.integer)):
+        return np.datetime64(int(value), "s").astype(str)
+    return value
+
+
+def refetch(market: str, gaps, unit: str = "days", workers: int = MAX_WORKERS, session=None):
+    """
+    누락 구간만 다시 요청합니다. 모든 구간의 페이지를 하나의 토큰 버킷/스레드 풀로 처리합니다.
+
+    Args:
+        gaps (list): [(start, end), ...] epoch 초 또는 날짜 문자열/datetime
+
+    Returns:
+        list: [((start, end), candles), ...] 구간별 결과 (start/end는 UTC datetime)
+    """
+    spans = [(parse_utc(_iso(a)), parse_utc(_iso(b))) for a, b in gaps]
+    jobs = [(i, to, count) for i, (a, b) in enumerate(spans) for to, count in plan_windows(a, b, unit)]
+    bucket = TokenBucket()
+    session = session or upbit_transport()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pages = list(pool.map(lambda j: fetch_page(session, bucket, market, unit, j[1], j[2]), jobs))
+
+    by_gap = [[] for _ in spans]
+    for (i, _, _), page in zip(jobs, pages):
+        by_gap[i].append(page)
+    return [(span, stitch(p, span[0], span[1])) for span, p in zip(spans, by_gap)]
+
+
+def repair(store: CandleStore, market: str, unit: str = "days", session=None):
+    """
+    저장소의 누락 구간(보유 구간으로 확인된 빈 곳 제외)을 찾아 다시 받아 채웁니다.
+
+    Returns:
+        int: 채워 넣은 줄 수
+    """
+    report = check_market(store, market, unit)
+    if not report["missing"]:
+        return 0
+    added = 0
+    for span, candles in refetch(market, report["missing"], unit, session=session):
+        added += store.append(market, candles, unit, covered=span)
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="캔들 저장소 누락/중복/순서 검사 및 복구")
+    parser.add_argument("markets", nargs="*", help="생략하면 저장소의 모든 마켓")
+    parser.add_argument("--unit", default="days")
+    parser.add_argument("--root", default=DEFAULT_ROOT)
+    parser.add_argument("--repair", action="store_true", help="누락 구간을 다시 받아 채움")
+    parser.add_argument("--compact", action="store_true", help="중복/순서 오류가 있는 파일을 정리해서 다시 씀")
+    args = parser.parse_args()
+
+    store = CandleStore(args.root)
+    t0 = time.perf_counter()
+    reports = check_store(store, args.unit, args.markets or None)
+    print(f"마켓 {len(reports)}개 검사: {(time.perf_counter() - t0) * 1000:.1f}ms")
+
+    for market, report in reports.items():
+        if not (report["missing"] or report["duplicates"] or report["out_of_order"] or report["held_count"]):
+            continue
+        print(f"{market}: 캔들 {report['count']}개, 누락 {report['missing_count']}개 "
+              f"({len(report['missing'])}구간, 확인된 빈 곳 {report['held_count']}개 제외), "
+              f"중복 {len(report['duplicates'])}개, 순서 오류 {len(report['out_of_order'])}개")
+        if args.repair and report["missing"]:
+            print(f"  → {repair(store, market, args.unit)}줄 복구")
+        if args.compact and (report["duplicates"] or report["out_of_order"] or args.repair):
+            print(f"  → 정리 후 {store.compact(market, args.unit)}줄")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+# candle_repository.py
+# 저장된 캔들에 대한 조회 API
+# - BTC-automation.py/upbit_backfill.py가 만든 {market}_*.json 파일과 candle_store를 합쳐서 읽음
+#   (파일 이름의 단위로 구분: {market}_{YYYY-MM-DD}_{count}.json은 일봉, {market}_{unit}_{first}_{last}.json은 unit)
+# - 시간순 timestamp 인덱스 + 이진 탐색으로 구간 조회 O(log n)
+# - 최근에 쓴 시계열은 LRU 캐시에 보관하고, 원본 파일이 바뀌면 다시 읽음
+
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from candle_store import CandleStore
+from upbit_backfill import parse_utc
+
+CACHE_SIZE = 32        # 메모리에 둘 시계열 수
+CHECK_INTERVAL = 1.0   # 원본 파일 변경 여부를 다시 확인하는 간격(초)
+# 내보내기 파일 이름에 쓰는 캔들 단위 ('/'를 뺀 형태, unit_delta가 아는 단위만)
+EXPORT_UNITS = {"days", "weeks"} | {f"minutes{m}" for m in (1, 3, 5, 10, 15, 30, 60, 240)}
+
+
+class _Series:
+    __slots__ = ("candles", "times", "signature", "checked_at")
+
+    def __init__(self, candles, signature):
+        self.candles = candles
+        self.times = [int(parse_utc(c["candle_date_time_utc"]).timestamp()) for c in candles]
+        self.signature = signature
+        self.checked_at = time.monotonic()
+
+
+def _epoch(value) -> int:
+    if isinstance(value, (int, float)):
+        return int(value)
+    return int(parse_utc(value).timestamp())
+
+
+class CandleRepository:
+    """
+    마켓별 캔들 시계열 조회.
+
+    사용 예:
+        repo = CandleRepository("coin-chart-app/public", store=CandleStore())
+        repo.get_range("KRW-BTC", "2025-07-01", "2025-08-01")
+        repo.latest("KRW-BTC", 30)
+
+    Args:
+        json_dir (str, optional): {market}_*.json 내보내기 파일이 있는 폴더
+        store (CandleStore, optional): 로컬 캔들 저장소
+        cache_size (int): LRU 캐시에 둘 시계열 수
+    """
+
+    def __init__(self, json_dir: str | None = ".", store: CandleStore | None = None, cache_size: int = CACHE_SIZE):
+        self.json_dir = json_dir
+        self.store = store
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # ---------- 원본 ----------
+    def _json_exports(self, market: str):
+        """
+        {market}_*.json 내보내기 파일 → (단위 이름, 경로) 목록. 단위 이름은 '/'를 뺀 형태 (minutes60).
+        캔들 단위나 날짜로 시작하지 않는 파일({market}_indicators.json 등)은 건너뜁니다.
+        """
+        if not self.json_dir:
+            return []
+        exports = []
+        for path in sorted(glob.glob(os.path.join(self.json_dir, f"{market}_*.json"))):
+            label = os.path.basename(path)[len(market) + 1:-len(".json")].split("_")[0]
+            # BTC-automation.py는 {market}_{날짜}_{개수}.json으로 일봉만 저장
+            if label[:1].isdigit():
+                exports.append(("days", path))
+            elif label in EXPORT_UNITS:
+                exports.append((label, path))
+        return exports
+
+    def _json_files(self, market: str, unit: str):
+        label = unit.replace("/", "")
+        return [path for name, path in self._json_exports(market) if name == label]
+
+    def json_units(self, market: str):
+        """내보내기 파일에 있는 단위 이름 목록 ('/'를 뺀 형태)."""
+        return sorted({name for name, _ in self._json_exports(market)})
+
+    def _signature(self, market: str, unit: str):
+        paths = self._json_files(market, unit)
+        if self.store is not None:
+            paths.append(self.store.data_path(market, unit))
+        signature = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            signature.append((path, st.st_mtime_ns, st.st_size))
+        return tuple(signature)
+
+    def _load(self, market: str, unit: str, signature):
+        merged = {}
+        for path in self._json_files(market, unit):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for candle in data if isinstance(data, list) else []:
+                if candle.get("market") == market:
+                    merged[candle["candle_date_time_utc"]] = candle
+        if self.store is not None:
+            for candle in self.store.load(market, unit):
+                merged[candle["candle_date_time_utc"]] = candle
+        return _Series([merged[key] for key in sorted(merged)], signature)
+
+    # ---------- 캐시 ----------
+    def series(self, market: str, unit: str = "days"):
+        """캐시된 시계열 (과거→최신 순 캔들 목록)."""
+        return self._get(market, unit).candles
+
+    def _get(self, market: str, unit: str) -> _Series:
+        key = (market, unit)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                if time.monotonic() - cached.checked_at < CHECK_INTERVAL:
+                    self.hits += 1
+                    return cached
+
+        signature = self._signature(market, unit)
+        if cached is not None and cached.signature == signature:
+            cached.checked_at = time.monotonic()
+            with self._lock:
+                self.hits += 1
+            return cached
+
+        loaded = self._load(market, unit, signature)
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = loaded
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return loaded
+
+    def invalidate(self, market: str | None = None):
+        """캐시를 비웁니다. market을 지정하면 해당 마켓만."""
+        with self._lock:
+            for key in [k for k in self._cache if market is None or k[0] == market]:
+                del self._cache[key]
+
+    # ---------- 조회 ----------
+    def get_range(self, market: str, start=None, end=None, unit: str = "days"):
+        """
+        [start, end) 구간의 캔들 (과거→최신 순).
+
+        Args:
+            start, end: 'YYYY-MM-DD', 'YYYY-MM-DD HH:MM:SS', datetime 또는 epoch 초 (UTC)
+        """
+        series = self._get(market, unit)
+        lo = 0 if start is None else bisect.bisect_left(series.times, _epoch(start))
+        hi = len(series.times) if end is None else bisect.bisect_left(series.times, _epoch(end))
+        return series.candles[lo:hi]
+
+    def latest(self, market: str, n: int = 1, unit: str = "days"):
+        """가장 최근 캔들 n개 (과거→최신 순)."""
+        candles = self._get(market, unit).candles
+        return candles[-n:] if n > 0 else []
+
+    def at(self, market: str, when, unit: str = "days"):
+        """when 시각에 해당하는(그 이전 가장 가까운) 캔들. 없으면 None."""
+        series = self._get(market, unit)
+        i = bisect.bisect_right(series.times, _epoch(when)) - 1
+        return series.candles[i] if i >= 0 else None
@@ -0,0 +1,149 @@
+# candle_resample.py
+# 분봉 → 시간봉 → 일봉 → 주봉 스트리밍 리샘플러
+# - 제너레이터로 캔들을 하나씩 받아 상위 타임프레임 캔들을 바로 내보냄
+# - 출력 버킷 하나당 누적 상태 1개만 유지 (메모리 일정)
+# - candle_date_time_kst 기준으로 버킷 경계를 계산
+#   · anchor="utc": 업비트 일봉/주봉과 같은 경계 (KST 09:00 시작)
+#   · anchor="kst": 한국 시간 자정 경계
+# - 출력 캔들도 업비트 캔들과 같은 필드라서 다시 리샘플러에 넣어 연결할 수 있음
+
+import argparse
+import json
+import math
+from datetime import datetime, timedelta, timezone
+
+from upbit_backfill import PAGE_SIZE, TokenBucket, fetch_page, parse_utc, stitch, unit_delta, upbit_transport
+
+KST_OFFSET = timedelta(hours=9)
+EPOCH = datetime(1970, 1, 5)  # 월요일 (주봉 경계 기준)
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+def timeframe_delta(timeframe: str) -> timedelta:
+    """
+    타임프레임 문자열을 timedelta로 변환합니다.
+    예: 'minutes/15', 'hours/4', 'days', 'weeks' (업비트 캔들 단위 표기도 허용)
+    """
+    if timeframe.startswith("hours/"):
+        return timedelta(hours=int(timeframe.split("/", 1)[1]))
+    return unit_delta(timeframe)
+
+
+def bucket_start(kst_time: datetime, size: timedelta, anchor: str = "utc") -> datetime:
+    """
+    KST 시각이 속한 버킷의 시작 시각(KST)을 구합니다.
+    anchor='utc'면 UTC 기준으로 경계를 나눈 뒤 KST로 되돌립니다.
+    """
+    shift = KST_OFFSET if anchor == "utc" else timedelta(0)
+    local = kst_time - shift
+    return EPOCH + ((local - EPOCH) // size) * size + shift
+
+
+def resample(candles, timeframe: str, anchor: str = "utc"):
+    """
+    시간순(과거→최신)으로 들어오는 캔들을 상위 타임프레임으로 묶어 내보냅니다.
+
+    Args:
+        candles (iterable): 업비트 캔들 dict 제너레이터/리스트 (과거→최신 순)
+        timeframe (str): 출력 타임프레임 ('minutes/15', 'hours/1', 'days', 'weeks' 등)
+        anchor (str): 'utc'(업비트 캔들과 같은 경계) 또는 'kst'(한국 자정 경계)
+
+    Yields:
+        dict: 업비트 캔들과 같은 필드를 가진 상위 타임프레임 캔들.
+              마지막(진행 중일 수 있는) 버킷도 입력이 끝나면 내보냅니다.
+    """
+    size = timeframe_delta(timeframe)
+    current = None
+    current_start = None
+
+    for candle in candles:
+        kst_time = datetime.strptime(candle["candle_date_time_kst"], TIME_FORMAT)
+        start = bucket_start(kst_time, size, anchor)
+
+        if current is not None and start != current_start:
+            if start < current_start:
+                raise ValueError(f"캔들이 시간순이 아닙니다: {candle['candle_date_time_kst']}")
+            yield current
+            current = None
+
+        if current is None:
+            current_start = start
+            current = {
+                "market": candle["market"],
+                "candle_date_time_utc": (start - KST_OFFSET).strftime(TIME_FORMAT),
+                "candle_date_time_kst": start.strftime(TIME_FORMAT),
+                "opening_price": candle["opening_price"],
+                "high_price": candle["high_price"],
+                "low_price": candle["low_price"],
+                "trade_price": candle["trade_price"],
+                "timestamp": candle["timestamp"],
+                "candle_acc_trade_price": candle["candle_acc_trade_price"],
+                "candle_acc_trade_volume": candle["candle_acc_trade_volume"],
+                "timeframe": timeframe,
+            }
+            continue
+
+        current["high_price"] = max(current["high_price"], candle["high_price"])
+        current["low_price"] = min(current["low_price"], candle["low_price"])
+        current["trade_price"] = candle["trade_price"]
+        current["timestamp"] = candle["timestamp"]
+        current["candle_acc_trade_price"] += candle["candle_acc_trade_price"]
+        current["candle_acc_trade_volume"] += candle["candle_acc_trade_volume"]
+
+    if current is not None:
+        yield current
+
+
+def resample_chain(candles, timeframes, anchor: str = "utc"):
+    """
+    여러 단계를 제너레이터로 연결합니다. (예: ['hours/1', 'days', 'weeks'])
+    마지막 타임프레임의 캔들만 내보냅니다.
+    """
+    stream = candles
+    for timeframe in timeframes:
+        stream = resample(stream, timeframe, anchor)
+    return stream
+
+
+def iter_candles(market: str, unit: str, start, end=None, session=None):
+    """
+    [start, end) 구간의 캔들을 과거→최신 순으로 하나씩 내보냅니다.
+    페이지(200개) 단위로 받아 바로 흘려보내므로 전체를 메모리에 쌓지 않습니다.
+    """
+    start = parse_utc(start)
+    end = parse_utc(end) if end is not None else datetime.now(timezone.utc)
+    step = unit_delta(unit)
+    bucket = TokenBucket()
+    session = session or upbit_transport()
+    cursor = start
+    while cursor < end:
+        page_end = min(cursor + step * PAGE_SIZE, end)
+        page = fetch_page(session, bucket, market, unit, page_end, math.ceil((page_end - cursor) / step))
+        yield from stitch([page], cursor, page_end)
+        cursor = page_end
+
+
+def main():
+    parser = argparse.ArgumentParser(description="분봉을 받아 상위 타임프레임으로 리샘플링")
+    parser.add_argument("--market", default="KRW-BTC")
+    parser.add_argument("--unit", default="minutes/1", help="원본 캔들 단위 (예: minutes/1)")
+    parser.add_argument("--to", nargs="+", default=["hours/1"], help="출력 타임프레임 (여러 개면 순서대로 연결)")
+    parser.add_argument("--start", required=True)
+    parser.add_argument("--end", default=None)
+    parser.add_argument("--anchor", choices=["utc", "kst"], default="utc")
+    parser.add_argument("--out", default=None, help="NDJSON 출력 파일 (기본값: 표준 출력)")
+    args = parser.parse_args()
+
+    stream = resample_chain(iter_candles(args.market, args.unit, args.start, args.end), args.to, args.anchor)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            for candle in stream:
+                f.write(json.dumps(candle, ensure_ascii=False) + "\n")
+        print(f"데이터가 {args.out} 파일로 저장되었습니다.")
+    else:
+        for candle in stream:
+            print(json.dumps(candle, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
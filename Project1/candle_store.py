@@ -0,0 +1,220 @@
+# candle_store.py
+# 마켓별 로컬 캔들 저장소
+# - candle_date_time_utc를 키로 NDJSON 파일에 추가(append)만 하는 구조
+# - 메타 파일에 이미 보유한 구간(ranges)과 최신 캔들을 기록
+# - 재실행 시 가장 최근 캔들 ~ 현재 사이의 빈 구간만 요청해서 덧붙임
+
+import argparse
+import json
+import os
+from datetime import datetime, timezone
+
+from upbit_backfill import UTC_KEY_FORMAT, backfill, candle_time, parse_utc, unit_delta
+
+DEFAULT_ROOT = "candles"
+DEFAULT_START = "2017-10-01"  # 업비트 원화 마켓 오픈 무렵
+
+
+def _key(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime(UTC_KEY_FORMAT)
+
+
+def merge_ranges(ranges):
+    """[start, end) 문자열 구간 목록을 정렬하고 겹치거나 맞닿은 구간을 합칩니다."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+class CandleStore:
+    """
+    마켓/단위별 캔들을 디스크에 보관합니다.
+
+    파일 구성 (root/market/):
+        {unit}.ndjson    캔들 1개당 1줄. 같은 키가 여러 번 나오면 마지막 줄이 우선
+        {unit}.meta.json 보유 구간(ranges), 파일 줄 수(count), 가장 최근 캔들(last)
+    """
+
+    def __init__(self, root: str = DEFAULT_ROOT):
+        self.root = root
+
+    # ---------- 경로/메타 ----------
+    def _base(self, market: str, unit: str) -> str:
+        return os.path.join(self.root, market, unit.replace("/", "_"))
+
+    def data_path(self, market: str, unit: str = "days") -> str:
+        return self._base(market, unit) + ".ndjson"
+
+    def meta_path(self, market: str, unit: str = "days") -> str:
+        return self._base(market, unit) + ".meta.json"
+
+    def read_meta(self, market: str, unit: str = "days") -> dict:
+        try:
+            with open(self.meta_path(market, unit), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"market": market, "unit": unit, "ranges": [], "count": 0, "last": None}
+
+    def _write_meta(self, market: str, unit: str, meta: dict):
+        path = self.meta_path(market, unit)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def markets(self):
+        """저장소에 있는 마켓 목록."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(d for d in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, d)))
+
+    # ---------- 조회 ----------
+    def ranges(self, market: str, unit: str = "days"):
+        """보유 중인 [start, end) 구간 목록 (UTC 키 문자열)."""
+        return [tuple(r) for r in self.read_meta(market, unit)["ranges"]]
+
+    def newest(self, market: str, unit: str = "days"):
+        """가장 최근 캔들 (없으면 None)."""
+        return self.read_meta(market, unit)["last"]
+
+    def missing(self, market: str, start, end, unit: str = "days"):
+        """[start, end) 중 아직 보유하지 않은 구간 목록 (UTC datetime 튜플)."""
+        lo, hi = _key(parse_utc(start)), _key(parse_utc(end))
+        gaps = []
+        cursor = lo
+        for r_start, r_end in self.ranges(market, unit):
+            if r_end <= cursor:
+                continue
+            if r_start >= hi:
+                break
+            if r_start > cursor:
+                gaps.append((cursor, r_start))
+            cursor = max(cursor, r_end)
+        if cursor < hi:
+            gaps.append((cursor, hi))
+        return [(parse_utc(a), parse_utc(b)) for a, b in gaps]
+
+    def load(self, market: str, unit: str = "days"):
+        """저장된 캔들 전체 (키 중복 제거, 과거→최신 순)."""
+        merged = {}
+        try:
+            with open(self.data_path(market, unit), "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        candle = json.loads(line)
+                        merged[candle["candle_date_time_utc"]] = candle
+        except FileNotFoundError:
+            return []
+        return [merged[key] for key in sorted(merged)]
+
+    def read_from(self, market: str, unit: str = "days", cursor=None):
+        """
+        cursor 이후 파일 끝에 덧붙은 캔들과 다음 cursor를 돌려줍니다 (파일 순서, 중복 키 포함).
+        cursor는 (파일 inode, 바이트 위치). 처음이거나 compact로 파일이 바뀌었으면 처음부터 읽습니다.
+        """
+        try:
+            with open(self.data_path(market, unit), "rb") as f:
+                inode = os.fstat(f.fileno()).st_ino
+                offset = cursor[1] if cursor and cursor[0] == inode else 0
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return [], None
+        end = data.rfind(b"\n") + 1  # 아직 쓰는 중인 마지막 줄은 다음에 읽음
+        candles = [json.loads(line) for line in data[:end].splitlines() if line.strip()]
+        return candles, (inode, offset + end)
+
+    # ---------- 쓰기 ----------
+    def append(self, market: str, candles, unit: str = "days", covered=None) -> int:
+        """
+        캔들을 파일 끝에 덧붙이고 보유 구간을 갱신합니다.
+
+        Args:
+            market (str): 마켓 코드
+            candles (list): 추가할 캔들 (순서 무관)
+            unit (str): 캔들 단위
+            covered (tuple, optional): 이번에 요청한 [start, end) 구간.
+                생략하면 캔들의 최소/최대 시각으로 계산합니다.
+
+        Returns:
+            int: 실제로 추가된 줄 수 (최신 캔들과 내용이 같으면 건너뜀)
+        """
+        meta = self.read_meta(market, unit)
+        last = meta["last"]
+        rows = [c for c in sorted(candles, key=lambda c: c["candle_date_time_utc"]) if c != last]
+
+        if covered is None and candles:
+            times = [candle_time(c) for c in candles]
+            covered = (min(times), max(times) + unit_delta(unit))
+        if covered is not None:
+            meta["ranges"] = merge_ranges(meta["ranges"] + [[_key(covered[0]), _key(covered[1])]])
+
+        if rows:
+            os.makedirs(os.path.dirname(self.data_path(market, unit)), exist_ok=True)
+            with open(self.data_path(market, unit), "a", encoding="utf-8") as f:
+                for candle in rows:
+                    f.write(json.dumps(candle, ensure_ascii=False) + "\n")
+            newest = rows[-1]
+            if last is None or newest["candle_date_time_utc"] >= last["candle_date_time_utc"]:
+                meta["last"] = newest
+            meta["count"] += len(rows)
+
+        if rows or covered is not None:
+            os.makedirs(os.path.dirname(self.meta_path(market, unit)), exist_ok=True)
+            self._write_meta(market, unit, meta)
+        return len(rows)
+
+    def compact(self, market: str, unit: str = "days") -> int:
+        """중복 줄을 정리해 파일을 다시 씁니다. 가끔만 실행하면 됩니다."""
+        candles = self.load(market, unit)
+        path = self.data_path(market, unit)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for candle in candles:
+                f.write(json.dumps(candle, ensure_ascii=False) + "\n")
+        os.replace(tmp, path)
+        meta = self.read_meta(market, unit)
+        meta["count"] = len(candles)
+        self._write_meta(market, unit, meta)
+        return len(candles)
+
+    # ---------- 동기화 ----------
+    def sync(self, market: str, unit: str = "days", start=DEFAULT_START, session=None, bucket=None,
+             verbose: bool = False) -> int:
+        """
+        저장소의 최신 캔들 이후(진행 중인 최신 캔들 포함) ~ 현재 구간만 받아 덧붙입니다.
+        저장소가 비어 있으면 start부터 전체를 백필합니다.
+        여러 마켓을 동시에 동기화할 때는 bucket(TokenBucket)을 공유해 요청 속도를 함께 제한합니다.
+
+        Returns:
+            int: 추가된 줄 수
+        """
+        now = datetime.now(timezone.utc)
+        last = self.newest(market, unit)
+        begin = candle_time(last) if last else parse_utc(start)
+        if begin >= now:
+            return 0
+        candles = backfill(market, begin, now, unit=unit, session=session, bucket=bucket, verbose=verbose)
+        return self.append(market, candles, unit, covered=(begin, now))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 캔들 저장소 동기화 (누락 구간만 요청)")
+    parser.add_argument("markets", nargs="+", help="예: KRW-BTC KRW-ETH")
+    parser.add_argument("--unit", default="days")
+    parser.add_argument("--start", default=DEFAULT_START, help="저장소가 비어 있을 때 백필 시작일")
+    parser.add_argument("--root", default=DEFAULT_ROOT)
+    args = parser.parse_args()
+
+    store = CandleStore(args.root)
+    for market in args.markets:
+        added = store.sync(market, unit=args.unit, start=args.start, verbose=True)
+        print(f"{market}: {added}줄 추가 → {store.data_path(market, args.unit)}")
+
+
+if __name__ == "__main__":
+    main()
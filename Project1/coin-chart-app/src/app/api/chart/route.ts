@@ -15,7 +15,11 @@ export async function GET(request: Request) {
   // We append time and 'Z' for UTC.
   const upbitApiTo = `${to}T09:00:00Z`;
 
-  const url = `https://api.upbit.com/v1/candles/days?market=${market}&to=${upbitApiTo}&count=${count}`;
+  // QUOTE_API_URL이 있으면 로컬 시세 서버(common/quote_server.py)에서 읽음 (응답 모양은 업비트와 같음)
+  const base = process.env.QUOTE_API_URL
+    ? `${process.env.QUOTE_API_URL}/upbit/${market}?`
+    : `https://api.upbit.com/v1/candles/days?market=${market}&`;
+  const url = `${base}to=${upbitApiTo}&count=${count}`;
 
   try {
     const response = await fetch(url, {
@@ -1,13 +1,14 @@
 'use client';
 
 import { useState } from 'react';
-import { Candle } from '@/types';
+import { Candle, IndicatorSet } from '@/types';
 import Header from '@/components/Header';
 import ChartContainer from '@/components/ChartContainer';
 import Summary from '@/components/Summary';
 
 export default function Home() {
   const [data, setData] = useState<Candle[] | null>(null);
+  const [indicators, setIndicators] = useState<IndicatorSet | null>(null);
   const [error, setError] = useState<string | null>(null);
   const [isLoading, setIsLoading] = useState(false);
 
@@ -28,6 +29,15 @@ export default function Home() {
 
       // The data from Upbit is in reverse chronological order, so we reverse it for the charts.
       setData(jsonData.reverse());
+
+      // indicators.py로 미리 계산한 지표 파일이 public/에 있으면 함께 표시
+      // (지표 파일이 없거나 깨져 있어도 차트는 그대로 보여줌)
+      try {
+        const indicatorResponse = await fetch(`/${jsonData[0].market}_indicators.json`);
+        setIndicators(indicatorResponse.ok ? await indicatorResponse.json() : null);
+      } catch {
+        setIndicators(null);
+      }
     } catch (err) {
       if (err instanceof Error) {
         setError(err.message);
@@ -52,7 +62,7 @@ export default function Home() {
         {data ? (
           <div className='w-full flex flex-col gap-8'>
             <Summary data={data} />
-            <ChartContainer data={data} />
+            <ChartContainer data={data} indicators={indicators} />
           </div>
         ) : (
           !isLoading && !error && (
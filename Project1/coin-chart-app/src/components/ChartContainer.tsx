@@ -7,8 +7,9 @@ import type {
   Time,
   BusinessDay,
   CandlestickData,
+  LineData,
 } from 'lightweight-charts';
-import { Candle } from '@/types';
+import { Candle, IndicatorSet, IndicatorValues } from '@/types';
 import {
   ResponsiveContainer,
   AreaChart,
@@ -41,6 +42,7 @@ type RTooltipProps = {
 
 interface ChartContainerProps {
   data: Candle[];
+  indicators?: IndicatorSet | null;
 }
 
 /* ---------------------- Recharts Custom Tooltip ---------------------- */
@@ -76,8 +78,24 @@ const formatPrice = (tick: number) => {
 };
 const formatPercentage = (tick: number) => `${(tick * 100).toFixed(2)}%`;
 
+/* ------------------------ Indicator Overlays ------------------------ */
+const OVERLAY_COLORS = ['#f6c85f', '#6f4e7c', '#9dd866', '#ca472f', '#0b84a5', '#ffa056'];
+const BAND_COLOR = '#6B7280';
+
+// 미리 계산된 지표 값을 캔들 구간 안의 라인 데이터로 변환 (null 구간은 건너뜀)
+const toLineData = (time: number[], values: IndicatorValues, from: number, to: number): LineData[] => {
+  const points: LineData[] = [];
+  values.forEach((value, i) => {
+    const t = time[i];
+    if (value !== null && t >= from && t <= to) {
+      points.push({ time: t as UTCTimestamp, value });
+    }
+  });
+  return points;
+};
+
 /* ----------------------- Lightweight Candles ----------------------- */
-const CandlestickChart = ({ data }: { data: Candle[] }) => {
+const CandlestickChart = ({ data, indicators }: { data: Candle[]; indicators?: IndicatorSet | null }) => {
   const chartContainerRef = useRef<HTMLDivElement>(null);
 
   useEffect(() => {
@@ -91,10 +109,11 @@ const CandlestickChart = ({ data }: { data: Candle[] }) => {
       localization: {
         timeFormatter: (t: Time) => {
           if (typeof t === 'number') {
+            // 캔들 시각은 UTC epoch이므로 UTC 기준 날짜로 표시
             const date = new Date(t * 1000);
-            const yy = String(date.getFullYear()).slice(-2);
-            const mm = date.getMonth() + 1;
-            const dd = date.getDate();
+            const yy = String(date.getUTCFullYear()).slice(-2);
+            const mm = date.getUTCMonth() + 1;
+            const dd = date.getUTCDate();
             return `${yy}년 ${mm}월 ${dd}일`;
           }
           const { year, month, day } = t as BusinessDay;
@@ -122,7 +141,9 @@ const CandlestickChart = ({ data }: { data: Candle[] }) => {
     });
 
     const candleData: CandlestickData[] = data.map((d) => ({
-      time: Math.floor(new Date(d.candle_date_time_utc).getTime() / 1000) as UTCTimestamp,
+      // candle_date_time_utc에는 'Z'가 없어서 그대로 쓰면 브라우저 현지 시각으로 해석됨
+      // (indicators.py의 time은 UTC epoch이므로 같은 기준으로 맞춤)
+      time: Math.floor(new Date(`${d.candle_date_time_utc}Z`).getTime() / 1000) as UTCTimestamp,
       open: d.opening_price,
       high: d.high_price,
       low: d.low_price,
@@ -130,6 +151,30 @@ const CandlestickChart = ({ data }: { data: Candle[] }) => {
     }));
 
     candlestickSeries.setData(candleData);
+
+    if (indicators && candleData.length > 0) {
+      const times = candleData.map((c) => c.time as number);
+      const from = Math.min(...times);
+      const to = Math.max(...times);
+      const overlays: Array<[IndicatorValues, string]> = [
+        ...Object.values(indicators.sma ?? {}),
+        ...Object.values(indicators.ema ?? {}),
+      ].map((values, i): [IndicatorValues, string] => [values, OVERLAY_COLORS[i % OVERLAY_COLORS.length]]);
+      Object.values(indicators.bollinger ?? {}).forEach((band) => {
+        overlays.push([band.upper, BAND_COLOR], [band.lower, BAND_COLOR]);
+      });
+
+      overlays.forEach(([values, color]) => {
+        const line = chart.addLineSeries({
+          color,
+          lineWidth: 1,
+          priceLineVisible: false,
+          lastValueVisible: false,
+        });
+        line.setData(toLineData(indicators.time, values, from, to));
+      });
+    }
+
     chart.timeScale().fitContent();
 
     window.addEventListener('resize', handleResize);
@@ -137,7 +182,7 @@ const CandlestickChart = ({ data }: { data: Candle[] }) => {
       window.removeEventListener('resize', handleResize);
       chart.remove();
     };
-  }, [data]);
+  }, [data, indicators]);
 
   return (
     <div className="w-full border border-[var(--border-color)] rounded-lg bg-[var(--card-background)] p-4">
@@ -148,7 +193,7 @@ const CandlestickChart = ({ data }: { data: Candle[] }) => {
 };
 
 /* ---------------------------- Container ---------------------------- */
-export default function ChartContainer({ data }: ChartContainerProps) {
+export default function ChartContainer({ data, indicators }: ChartContainerProps) {
   const formattedData = data.map((d) => ({
     ...d,
     date: d.candle_date_time_kst.substring(5, 10), // MM-DD
@@ -156,7 +201,7 @@ export default function ChartContainer({ data }: ChartContainerProps) {
 
   return (
     <div className="w-full flex flex-col gap-8">
-      <CandlestickChart data={data} />
+      <CandlestickChart data={data} indicators={indicators} />
 
       {/* Price Chart */}
       <div className="w-full h-80 p-4 border border-[var(--border-color)] rounded-lg bg-[var(--card-background)]">
@@ -14,3 +14,19 @@ export interface Candle {
   change_price: number;
   change_rate: number;
 }
+
+// indicators.py가 미리 계산해서 저장하는 지표 JSON (값이 없는 구간은 null)
+export type IndicatorValues = Array<number | null>;
+
+export interface IndicatorSet {
+  market: string;
+  unit: string;
+  time: number[]; // UTCTimestamp (초)
+  sma: Record<string, IndicatorValues>;
+  ema: Record<string, IndicatorValues>;
+  rsi: Record<string, IndicatorValues>;
+  macd: Record<string, { macd: IndicatorValues; signal: IndicatorValues; histogram: IndicatorValues }>;
+  bollinger: Record<string, { middle: IndicatorValues; upper: IndicatorValues; lower: IndicatorValues }>;
+  atr: Record<string, IndicatorValues>;
+  vwap: Record<string, IndicatorValues>;
+}
@@ -0,0 +1,257 @@
+# indicators.py
+# 업비트 캔들 배열에 대한 벡터화 기술적 지표 계산
+# - SMA/EMA, RSI, MACD, 볼린저 밴드, ATR, VWAP
+# - 여러 기간(window)을 한 번에 계산하고, 행 단위 파이썬 루프 없이 numpy 연산만 사용
+# - coin-chart-app의 ChartContainer가 그대로 읽을 수 있는 지표 JSON으로 저장
+
+import argparse
+import json
+import math
+import os
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+DEFAULT_WINDOWS = {
+    "sma": (5, 20, 60, 120),
+    "ema": (12, 26, 50, 200),
+    "rsi": (14,),
+    "bollinger": (20,),
+    "atr": (14,),
+    "vwap": (20,),
+}
+MACD_PARAMS = ((12, 26, 9),)
+BOLLINGER_K = 2.0
+
+
+# -----------------------------
+# 입력 변환
+# -----------------------------
+def arrays_from_candles(candles):
+    """
+    업비트 캔들 목록을 시간순(과거→최신) numpy 배열 딕셔너리로 변환합니다.
+
+    Returns:
+        dict: time(epoch 초), open, high, low, close, volume, value(누적 거래대금)
+    """
+    rows = sorted(candles, key=lambda c: c["candle_date_time_utc"])
+    n = len(rows)
+
+    def col(name):
+        return np.fromiter((c[name] for c in rows), dtype=np.float64, count=n)
+
+    return {
+        "time": np.array([c["candle_date_time_utc"] for c in rows], dtype="datetime64[s]").astype(np.int64),
+        "open": col("opening_price"),
+        "high": col("high_price"),
+        "low": col("low_price"),
+        "close": col("trade_price"),
+        "volume": col("candle_acc_trade_volume"),
+        "value": col("candle_acc_trade_price"),
+    }
+
+
+# -----------------------------
+# 기본 연산
+# -----------------------------
+def _rolling_sum(x, window: int):
+    """누적합 차이로 구한 이동 합계. 앞쪽 window-1개는 NaN."""
+    out = np.full(len(x), np.nan)
+    if window <= len(x):
+        c = np.cumsum(np.concatenate(([0.0], x)))
+        out[window - 1:] = c[window:] - c[:-window]
+    return out
+
+
+def ewm(x, alpha: float):
+    """
+    y[t] = (1 - alpha) * y[t-1] + alpha * x[t], y[0] = x[0] 을 벡터화해서 계산합니다.
+
+    닫힌 식 y[s+k] = (1-a)^(k+1) * y[s-1] + a * (1-a)^k * cumsum(x * (1-a)^-j) 를
+    (1-a)^-j 가 넘치지 않는 길이의 블록 단위로 적용합니다.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    out = np.empty_like(x)
+    if len(x) == 0:
+        return out
+    decay = 1.0 - alpha
+    if decay <= 0:
+        out[:] = x
+        return out
+    block = max(1, int(600 / -math.log(decay)))
+    prev = x[0]
+    for s in range(0, len(x), block):
+        chunk = x[s:s + block]
+        k = np.arange(len(chunk))
+        acc = np.cumsum(chunk * decay ** -k)
+        out[s:s + len(chunk)] = decay ** (k + 1) * prev + alpha * decay ** k * acc
+        prev = out[s + len(chunk) - 1]
+    return out
+
+
+# -----------------------------
+# 지표
+# -----------------------------
+def sma(close, windows):
+    """단순 이동평균. {window: 배열}"""
+    return {w: _rolling_sum(close, w) / w for w in windows}
+
+
+def ema(close, windows):
+    """지수 이동평균 (alpha = 2 / (window + 1)). 앞쪽 window-1개는 NaN."""
+    result = {}
+    for w in windows:
+        values = ewm(close, 2.0 / (w + 1))
+        values[:w - 1] = np.nan
+        result[w] = values
+    return result
+
+
+def rsi(close, periods):
+    """Wilder RSI. {period: 배열 (0~100)}"""
+    diff = np.diff(close, prepend=close[:1])
+    gain = np.clip(diff, 0, None)
+    loss = np.clip(-diff, 0, None)
+    result = {}
+    for p in periods:
+        avg_gain = ewm(gain, 1.0 / p)
+        avg_loss = ewm(loss, 1.0 / p)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+        values[:p] = np.nan
+        result[p] = values
+    return result
+
+
+def macd(close, params=MACD_PARAMS):
+    """MACD. {(fast, slow, signal): {'macd', 'signal', 'histogram'}}"""
+    result = {}
+    for fast, slow, signal in params:
+        line = ewm(close, 2.0 / (fast + 1)) - ewm(close, 2.0 / (slow + 1))
+        sig = ewm(line, 2.0 / (signal + 1))
+        line[:slow - 1] = np.nan
+        sig[:slow + signal - 2] = np.nan
+        result[(fast, slow, signal)] = {"macd": line, "signal": sig, "histogram": line - sig}
+    return result
+
+
+def bollinger(close, windows, k: float = BOLLINGER_K):
+    """볼린저 밴드. {window: {'middle', 'upper', 'lower'}}"""
+    result = {}
+    for w in windows:
+        middle = np.full(len(close), np.nan)
+        std = np.full(len(close), np.nan)
+        if w <= len(close):
+            view = sliding_window_view(close, w)
+            middle[w - 1:] = view.mean(axis=1)
+            std[w - 1:] = view.std(axis=1)
+        result[w] = {"middle": middle, "upper": middle + k * std, "lower": middle - k * std}
+    return result
+
+
+def atr(high, low, close, periods):
+    """Wilder ATR. {period: 배열}"""
+    prev_close = np.concatenate((close[:1], close[:-1]))
+    true_range = np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+    result = {}
+    for p in periods:
+        values = ewm(true_range, 1.0 / p)
+        values[:p - 1] = np.nan
+        result[p] = values
+    return result
+
+
+def vwap(value, volume, windows):
+    """
+    이동 VWAP. 업비트 캔들의 누적 거래대금/거래량을 그대로 써서
+    window 구간의 sum(거래대금) / sum(거래량)을 계산합니다.
+    """
+    result = {}
+    for w in windows:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result[w] = _rolling_sum(value, w) / _rolling_sum(volume, w)
+    return result
+
+
+def compute_all(arrays, windows=None, macd_params=MACD_PARAMS):
+    """
+    모든 지표를 계산합니다.
+
+    Args:
+        arrays (dict): arrays_from_candles() 결과
+        windows (dict, optional): 지표별 기간 목록. 생략하면 DEFAULT_WINDOWS
+        macd_params (tuple): (fast, slow, signal) 목록
+
+    Returns:
+        dict: 지표 이름 → {기간: 배열 또는 배열 딕셔너리}
+    """
+    windows = {**DEFAULT_WINDOWS, **(windows or {})}
+    close = arrays["close"]
+    return {
+        "sma": sma(close, windows["sma"]),
+        "ema": ema(close, windows["ema"]),
+        "rsi": rsi(close, windows["rsi"]),
+        "macd": macd(close, macd_params),
+        "bollinger": bollinger(close, windows["bollinger"]),
+        "atr": atr(arrays["high"], arrays["low"], close, windows["atr"]),
+        "vwap": vwap(arrays["value"], arrays["volume"], windows["vwap"]),
+    }
+
+
+# -----------------------------
+# JSON 내보내기
+# -----------------------------
+def _to_list(values, decimals: int):
+    rounded = np.round(values, decimals)
+    return np.where(np.isnan(rounded), None, rounded).tolist()
+
+
+def _serialize(node, decimals: int):
+    if isinstance(node, np.ndarray):
+        return _to_list(node, decimals)
+    return {
+        ("_".join(map(str, key)) if isinstance(key, tuple) else str(key)): _serialize(value, decimals)
+        for key, value in node.items()
+    }
+
+
+def to_chart_json(arrays, indicators, market: str, unit: str = "days", decimals: int = 4):
+    """
+    ChartContainer가 읽는 지표 JSON 구조로 변환합니다.
+    time은 lightweight-charts의 UTCTimestamp(초)와 같고, 계산 불가 구간은 null입니다.
+    """
+    return {
+        "market": market,
+        "unit": unit,
+        "time": arrays["time"].tolist(),
+        **{name: _serialize(values, decimals) for name, values in indicators.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="캔들 JSON → 기술적 지표 JSON")
+    parser.add_argument("json_file", help="BTC-automation.py/upbit_backfill.py가 저장한 캔들 JSON")
+    parser.add_argument("--out", default=None, help="출력 경로 (기본값: {market}_indicators.json)")
+    parser.add_argument("--unit", default="days")
+    parser.add_argument("--sma", type=int, nargs="+", default=list(DEFAULT_WINDOWS["sma"]))
+    parser.add_argument("--ema", type=int, nargs="+", default=list(DEFAULT_WINDOWS["ema"]))
+    args = parser.parse_args()
+
+    with open(args.json_file, "r", encoding="utf-8") as f:
+        candles = json.load(f)
+    if not candles:
+        print("캔들이 없습니다.")
+        return
+
+    market = candles[0]["market"]
+    arrays = arrays_from_candles(candles)
+    indicators = compute_all(arrays, {"sma": args.sma, "ema": args.ema})
+
+    out = args.out or os.path.join(os.path.dirname(args.json_file), f"{market}_indicators.json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(to_chart_json(arrays, indicators, market, args.unit), f, ensure_ascii=False, separators=(",", ":"))
+    print(f"지표가 {out} 파일로 저장되었습니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+# upbit_async.py
+# 원화(KRW-*) 전체 마켓 캔들 동시 갱신 (asyncio)
+# - /v1/market/all에서 마켓 목록을 읽어 KRW 마켓만 선택
+# - 요청은 공용 Transport(common/transport.py)의 keep-alive 연결 풀로, 코루틴마다 스레드에서 보냄
+# - 전역 토큰 버킷으로 초당 요청 수 제한, 429 응답은 지수 백오프 후 재시도
+# - 받은 캔들은 candle_store에 마켓별로 바로 덧붙임
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+import requests
+
+from candle_store import DEFAULT_ROOT, CandleStore
+from upbit_backfill import (
+    BASE_URL, HEADERS, MAX_RETRIES, PAGE_SIZE, RATE_PER_SEC, TIMEOUT_SEC, UPBIT_TO_FORMAT,
+    candle_time, parse_utc, plan_windows, stitch, unit_delta,
+)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from transport import default_transport
+
+MARKET_URL = "https://api.upbit.com/v1/market/all"
+
+
+class AsyncTokenBucket:
+    """asyncio용 토큰 버킷. 모든 코루틴이 하나의 버킷을 공유합니다."""
+
+    def __init__(self, rate: float = RATE_PER_SEC, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+async def get_json(transport, bucket: AsyncTokenBucket, url: str, params=None):
+    """
+    토큰을 얻은 뒤 GET 요청. 429/5xx는 지수 백오프(+지터)로 재시도합니다.
+    재시도도 토큰 버킷을 거치도록 Transport 자체 재시도는 끄고 여기서 반복합니다.
+    """
+    for attempt in range(MAX_RETRIES):
+        await bucket.acquire()
+        try:
+            response = await asyncio.to_thread(transport.get, url, params=params, headers=HEADERS,
+                                               timeout=TIMEOUT_SEC, retries=0)
+        except (requests.ConnectionError, requests.Timeout):
+            await asyncio.sleep(0.5 * 2 ** attempt)
+            continue
+        if response.status_code == 429 or response.status_code >= 500:
+            await asyncio.sleep(0.5 * 2 ** attempt + random.random() * 0.1)
+            continue
+        response.raise_for_status()
+        return response.json()
+    raise RuntimeError(f"요청이 계속 실패합니다: {url} {params}")
+
+
+async def fetch_krw_markets(transport, bucket: AsyncTokenBucket):
+    """원화 마켓 코드 목록 (예: ['KRW-BTC', 'KRW-ETH', ...])."""
+    markets = await get_json(transport, bucket, MARKET_URL, {"isDetails": "false"})
+    return [m["market"] for m in markets if m["market"].startswith("KRW-")]
+
+
+async def fetch_market(transport, bucket: AsyncTokenBucket, market: str, begin: datetime, end: datetime, unit: str):
+    """한 마켓의 [begin, end) 구간을 페이지 단위로 동시에 요청해 합칩니다."""
+    url = f"{BASE_URL}/{unit}"
+    pages = await asyncio.gather(*(
+        get_json(transport, bucket, url, {
+            "market": market,
+            "to": to.astimezone(timezone.utc).strftime(UPBIT_TO_FORMAT),
+            "count": count,
+        })
+        for to, count in plan_windows(begin, end, unit)
+    ))
+    return stitch(pages, begin, end)
+
+
+async def refresh_all(store: CandleStore, unit: str = "days", markets=None, start=None,
+                      rate: float = RATE_PER_SEC, transport=None):
+    """
+    모든 원화 마켓의 캔들을 동시에 갱신해서 저장소에 기록합니다.
+
+    Args:
+        store (CandleStore): 캔들 저장소
+        unit (str): 캔들 단위
+        markets (list, optional): 갱신할 마켓. 생략하면 /v1/market/all의 KRW 마켓 전체
+        start: 저장소에 없는 마켓의 시작 시각. 생략하면 최근 1페이지(200개)만 받음
+        rate (float): 전역 초당 요청 수
+        transport (Transport, optional): 요청에 쓸 Transport. 생략하면 공용 Transport
+
+    Returns:
+        dict: 마켓 → 추가된 줄 수 (실패한 마켓은 예외 객체)
+    """
+    bucket = AsyncTokenBucket(rate)
+    transport = transport or default_transport()
+    now = datetime.now(timezone.utc)
+
+    if markets is None:
+        markets = await fetch_krw_markets(transport, bucket)
+
+    async def refresh(market: str):
+        last = store.newest(market, unit)
+        if last:
+            begin = candle_time(last)
+        elif start is not None:
+            begin = parse_utc(start)
+        else:
+            begin = now - unit_delta(unit) * PAGE_SIZE
+        candles = await fetch_market(transport, bucket, market, begin, now, unit)
+        return store.append(market, candles, unit, covered=(begin, now))
+
+    results = await asyncio.gather(*(refresh(m) for m in markets), return_exceptions=True)
+    return dict(zip(markets, results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="원화 마켓 전체 캔들 동시 갱신")
+    parser.add_argument("--unit", default="days")
+    parser.add_argument("--markets", nargs="*", default=None, help="생략하면 KRW 마켓 전체")
+    parser.add_argument("--start", default=None, help="저장소에 없는 마켓의 백필 시작일")
+    parser.add_argument("--rate", type=float, default=RATE_PER_SEC)
+    parser.add_argument("--root", default=DEFAULT_ROOT)
+    args = parser.parse_args()
+
+    store = CandleStore(args.root)
+    t0 = time.perf_counter()
+    results = asyncio.run(refresh_all(store, args.unit, args.markets, args.start, rate=args.rate))
+    elapsed = time.perf_counter() - t0
+
+    failed = {m: r for m, r in results.items() if isinstance(r, Exception)}
+    added = sum(r for r in results.values() if not isinstance(r, Exception))
+    print(f"마켓 {len(results)}개 갱신, {added}줄 추가, {elapsed:.2f}초")
+    for market, error in failed.items():
+        print(f"❌ {market}: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+# upbit_backfill.py
+# 업비트 캔들 과거 데이터 백필 엔진
+# - to 커서를 200개(최대 count) 단위 페이지로 과거 방향으로 이동
+# - 서로 겹치지 않는 기간(window)을 스레드 풀로 병렬 요청
+# - 토큰 버킷으로 업비트 캔들 API의 초당 요청 제한을 지킴
+# - 결과를 candle_date_time_utc 기준으로 중복 제거해 하나의 시계열로 합침
+
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from transport import Transport
+
+BASE_URL = "https://api.upbit.com/v1/candles"
+HEADERS = {"accept": "application/json"}
+
+PAGE_SIZE = 200      # 캔들 API 1회 요청 최대 개수
+RATE_PER_SEC = 10    # 캔들 API 그룹 초당 요청 제한 (IP 기준)
+MAX_WORKERS = 8
+MAX_RETRIES = 5
+TIMEOUT_SEC = 10
+
+UPBIT_TO_FORMAT = "%Y-%m-%d %H:%M:%S"
+UTC_KEY_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+# -----------------------------
+# 시간/단위 도움 함수
+# -----------------------------
+def unit_delta(unit: str) -> timedelta:
+    """캔들 단위 문자열('days', 'weeks', 'minutes/60' 등)을 timedelta로 변환."""
+    if unit == "days":
+        return timedelta(days=1)
+    if unit == "weeks":
+        return timedelta(weeks=1)
+    if unit.startswith("minutes/"):
+        return timedelta(minutes=int(unit.split("/", 1)[1]))
+    raise ValueError(f"지원하지 않는 캔들 단위입니다: {unit}")
+
+
+def parse_utc(value) -> datetime:
+    """'2025-09-24', '2025-09-24 00:00:00', '2025-09-24T00:00:00', datetime을 UTC datetime으로 변환."""
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    text = str(value).strip().replace(" ", "T")
+    if len(text) == 10:
+        text += "T00:00:00"
+    dt = datetime.fromisoformat(text)
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def candle_time(candle: dict) -> datetime:
+    """캔들의 candle_date_time_utc를 UTC datetime으로 변환."""
+    return datetime.strptime(candle["candle_date_time_utc"], UTC_KEY_FORMAT).replace(tzinfo=timezone.utc)
+
+
+# -----------------------------
+# 요청 속도 제한
+# -----------------------------
+class TokenBucket:
+    """초당 rate개의 토큰이 채워지는 토큰 버킷 (스레드 안전)."""
+
+    def __init__(self, rate: float = RATE_PER_SEC, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """토큰 1개를 얻을 때까지 대기."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def upbit_transport() -> Transport:
+    """
+    업비트 캔들 요청용 공용 Transport (keep-alive 연결 재사용).
+    재시도/백오프는 매번 토큰 버킷을 거치도록 fetch_page가 직접 하므로 Transport 자체 재시도는 끔.
+    """
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = Transport(retries=0)
+        return _transport
+
+
+# -----------------------------
+# 페이지 계획/요청
+# -----------------------------
+def plan_windows(start: datetime, end: datetime, unit: str = "days"):
+    """
+    [start, end) 구간을 겹치지 않는 페이지 목록으로 나눕니다.
+
+    Returns:
+        list[tuple[datetime, int]]: (to 커서, count) 목록. 최신 페이지가 먼저 옵니다.
+    """
+    step = unit_delta(unit)
+    remaining = math.ceil((end - start) / step)
+    windows = []
+    cursor = end
+    while remaining > 0:
+        count = min(PAGE_SIZE, remaining)
+        windows.append((cursor, count))
+        cursor -= step * count
+        remaining -= count
+    return windows
+
+
+def fetch_page(session, bucket: TokenBucket, market: str, unit: str, to: datetime, count: int):
+    """
+    to 이전(미포함) 캔들 count개를 요청합니다. 429/5xx 응답과 연결 오류는 지수 백오프로 재시도합니다.
+    (재시도도 토큰을 하나씩 씀)
+
+    Returns:
+        list: 업비트 응답 그대로의 캔들 목록 (최신순)
+    """
+    params = {
+        "market": market,
+        "to": to.astimezone(timezone.utc).strftime(UPBIT_TO_FORMAT),
+        "count": count,
+    }
+    for attempt in range(MAX_RETRIES):
+        bucket.acquire()
+        try:
+            response = session.get(f"{BASE_URL}/{unit}", params=params, headers=HEADERS, timeout=TIMEOUT_SEC)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == MAX_RETRIES - 1:
+                raise
+            time.sleep(0.5 * 2 ** attempt)
+            continue
+        if response.status_code == 429 or response.status_code >= 500:
+            time.sleep(0.5 * 2 ** attempt)
+            continue
+        response.raise_for_status()
+        return response.json()
+    raise RuntimeError(f"요청 제한(429) 또는 서버 오류가 계속됩니다: {market} to={params['to']}")
+
+
+def stitch(pages, start: datetime | None = None, end: datetime | None = None):
+    """여러 페이지를 candle_date_time_utc 기준으로 중복 제거하고 과거→최신 순으로 정렬."""
+    merged = {}
+    for page in pages:
+        for candle in page:
+            merged[candle["candle_date_time_utc"]] = candle
+    candles = [merged[key] for key in sorted(merged)]
+    if start is not None or end is not None:
+        candles = [
+            c for c in candles
+            if (start is None or candle_time(c) >= start) and (end is None or candle_time(c) < end)
+        ]
+    return candles
+
+
+def backfill(market: str, start, end=None, unit: str = "days",
+             workers: int = MAX_WORKERS, rate: float = RATE_PER_SEC, session=None, bucket=None,
+             verbose: bool = False):
+    """
+    start ~ end 구간의 캔들을 병렬로 모두 받아 하나의 시계열로 합칩니다.
+
+    Args:
+        market (str): 마켓 코드 (예: 'KRW-BTC')
+        start: 시작 시각 (UTC, 포함)
+        end: 종료 시각 (UTC, 미포함). 생략하면 현재 시각
+        unit (str): 'days', 'weeks', 'minutes/{unit}'
+        workers (int): 동시 요청 스레드 수
+        rate (float): 초당 최대 요청 수
+        session: 요청에 쓸 Transport 또는 requests.Session (생략하면 upbit_transport(), 재시도 없는 공용 Transport)
+        bucket (TokenBucket): 여러 호출이 함께 쓸 토큰 버킷 (생략하면 rate로 새로 만듦).
+            동시에 여러 backfill을 돌릴 때는 하나를 공유해야 전체 요청 수가 rate를 넘지 않음
+        verbose (bool): 처리량(요청 수, 캔들/초) 출력 여부
+
+    Returns:
+        list: 중복이 제거된 캔들 목록 (과거→최신 순)
+    """
+    start = parse_utc(start)
+    end = parse_utc(end) if end is not None else datetime.now(timezone.utc)
+    windows = plan_windows(start, end, unit)
+    bucket = bucket or TokenBucket(rate)
+    session = session or upbit_transport()
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pages = list(pool.map(lambda w: fetch_page(session, bucket, market, unit, w[0], w[1]), windows))
+    candles = stitch(pages, start, end)
+    elapsed = time.perf_counter() - t0
+
+    if verbose:
+        print(
+            f"{market} {unit}: 요청 {len(windows)}회, 캔들 {len(candles)}개, "
+            f"{elapsed:.2f}초 ({len(candles) / max(elapsed, 1e-9):,.0f} 캔들/초, "
+            f"{len(windows) / max(elapsed, 1e-9):.1f} 요청/초)"
+        )
+    return candles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="업비트 캔들 과거 데이터 백필")
+    parser.add_argument("--market", default="KRW-BTC")
+    parser.add_argument("--start", required=True, help="시작일 (UTC, 예: 2019-01-01)")
+    parser.add_argument("--end", default=None, help="종료일 (UTC, 미포함, 기본값: 현재)")
+    parser.add_argument("--unit", default="days", help="days | weeks | minutes/{1,3,5,10,15,30,60,240}")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--rate", type=float, default=RATE_PER_SEC)
+    args = parser.parse_args()
+
+    candles = backfill(args.market, args.start, args.end, unit=args.unit,
+                       workers=args.workers, rate=args.rate, verbose=True)
+    if not candles:
+        print("받은 캔들이 없습니다.")
+        return
+
+    # 기존 파일과 같은 형식(최신순)으로 저장
+    first = candles[0]["candle_date_time_utc"][:10]
+    last = candles[-1]["candle_date_time_utc"][:10]
+    filename = f"{args.market}_{args.unit.replace('/', '')}_{first}_{last}.json"
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(list(reversed(candles)), f, ensure_ascii=False)
+    print(f"데이터가 {filename} 파일로 저장되었습니다.")
+
+
+if __name__ == "__main__":
+    main()
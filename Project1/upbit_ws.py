@@ -0,0 +1,350 @@
+# upbit_ws.py
+# 업비트 WebSocket 실시간 체결 수집 + 메모리 내 캔들 생성
+# - trade(체결) 스트림을 구독해서 OHLCV 분봉을 체결마다 갱신
+# - 마감된 캔들은 모아 두었다가 candle_store에 배치로 기록
+# - 진행 중인(미완성) 캔들은 CandleBuilder.partial()로 조회
+# - 녹화한 체결 스트림을 그대로 재생하는 로컬 WebSocket 서버 포함 (테스트/부하 측정용)
+# - 초당 이벤트 수와 종단 간 지연(메시지 timestamp → 수신)을 주기적으로 출력
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+import websockets
+
+from candle_store import DEFAULT_ROOT, CandleStore
+
+UPBIT_WS_URL = "wss://api.upbit.com/websocket/v1"
+FLUSH_BATCH = 50       # 마감 캔들이 이만큼 쌓이면 기록
+FLUSH_INTERVAL = 5.0   # 또는 이 시간(초)이 지나면 기록
+REPORT_INTERVAL = 10.0
+LATENCY_SAMPLES = 10000
+BACKOFF_MAX = 60.0     # 재연결 대기 상한(초)
+SEEN_TRADES = 100000   # 재연결 후 중복 체결을 거르기 위해 기억할 최근 체결 수
+
+KST_OFFSET = timedelta(hours=9)
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+# -----------------------------
+# 캔들 생성
+# -----------------------------
+class CandleBuilder:
+    """
+    체결 이벤트로 분봉을 만듭니다. 마켓별로 진행 중인 캔들 1개만 메모리에 둡니다.
+
+    Args:
+        unit_minutes (int): 분봉 단위 (1, 3, 5, 15, 60 ...)
+    """
+
+    def __init__(self, unit_minutes: int = 1):
+        self.unit_minutes = unit_minutes
+        self.unit = f"minutes/{unit_minutes}"
+        self._bucket_ms = unit_minutes * 60 * 1000
+        self._partial = {}   # market → 진행 중 캔들
+        self._starts = {}    # market → 진행 중 캔들 시작 시각(ms)
+        self.closed = []     # 아직 기록하지 않은 마감 캔들
+
+    def _new_candle(self, market: str, start_ms: int, trade: dict) -> dict:
+        utc = datetime.fromtimestamp(start_ms / 1000, tz=timezone.utc)
+        price = trade["trade_price"]
+        return {
+            "market": market,
+            "candle_date_time_utc": utc.strftime(TIME_FORMAT),
+            "candle_date_time_kst": (utc + KST_OFFSET).strftime(TIME_FORMAT),
+            "opening_price": price,
+            "high_price": price,
+            "low_price": price,
+            "trade_price": price,
+            "timestamp": trade["trade_timestamp"],
+            "candle_acc_trade_price": 0.0,
+            "candle_acc_trade_volume": 0.0,
+            "unit": self.unit_minutes,
+        }
+
+    def on_trade(self, trade: dict):
+        """
+        체결 1건을 반영합니다.
+
+        Returns:
+            dict | None: 이번 체결로 마감된 이전 캔들 (없으면 None)
+        """
+        market = trade["code"]
+        trade_ms = trade["trade_timestamp"]
+        start_ms = trade_ms - trade_ms % self._bucket_ms
+        closed = None
+
+        candle = self._partial.get(market)
+        if candle is None or start_ms > self._starts[market]:
+            if candle is not None:
+                closed = candle
+                self.closed.append(candle)
+            candle = self._partial[market] = self._new_candle(market, start_ms, trade)
+            self._starts[market] = start_ms
+        elif start_ms < self._starts[market]:
+            return None  # 이미 마감된 구간의 늦은 체결은 무시
+
+        price = trade["trade_price"]
+        volume = trade["trade_volume"]
+        candle["high_price"] = max(candle["high_price"], price)
+        candle["low_price"] = min(candle["low_price"], price)
+        candle["trade_price"] = price
+        candle["timestamp"] = max(candle["timestamp"], trade_ms)
+        candle["candle_acc_trade_price"] += price * volume
+        candle["candle_acc_trade_volume"] += volume
+        return closed
+
+    def partial(self, market: str):
+        """진행 중인 캔들의 복사본 (없으면 None)."""
+        candle = self._partial.get(market)
+        return dict(candle) if candle else None
+
+    def drain(self):
+        """마감 캔들을 꺼내고 비웁니다."""
+        closed, self.closed = self.closed, []
+        return closed
+
+
+class RecentTrades:
+    """
+    최근 받은 체결의 (마켓, sequential_id). 재연결하면 서버가 이미 보낸 체결을 다시 보낼 수 있어서
+    이걸로 거릅니다. sequential_id는 유일하지만 순서는 보장되지 않으므로 최근 size개를 집합으로 기억합니다.
+    """
+
+    def __init__(self, size: int = SEEN_TRADES):
+        self.size = size
+        self._order = deque()
+        self._seen = set()
+
+    def add(self, trade: dict) -> bool:
+        """처음 보는 체결이면 기억하고 True, 이미 본 체결이면 False. sequential_id가 없으면 항상 True."""
+        seq = trade.get("sequential_id")
+        if seq is None:
+            return True
+        key = (trade["code"], seq)
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        self._order.append(key)
+        if len(self._order) > self.size:
+            self._seen.discard(self._order.popleft())
+        return True
+
+
+class IngestStats:
+    """이벤트 수와 종단 간 지연(ms) 통계."""
+
+    def __init__(self):
+        self.events = 0
+        self.duplicates = 0
+        self.started = time.perf_counter()
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self._window_events = 0
+        self._window_started = self.started
+
+    def record(self, message_ms: int):
+        self.events += 1
+        self._window_events += 1
+        self.latencies.append(time.time() * 1000 - message_ms)
+
+    def report(self) -> str:
+        now = time.perf_counter()
+        rate = self._window_events / max(now - self._window_started, 1e-9)
+        self._window_events = 0
+        self._window_started = now
+        if self.latencies:
+            ordered = sorted(self.latencies)
+            p50 = ordered[len(ordered) // 2]
+            p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+            latency = f"지연 p50 {p50:.1f}ms / p99 {p99:.1f}ms"
+        else:
+            latency = "지연 -"
+        duplicates = f", 중복 {self.duplicates:,}건 무시" if self.duplicates else ""
+        return f"이벤트 {self.events:,}건, {rate:,.0f}건/초, {latency}{duplicates}"
+
+
+# -----------------------------
+# 수집
+# -----------------------------
+def _flush(builder: CandleBuilder, store: CandleStore | None):
+    closed = builder.drain()
+    if not closed or store is None:
+        return len(closed)
+    by_market = {}
+    for candle in closed:
+        by_market.setdefault(candle["market"], []).append(candle)
+    for market, candles in by_market.items():
+        store.append(market, candles, builder.unit)
+    return len(closed)
+
+
+async def ingest(codes, builder: CandleBuilder, store: CandleStore | None = None,
+                 url: str = UPBIT_WS_URL, duration: float | None = None, stats: IngestStats | None = None):
+    """
+    체결 스트림을 구독해서 캔들을 만들고, 마감 캔들을 배치로 저장합니다.
+    연결이 끊기거나 서버가 연결을 닫으면 지수 백오프로 다시 연결합니다. 새 체결을 받으면 백오프를 초기화하고,
+    재연결 후 다시 받은 체결(sequential_id로 판단)은 건너뜁니다.
+
+    Args:
+        codes (list): 구독할 마켓 코드
+        builder (CandleBuilder): 캔들 생성기 (partial()로 진행 중 캔들 조회)
+        store (CandleStore, optional): 마감 캔들을 기록할 저장소
+        url (str): WebSocket 주소 (재생 서버 주소로 바꿔 테스트 가능)
+        duration (float, optional): 지정하면 이 시간(초) 후 종료
+        stats (IngestStats, optional): 통계 객체
+    """
+    stats = stats or IngestStats()
+    subscribe = json.dumps([
+        {"ticket": str(uuid.uuid4())},
+        {"type": "trade", "codes": list(codes)},
+        {"format": "DEFAULT"},
+    ])
+    deadline = time.monotonic() + duration if duration else None
+    last = {"flush": time.monotonic(), "report": time.monotonic()}
+    seen = RecentTrades()
+    backoff = 1.0
+
+    async def consume(ws):
+        nonlocal backoff
+        async for raw in ws:
+            message = json.loads(raw)
+            if message.get("type") != "trade":
+                continue
+            if not seen.add(message):
+                stats.duplicates += 1
+                continue
+            backoff = 1.0  # 새 체결을 받았으면 정상 연결
+            stats.record(message.get("timestamp", message["trade_timestamp"]))
+            builder.on_trade(message)
+
+            now = time.monotonic()
+            if len(builder.closed) >= FLUSH_BATCH or now - last["flush"] >= FLUSH_INTERVAL:
+                _flush(builder, store)
+                last["flush"] = now
+            if now - last["report"] >= REPORT_INTERVAL:
+                print(stats.report())
+                last["report"] = now
+
+    while deadline is None or time.monotonic() < deadline:
+        try:
+            async with websockets.connect(url, ping_interval=60) as ws:
+                await ws.send(subscribe)
+                if deadline is None:
+                    await consume(ws)
+                else:
+                    await asyncio.wait_for(consume(ws), timeout=max(deadline - time.monotonic(), 0))
+            reason = "서버가 연결을 닫음"
+        except asyncio.TimeoutError as e:
+            # 실행 시간이 끝난 경우만 종료 (핸드셰이크 시간 초과 등은 다른 연결 오류처럼 재연결)
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            reason = f"연결 시간 초과: {e or '응답 없음'}"
+        except (OSError, websockets.ConnectionClosed) as e:
+            reason = f"연결 끊김: {e}"
+        wait = backoff if deadline is None else min(backoff, max(deadline - time.monotonic(), 0))
+        print(f"{reason} → {wait:.0f}초 후 재연결")
+        await asyncio.sleep(wait)
+        backoff = min(backoff * 2, BACKOFF_MAX)
+
+    _flush(builder, store)
+    return stats
+
+
+async def record(codes, out_path: str, duration: float, url: str = UPBIT_WS_URL):
+    """재생 서버용으로 체결 메시지를 NDJSON 파일로 녹화합니다."""
+    subscribe = json.dumps([{"ticket": str(uuid.uuid4())}, {"type": "trade", "codes": list(codes)}])
+    count = 0
+    deadline = time.monotonic() + duration
+    async with websockets.connect(url) as ws:
+        await ws.send(subscribe)
+        with open(out_path, "w", encoding="utf-8") as f:
+            while time.monotonic() < deadline:
+                try:
+                    raw = await asyncio.wait_for(ws.recv(), timeout=max(deadline - time.monotonic(), 0))
+                except asyncio.TimeoutError:
+                    break
+                f.write((raw.decode("utf-8") if isinstance(raw, bytes) else raw) + "\n")
+                count += 1
+    return count
+
+
+# -----------------------------
+# 재생 서버 (로컬 테스트용)
+# -----------------------------
+def load_recording(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+async def serve_replay(path: str, host: str = "127.0.0.1", port: int = 8765, speed: float = 0.0):
+    """
+    녹화한 체결 스트림을 재생하는 WebSocket 서버를 실행합니다.
+    구독 메시지를 받으면 해당 코드의 체결을 순서대로 보내고, 보낼 때 timestamp를 현재 시각으로 바꿔
+    수신 측에서 종단 간 지연을 잴 수 있게 합니다.
+
+    Args:
+        speed (float): 0이면 최대 속도, 1이면 녹화 당시 간격 그대로, 2면 2배속
+    """
+    trades = load_recording(path)
+
+    async def handler(ws):
+        request = json.loads(await ws.recv())
+        codes = set()
+        for item in request:
+            codes.update(item.get("codes", []))
+        prev_ms = None
+        for trade in trades:
+            if codes and trade["code"] not in codes:
+                continue
+            if speed > 0 and prev_ms is not None:
+                await asyncio.sleep(max(trade["trade_timestamp"] - prev_ms, 0) / 1000 / speed)
+            prev_ms = trade["trade_timestamp"]
+            await ws.send(json.dumps({**trade, "timestamp": int(time.time() * 1000)}).encode("utf-8"))
+        await ws.close()
+
+    async with websockets.serve(handler, host, port):
+        print(f"재생 서버 실행 중: ws://{host}:{port} (체결 {len(trades):,}건)")
+        await asyncio.Future()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="업비트 WebSocket 실시간 수집")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_ingest = sub.add_parser("ingest", help="체결 수집 + 분봉 생성/저장")
+    p_ingest.add_argument("--codes", nargs="+", default=["KRW-BTC"])
+    p_ingest.add_argument("--unit", type=int, default=1, help="분봉 단위(분)")
+    p_ingest.add_argument("--url", default=UPBIT_WS_URL)
+    p_ingest.add_argument("--seconds", type=float, default=None)
+    p_ingest.add_argument("--root", default=DEFAULT_ROOT)
+
+    p_record = sub.add_parser("record", help="체결 스트림 녹화")
+    p_record.add_argument("--codes", nargs="+", default=["KRW-BTC"])
+    p_record.add_argument("--seconds", type=float, default=60)
+    p_record.add_argument("--out", default="trades.ndjson")
+
+    p_replay = sub.add_parser("replay", help="녹화한 체결 스트림 재생 서버")
+    p_replay.add_argument("recording")
+    p_replay.add_argument("--port", type=int, default=8765)
+    p_replay.add_argument("--speed", type=float, default=0.0)
+
+    args = parser.parse_args()
+    if args.command == "ingest":
+        builder = CandleBuilder(args.unit)
+        stats = asyncio.run(ingest(args.codes, builder, CandleStore(args.root), args.url, args.seconds))
+        print(stats.report())
+        for code in args.codes:
+            print(f"{code} 진행 중 캔들: {builder.partial(code)}")
+    elif args.command == "record":
+        count = asyncio.run(record(args.codes, args.out, args.seconds))
+        print(f"체결 {count:,}건을 {args.out} 파일로 저장했습니다.")
+    else:
+        asyncio.run(serve_replay(args.recording, port=args.port, speed=args.speed))
+
+
+if __name__ == "__main__":
+    main()
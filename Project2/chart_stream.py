@@ -0,0 +1,233 @@
+# chart_stream.py
+# 네이버 차트 응답의 priceInfos를 스트리밍으로 파싱해서 바로 파일에 씀
+# - 응답 본문을 iter_content로 조각조각 받으면서 json.JSONDecoder.raw_decode로 레코드 하나씩 꺼냄
+# - 전체 응답을 dict로 만들지 않으므로 기간이 길어도(분봉 수년치) 메모리 사용량이 일정
+# - 출력: NDJSON / CSV / 컬럼형(컬럼별 바이너리 파일)
+#
+# 사용 예:
+#   with make_sink("ndjson", "005930_minute.ndjson") as sink:
+#       meta, count = stream_chart(session, "005930", "minute", sink)
+
+import array
+import codecs
+import csv
+import json
+import os
+
+CHUNK_SIZE = 64 * 1024
+TIMEOUT_SEC = 10
+PRICE_INFOS_KEY = '"priceInfos"'
+
+_decoder = json.JSONDecoder()
+
+
+def iter_price_infos(chunks, meta=None):
+    """
+    바이트 조각 iterable에서 priceInfos 레코드를 하나씩 꺼냅니다.
+
+    Args:
+        chunks: 응답 본문 바이트 조각 (예: response.iter_content(CHUNK_SIZE))
+        meta (dict, optional): 넘기면 priceInfos 앞의 필드(code, periodType 등)를 채워 줌
+
+    Yields:
+        dict: priceInfos 레코드 하나
+    """
+    decode = codecs.getincrementaldecoder("utf-8")().decode
+    buf = ""
+    pos = 0
+    in_list = False
+    for chunk in chunks:
+        buf = buf[pos:] + decode(chunk)
+        pos = 0
+        if not in_list:
+            key = buf.find(PRICE_INFOS_KEY)
+            bracket = buf.find("[", key + len(PRICE_INFOS_KEY)) if key >= 0 else -1
+            if bracket < 0:
+                continue
+            if meta is not None:
+                head = buf[:key].rstrip().rstrip(",")
+                meta.update(json.loads(head + "}") if head.strip() != "{" else {})
+            in_list = True
+            pos = bracket + 1
+
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buf):
+                break
+            if buf[pos] == "]":
+                return
+            try:
+                record, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                break  # 레코드가 아직 다 오지 않음 → 다음 조각을 기다림
+            pos = end
+            yield record
+
+    if not in_list:
+        raise ValueError("응답에 priceInfos가 없습니다.")
+    raise ValueError("priceInfos가 끝나기 전에 응답이 끊겼습니다.")
+
+
+# -----------------------------
+# 출력 싱크
+# -----------------------------
+class NdjsonSink:
+    """레코드 한 줄에 하나씩 JSON으로 씁니다."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False))
+        self._file.write("\n")
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CsvSink(NdjsonSink):
+    """첫 레코드의 키를 헤더로 쓰는 CSV."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._writer = None
+
+    def write(self, record):
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._file, fieldnames=list(record), extrasaction="ignore")
+            self._writer.writeheader()
+        self._writer.writerow(record)
+
+
+class ColumnarSink(NdjsonSink):
+    """
+    컬럼마다 바이너리 파일 하나({dir}/{column}.bin)에 이어 쓰고, 끝나면 schema.json을 남깁니다.
+    숫자는 float64('d'), 정수와 날짜 문자열(20250424 등)은 int64('q')로 저장합니다.
+    int64 컬럼에 나중에 소수(70000.5 등)가 나오면 그 컬럼을 float64로 바꾸고 이미 쓴 값도 다시 씁니다.
+    빈 문자열("")은 값이 없는 것(None)과 같이 NaN으로 저장합니다 (int64 컬럼이면 float64로 바꿈).
+    numpy로 읽을 때: np.fromfile(f"{dir}/closePrice.bin", dtype="<f8")
+    """
+
+    FLUSH_ROWS = 4096
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.count = 0
+        self._columns = None
+        self._files = {}
+
+    def _typecode(self, value):
+        if isinstance(value, bool):
+            return "q"
+        if isinstance(value, int) or (isinstance(value, str) and value.isdigit()):
+            return "q"
+        if isinstance(value, float) or value is None:
+            return "d"
+        raise ValueError(f"컬럼형으로 저장할 수 없는 값입니다: {value!r}")
+
+    @staticmethod
+    def _fits_int(value):
+        if isinstance(value, int):
+            return True
+        if isinstance(value, float):
+            return value.is_integer()
+        return isinstance(value, str) and value.isdigit()
+
+    def _promote(self, key):
+        """int64 컬럼을 float64로 바꿉니다. 이미 파일에 쓴 값도 float64로 다시 씁니다."""
+        self._files[key].close()
+        path = os.path.join(self.path, f"{key}.bin")
+        written = array.array("q")
+        with open(path, "rb") as f:
+            written.frombytes(f.read())
+        self._files[key] = open(path, "wb")
+        array.array("d", map(float, written)).tofile(self._files[key])
+        self._columns[key] = array.array("d", map(float, self._columns[key]))
+        return self._columns[key]
+
+    @staticmethod
+    def _value(record, key):
+        value = record.get(key)
+        return None if isinstance(value, str) and not value.strip() else value  # 네이버 행의 빈 숫자 필드
+
+    def write(self, record):
+        if self._columns is None:
+            self._columns = {k: array.array(self._typecode(self._value(record, k))) for k in record}
+            self._files = {k: open(os.path.join(self.path, f"{k}.bin"), "wb") for k in self._columns}
+        for key, column in self._columns.items():
+            value = self._value(record, key)
+            if column.typecode == "q" and not self._fits_int(value):
+                column = self._promote(key)
+            if column.typecode == "q":
+                column.append(int(value))
+            else:
+                column.append(float("nan") if value is None else float(value))
+        self.count += 1
+        if self.count % self.FLUSH_ROWS == 0:
+            self._flush()
+
+    def _flush(self):
+        for key, column in (self._columns or {}).items():
+            column.tofile(self._files[key])
+            del column[:]
+
+    def close(self):
+        self._flush()
+        for f in self._files.values():
+            f.close()
+        schema = {
+            "count": self.count,
+            "byteorder": "little" if array.array("q", [1]).tobytes()[0] == 1 else "big",
+            "columns": {k: ("int64" if c.typecode == "q" else "float64") for k, c in (self._columns or {}).items()},
+        }
+        with open(os.path.join(self.path, "schema.json"), "w", encoding="utf-8") as f:
+            json.dump(schema, f, ensure_ascii=False, indent=2)
+
+
+class TeeSink:
+    """레코드를 여러 싱크에 똑같이 씁니다 (None은 건너뜀)."""
+
+    def __init__(self, *sinks):
+        self.sinks = [sink for sink in sinks if sink is not None]
+
+    def write(self, record):
+        for sink in self.sinks:
+            sink.write(record)
+
+
+SINKS = {"ndjson": NdjsonSink, "csv": CsvSink, "columnar": ColumnarSink}
+EXTENSIONS = {"ndjson": ".ndjson", "csv": ".csv", "columnar": ""}
+
+
+def make_sink(kind: str, path: str):
+    if kind not in SINKS:
+        raise ValueError(f"알 수 없는 출력 형식입니다: {kind} (ndjson, csv, columnar)")
+    return SINKS[kind](path)
+
+
+def stream_chart(session, url, params=None, headers=None, sink=None, timeout=TIMEOUT_SEC):
+    """
+    차트 응답을 받으면서 priceInfos 레코드를 sink에 바로 씁니다.
+    (본문을 저장하지 않으므로 HTTP 캐시를 거치지 않습니다)
+
+    Returns:
+        tuple: (meta dict, 레코드 수)
+    """
+    meta = {}
+    count = 0
+    with session.get(url, params=params, headers=headers, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        for record in iter_price_infos(response.iter_content(CHUNK_SIZE), meta):
+            sink.write(record)
+            count += 1
+    return meta, count
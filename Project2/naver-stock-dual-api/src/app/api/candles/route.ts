@@ -14,8 +14,12 @@ export async function GET(req: NextRequest) {
   const periodType = searchParams.get('periodType') || 'dayCandle'; // dayCandle|weekCandle|monthCandle|yearCandle
   if (!code) return NextResponse.json({ error: 'code required' }, { status: 400 });
 
-  const url = `https://api.stock.naver.com/chart/domestic/item/${encodeURIComponent(code)}?periodType=${encodeURIComponent(periodType)}`;
-  const r = await fetch(url, { headers: H, cache: 'no-store' });
+  // QUOTE_API_URL이 있으면 로컬 시세 서버(common/quote_server.py)의 이력에서 읽음
+  const local = process.env.QUOTE_API_URL;
+  const url = local
+    ? `${local}/naver/${encodeURIComponent(code)}?periodType=${encodeURIComponent(periodType)}`
+    : `https://api.stock.naver.com/chart/domestic/item/${encodeURIComponent(code)}?periodType=${encodeURIComponent(periodType)}`;
+  const r = await fetch(url, local ? {} : { headers: H, cache: 'no-store' });
   const text = await r.text();
   if (!r.ok) {
     return new NextResponse(JSON.stringify({ error: 'fetch_failed', status: r.status, sample: text.slice(0, 200) }), {
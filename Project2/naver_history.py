@@ -0,0 +1,200 @@
+# naver_history.py
+# 네이버 차트 priceInfos를 종목/기간별 이력 파일에 증분 병합
+# - 응답 창(window)보다 오래된 이력도 계속 보관 (response_data.json처럼 매번 덮어쓰지 않음)
+# - 이력 파일(NDJSON)과 인덱스 파일(localDate → crc32, 파일 위치)은 덧붙이기(append)만 함
+# - 새 날짜이거나 내용이 바뀐 행만 쓰므로 I/O는 전체 이력이 아니라 새 행 수에 비례
+#
+# 사용 예:
+#   history = NaverHistory("history")
+#   history.merge("005930", "dayCandle", data["priceInfos"])
+#   history.load("005930", "dayCandle")
+
+import argparse
+import json
+import os
+import zlib
+
+DEFAULT_ROOT = "history"
+
+
+def record_key(record) -> str:
+    """레코드 키: 분봉은 localDateTime, 그 외는 localDate."""
+    return record.get("localDateTime") or record["localDate"]
+
+
+def _line(record) -> bytes:
+    return (json.dumps(record, ensure_ascii=False, sort_keys=True) + "\n").encode("utf-8")
+
+
+class NaverHistory:
+    """
+    종목/기간별 priceInfos 이력.
+
+    파일 구성 (root/):
+        {code}_{periodType}.ndjson  레코드 1개당 1줄. 같은 키가 여러 번 나오면 마지막 줄이 우선
+        {code}_{periodType}.idx     "키<TAB>crc32<TAB>바이트 위치" 1줄씩. 마지막 줄이 우선
+    """
+
+    def __init__(self, root: str = DEFAULT_ROOT):
+        self.root = root
+        self._index = {}  # (code, periodType) → {키: (crc32, 바이트 위치)}
+
+    # ---------- 경로 ----------
+    def data_path(self, code: str, period_type: str = "dayCandle") -> str:
+        return os.path.join(self.root, f"{code}_{period_type}.ndjson")
+
+    def index_path(self, code: str, period_type: str = "dayCandle") -> str:
+        return os.path.join(self.root, f"{code}_{period_type}.idx")
+
+    def index(self, code: str, period_type: str = "dayCandle") -> dict:
+        """키 → (crc32, 바이트 위치). 처음 한 번만 인덱스 파일을 읽고 이후엔 메모리에서 씁니다."""
+        cache_key = (code, period_type)
+        if cache_key not in self._index:
+            index = {}
+            try:
+                with open(self.index_path(code, period_type), "r", encoding="utf-8") as f:
+                    for line in f:
+                        parts = line.rstrip("\n").split("\t")
+                        if len(parts) == 3:
+                            index[parts[0]] = (int(parts[1], 16), int(parts[2]))
+            except FileNotFoundError:
+                pass
+            self._index[cache_key] = index
+        return self._index[cache_key]
+
+    # ---------- 쓰기 ----------
+    def merge(self, code: str, period_type: str, price_infos) -> int:
+        """
+        최신 응답의 priceInfos 중 새 키이거나 내용이 바뀐 행만 이력 끝에 덧붙입니다.
+
+        Returns:
+            int: 추가된 줄 수
+        """
+        index = self.index(code, period_type)
+        rows = []
+        for record in sorted(price_infos, key=record_key):
+            line = _line(record)
+            crc = zlib.crc32(line)
+            key = record_key(record)
+            if index.get(key, (None,))[0] != crc:
+                rows.append((key, crc, line))
+        if not rows:
+            return 0
+
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.data_path(code, period_type), "ab") as data, \
+                open(self.index_path(code, period_type), "a", encoding="utf-8") as idx:
+            offset = data.seek(0, os.SEEK_END)
+            entries = []
+            for key, crc, line in rows:
+                data.write(line)
+                entries.append(f"{key}\t{crc:08x}\t{offset}\n")
+                index[key] = (crc, offset)
+                offset += len(line)
+            data.flush()
+            # 데이터를 먼저 쓰고 인덱스를 씀 (중간에 끊기면 다음 실행에서 같은 행을 다시 덧붙일 뿐)
+            idx.write("".join(entries))
+        return len(rows)
+
+    def sink(self, code: str, period_type: str = "dayCandle", batch: int = 4096):
+        """chart_stream 싱크처럼 레코드를 하나씩 받아 batch개마다 merge하는 객체 (스트리밍 모드용)."""
+        return HistorySink(self, code, period_type, batch)
+
+    # ---------- 조회 ----------
+    def load(self, code: str, period_type: str = "dayCandle"):
+        """이력 전체 (키 중복 제거, 과거→최신 순)."""
+        merged = {}
+        try:
+            with open(self.data_path(code, period_type), "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        merged[record_key(record)] = record
+        except FileNotFoundError:
+            return []
+        return [merged[key] for key in sorted(merged)]
+
+    def get(self, code: str, period_type: str, key: str):
+        """인덱스의 바이트 위치로 레코드 하나만 읽습니다. 없으면 None."""
+        entry = self.index(code, period_type).get(key)
+        if entry is None:
+            return None
+        with open(self.data_path(code, period_type), "rb") as f:
+            f.seek(entry[1])
+            return json.loads(f.readline())
+
+    def compact(self, code: str, period_type: str = "dayCandle") -> int:
+        """덮어쓴 옛 줄을 정리해 이력/인덱스 파일을 다시 씁니다. 가끔만 실행하면 됩니다."""
+        records = self.load(code, period_type)
+        data_path, index_path = self.data_path(code, period_type), self.index_path(code, period_type)
+        index = {}
+        with open(data_path + ".tmp", "wb") as data, open(index_path + ".tmp", "w", encoding="utf-8") as idx:
+            offset = 0
+            for record in records:
+                line = _line(record)
+                crc = zlib.crc32(line)
+                data.write(line)
+                idx.write(f"{record_key(record)}\t{crc:08x}\t{offset}\n")
+                index[record_key(record)] = (crc, offset)
+                offset += len(line)
+        os.replace(data_path + ".tmp", data_path)
+        os.replace(index_path + ".tmp", index_path)
+        self._index[(code, period_type)] = index
+        return len(records)
+
+
+class HistorySink:
+    """
+    레코드를 모아 두었다가 batch개마다 이력에 merge합니다 (write/close, with 문 지원).
+    스트리밍 응답도 메모리에 batch개만 두고 이력에 병합할 수 있습니다.
+    """
+
+    def __init__(self, history: NaverHistory, code: str, period_type: str, batch: int = 4096):
+        self.history = history
+        self.code = code
+        self.period_type = period_type
+        self.batch = batch
+        self.added = 0
+        self._pending = []
+
+    def write(self, record):
+        self._pending.append(record)
+        if len(self._pending) >= self.batch:
+            self._merge()
+
+    def _merge(self):
+        if self._pending:
+            self.added += self.history.merge(self.code, self.period_type, self._pending)
+            self._pending = []
+
+    def close(self):
+        self._merge()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()  # 응답이 중간에 끊겼으면 받은 데까지 병합하지 않음
+
+
+def main():
+    parser = argparse.ArgumentParser(description="저장된 차트 응답(JSON)을 이력 파일에 병합")
+    parser.add_argument("files", nargs="+", help="request_to_json.py가 저장한 JSON 파일")
+    parser.add_argument("--root", default=DEFAULT_ROOT)
+    parser.add_argument("--compact", action="store_true", help="병합 후 이력 파일 정리")
+    args = parser.parse_args()
+
+    history = NaverHistory(args.root)
+    for path in args.files:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        code, period_type = data["code"], data.get("periodType", "dayCandle")
+        added = history.merge(code, period_type, data["priceInfos"])
+        print(f"{code} {period_type}: {added}줄 추가 → {history.data_path(code, period_type)}")
+        if args.compact:
+            history.compact(code, period_type)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,20 @@
-import requests
+import argparse
+import contextlib
 import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from http_cache import DEFAULT_ROOT, HttpCache
+from transport import Transport, default_transport
+
+from chart_stream import EXTENSIONS, SINKS, TeeSink, make_sink, stream_chart
+from naver_history import DEFAULT_ROOT as HISTORY_ROOT, NaverHistory
 
 headers = {
     'accept': 'application/json, text/plain, */*',
@@ -20,12 +35,206 @@ params = {
     'periodType': 'dayCandle',
 }
 
-response = requests.get('https://api.stock.naver.com/chart/domestic/item/005930', params=params, headers=headers)
+CHART_URL = 'https://api.stock.naver.com/chart/domestic/item/{code}'
+
+# 배치 모드에서 쓰는 기간 별칭 → periodType
+PERIOD_TYPES = {
+    'day': 'dayCandle',
+    'week': 'weekCandle',
+    'month': 'monthCandle',
+    'minute': 'minute',
+}
+
+MAX_WORKERS = 16
+MAX_PER_HOST = 8   # 호스트당 동시 요청 수 상한
+TIMEOUT_SEC = 10
+
+
+class HostLimiter:
+    """호스트별 동시 요청 수를 제한하는 세마포어 모음."""
+
+    def __init__(self, per_host=MAX_PER_HOST):
+        self.per_host = per_host
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.per_host)
+            return self._semaphores[host]
+
+
+def make_session(pool_size=MAX_PER_HOST):
+    """기존 헤더를 달고 호스트별 keep-alive 연결을 재사용하는 공용 Transport (스레드 간 공유)."""
+    return Transport(headers=headers, timeout=TIMEOUT_SEC, pool_size=pool_size)
+
+
+def fetch_chart(session, code, period_type='dayCandle', limiter=None, cache=None):
+    """종목 코드 하나의 차트 응답(JSON)을 가져옵니다. cache(HttpCache)가 있으면 캐시를 거칩니다."""
+    url = CHART_URL.format(code=code)
+    request_params = {'periodType': period_type}
+    request_headers = {'referer': f'https://m.stock.naver.com/domestic/stock/{code}/total'}
+    semaphore = limiter(url) if limiter else contextlib.nullcontext()
+    with semaphore:
+        if cache is not None:
+            response = cache.get(session, url, params=request_params, headers=request_headers, timeout=TIMEOUT_SEC)
+        else:
+            response = session.get(url, params=request_params, headers=request_headers, timeout=TIMEOUT_SEC)
+    response.raise_for_status()
+    return response.json()
+
+
+def output_path(out_dir, code, period_type, extension='.json'):
+    return os.path.join(out_dir, f'{code}_{period_type}{extension}')
+
+
+def stream_chart_to(session, code, period_type, kind, out_dir, limiter=None, history=None):
+    """
+    차트 응답을 메모리에 올리지 않고 priceInfos만 레코드 단위로 파일에 씁니다.
+    history(NaverHistory)를 주면 같은 레코드를 일정 개수씩 이력에도 병합합니다.
+
+    Args:
+        kind (str): 'ndjson' | 'csv' | 'columnar'
+
+    Returns:
+        str: 저장 경로 (columnar는 폴더)
+    """
+    url = CHART_URL.format(code=code)
+    request_headers = {'referer': f'https://m.stock.naver.com/domestic/stock/{code}/total'}
+    path = output_path(out_dir, code, period_type, EXTENSIONS[kind])
+    semaphore = limiter(url) if limiter else contextlib.nullcontext()
+    merged = history.sink(code, period_type) if history is not None else contextlib.nullcontext()
+    with semaphore, make_sink(kind, path) as sink, merged as history_sink:
+        stream_chart(session, url, {'periodType': period_type}, request_headers, TeeSink(sink, history_sink))
+    return path
+
+
+def fetch_batch(codes, period_types, out_dir='charts', workers=MAX_WORKERS, per_host=MAX_PER_HOST, cache=None,
+                stream=None, history=None, session=None):
+    """
+    여러 종목 코드 × 기간을 스레드 풀로 동시에 받아 각각 파일로 저장합니다.
+
+    Args:
+        codes (list): 종목 코드 목록 (예: ['005930', '000660'])
+        period_types (list): 'day', 'week', 'month', 'minute' 또는 periodType 값
+        out_dir (str): 저장 폴더 ({code}_{periodType}.json)
+        workers (int): 스레드 수
+        per_host (int): 호스트당 동시 요청 수 상한
+        cache (HttpCache, optional): 응답 캐시 (TTL 안이면 요청하지 않고, 만료 후엔 조건부 요청)
+        stream (str, optional): 'ndjson' | 'csv' | 'columnar'면 priceInfos만 스트리밍으로 저장 (캐시 미사용)
+        history (NaverHistory, optional): 받은 priceInfos 중 새 행/바뀐 행만 이력 파일에 덧붙임.
+            스트리밍이 아니면 차트 JSON 전체를 다시 쓰지 않고 이력만 갱신합니다
+        session (Transport, optional): 생략하면 make_session(per_host)로 만들고 끝나면 닫음
+
+    Returns:
+        dict: (code, periodType) → 저장 경로(이력만 갱신했으면 이력 파일) 또는 예외 객체
+    """
+    if stream or history is None:
+        os.makedirs(out_dir, exist_ok=True)
+    jobs = [(code, PERIOD_TYPES.get(p, p)) for code in codes for p in period_types]
+    limiter = HostLimiter(per_host)
+    own_session = session is None
+    session = session or make_session(per_host)
+
+    def run(job):
+        code, period_type = job
+        try:
+            if stream:
+                return stream_chart_to(session, code, period_type, stream, out_dir, limiter, history)
+            data = fetch_chart(session, code, period_type, limiter, cache)
+            if history is not None:
+                # 새 행/바뀐 행만 덧붙임 (매번 차트 전체를 다시 쓰지 않음)
+                history.merge(code, period_type, data.get('priceInfos', []))
+                return history.data_path(code, period_type)
+            path = output_path(out_dir, code, period_type)
+            with open(path, 'w', encoding='utf-8') as json_file:
+                json.dump(data, json_file, ensure_ascii=False)
+            return path
+        except (requests.RequestException, ValueError) as e:
+            return e
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run, jobs))
+    finally:
+        if own_session:
+            session.close()
+    return dict(zip(jobs, results))
+
+
+def read_codes(path):
+    """한 줄에 종목 코드 하나씩 적힌 파일을 읽습니다. (# 뒤는 주석)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.split('#')[0].strip() for line in f if line.split('#')[0].strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='네이버 차트 API 수집')
+    parser.add_argument('--codes', nargs='+', default=None, help='배치 모드: 종목 코드 목록')
+    parser.add_argument('--codes-file', default=None, help='배치 모드: 종목 코드 파일')
+    parser.add_argument('--periods', nargs='+', default=['day'], help='day week month minute')
+    parser.add_argument('--out', default='charts')
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS)
+    parser.add_argument('--per-host', type=int, default=MAX_PER_HOST)
+    parser.add_argument('--cache-dir', default=DEFAULT_ROOT, help='HTTP 응답 캐시 폴더')
+    parser.add_argument('--no-cache', action='store_true', help='캐시 없이 항상 새로 요청')
+    parser.add_argument('--history', default=HISTORY_ROOT, help='priceInfos 이력 폴더 (새 행만 덧붙임)')
+    parser.add_argument('--no-history', action='store_true', help='이력 병합 안 함')
+    parser.add_argument('--transport-stats', action='store_true', help='호스트별 요청/재시도/연결 수/지연 시간 출력')
+    parser.add_argument('--stream', choices=sorted(SINKS), default=None,
+                        help='priceInfos를 레코드 단위로 스트리밍 저장 (긴 분봉 등 큰 응답용)')
+    args = parser.parse_args()
+    cache = None if args.no_cache else HttpCache(args.cache_dir)
+    history = None if args.no_history else NaverHistory(args.history)
+
+    codes = (args.codes or []) + (read_codes(args.codes_file) if args.codes_file else [])
+    if codes:
+        session = make_session(args.per_host)
+        try:
+            results = fetch_batch(codes, args.periods, args.out, args.workers, args.per_host, cache, args.stream,
+                                  history, session)
+            if args.transport_stats:
+                print(session.summary())
+        finally:
+            session.close()
+        failed = {job: r for job, r in results.items() if isinstance(r, Exception)}
+        target = history.root if history is not None and not args.stream else args.out
+        print(f"{len(results) - len(failed)}/{len(results)}개 저장 완료 → {target}/")
+        if cache is not None and not args.stream:
+            print(cache.summary())
+        for (code, period_type), error in failed.items():
+            print(f"Error: {code} {period_type}: {error}")
+        return
+
+    if args.stream:
+        session = make_session()
+        try:
+            path = stream_chart_to(session, '005930', params['periodType'], args.stream, '.', history=history)
+        finally:
+            session.close()
+        print(f"{path}에 저장되었습니다.")
+        return
+
+    # 기본 동작: 삼성전자 일봉을 response_data.json으로 저장
+    url = 'https://api.stock.naver.com/chart/domestic/item/005930'
+    transport = default_transport()
+    if cache is not None:
+        response = cache.get(transport, url, params=params, headers=headers)
+    else:
+        response = transport.get(url, params=params, headers=headers)
+
+    if response.status_code == 200:
+        data = response.json()
+        with open('response_data.json', 'w', encoding='utf-8') as json_file:
+            json.dump(data, json_file, ensure_ascii=False, indent=4)
+        if history is not None:
+            added = history.merge(data['code'], params['periodType'], data['priceInfos'])
+            print(f"이력에 {added}줄 추가 → {history.data_path(data['code'], params['periodType'])}")
+    else:
+        print(f"Error: {response.status_code}")
 
-if response.status_code == 200:
-    data = response.json()
-    with open('response_data.json', 'w', encoding='utf-8') as json_file:
-        json.dump(data, json_file, ensure_ascii=False, indent=4)
-else:
-    print(f"Error: {response.status_code}")
 
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,371 @@
+# returns_matrix.py
+# 여러 종목의 일간 수익률을 날짜 × 종목 float32 행렬 하나로 모아 메모리 매핑으로 분석
+# - naver_history.py 이력(또는 request_to_json.py가 저장한 JSON)에서 종가를 모아 날짜 기준으로 정렬
+# - returns.f32 / close.f32: 행 = 날짜, 열 = 종목 (행 우선). 새 날짜는 파일 끝에 행으로 덧붙이기만 함
+# - 상관계수, 지수 대비 베타, 상승/하락 상위 종목, 업종별 평균 수익률을 numpy 연산으로 바로 계산
+# - 거래가 없던 날(상장 전, 거래정지)은 NaN
+#
+# 사용 예:
+#   matrix = ReturnsMatrix("matrix")
+#   matrix.build(NaverHistory("history"), ["005930", "000660", "035420"])
+#   matrix.update(NaverHistory("history"))      # 종목별로 새로 생긴 날짜만 덧붙임 (이미 읽은 행이 바뀌면 고쳐 씀)
+#   matrix.top_movers(k=5)
+#   matrix.correlation(window=60)
+
+import argparse
+import json
+import os
+import zlib
+
+import numpy as np
+
+from naver_history import DEFAULT_ROOT as HISTORY_ROOT, NaverHistory
+
+DEFAULT_ROOT = "matrix"
+PERIOD_TYPE = "dayCandle"
+DTYPE = np.float32
+
+
+def _close(record):
+    value = record.get("closePrice", record.get("currentPrice"))
+    return np.nan if value is None else float(value)
+
+
+class ReturnsMatrix:
+    """
+    날짜 × 종목 수익률/종가 행렬.
+
+    파일 구성 (root/):
+        returns.f32  float32 (날짜 수 × 종목 수). 첫 행과 직전 종가가 없는 칸은 NaN
+        close.f32    float32 종가, 같은 모양
+        meta.json    tickers(열 순서), dates(행 순서, YYYYMMDD 정수), last_close(종목별 마지막 종가),
+                     last_date(종목별로 이력에서 마지막으로 읽은 날짜),
+                     read(종목별 [마지막 날짜 앞 행들의 crc 요약, 마지막 날짜 행의 crc], 이미 읽은 행이 바뀌었는지 확인용)
+    """
+
+    def __init__(self, root: str = DEFAULT_ROOT):
+        self.root = root
+        self.meta = self._read_meta()
+
+    # ---------- 파일 ----------
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def _read_meta(self) -> dict:
+        try:
+            with open(self._path("meta.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"tickers": [], "dates": [], "last_close": {}, "last_date": {}}
+
+    def _write_meta(self):
+        path = self._path("meta.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+
+    @property
+    def tickers(self):
+        return self.meta["tickers"]
+
+    @property
+    def dates(self) -> np.ndarray:
+        return np.asarray(self.meta["dates"], dtype=np.int64)
+
+    @property
+    def shape(self):
+        return len(self.meta["dates"]), len(self.meta["tickers"])
+
+    def _map(self, name: str, mode: str = "r"):
+        if not self.shape[0] or not self.shape[1]:
+            return np.empty(self.shape, dtype=DTYPE)
+        return np.memmap(self._path(name), dtype=DTYPE, mode=mode, shape=self.shape)
+
+    @property
+    def returns(self):
+        """수익률 행렬 (읽기 전용 memmap, 파일을 통째로 읽지 않음)."""
+        return self._map("returns.f32")
+
+    @property
+    def close(self):
+        return self._map("close.f32")
+
+    def column(self, ticker: str) -> int:
+        return self.tickers.index(ticker)
+
+    # ---------- 쓰기 ----------
+    def _last_dates(self) -> dict:
+        """종목별로 이력에서 마지막으로 읽은 날짜. last_date가 없는 예전 meta는 종가 행렬에서 구합니다."""
+        if "last_date" in self.meta:
+            return self.meta["last_date"]
+        close = np.asarray(self.close)
+        dates = self.dates
+        last = {}
+        for j, ticker in enumerate(self.tickers):
+            rows = np.flatnonzero(~np.isnan(close[:, j]))
+            if len(rows):
+                last[ticker] = int(dates[rows[-1]])
+        return last
+
+    @staticmethod
+    def _fingerprint(history: NaverHistory, ticker: str, last: int):
+        """이미 읽은 행의 [last 앞 행들의 crc 요약, last 행의 crc]. 이력 인덱스만 보고 본문은 읽지 않습니다."""
+        index = history.index(ticker, PERIOD_TYPE)
+        keys = sorted(k for k in index if int(k) < last)
+        digest = zlib.crc32("".join(f"{k}:{index[k][0]:08x}\n" for k in keys).encode("ascii"))
+        tail = index.get(str(last))
+        return [digest, tail[0] if tail else None]
+
+    def _revise(self, history: NaverHistory, ticker: str, date: int):
+        """
+        이미 읽은 마지막 행의 값이 바뀌었을 때(장중 일봉이 확정된 경우 등) 그 칸의 종가/수익률과
+        직전 종가(last_close)를 고쳐 씁니다. 수익률은 build와 같게 이력의 직전 종가로 계산합니다.
+        """
+        value = _close(history.get(ticker, PERIOD_TYPE, str(date)))
+        prev = np.nan
+        index = history.index(ticker, PERIOD_TYPE)
+        for key in sorted((k for k in index if int(k) < date), reverse=True):
+            prev = _close(history.get(ticker, PERIOD_TYPE, key))
+            if not np.isnan(prev):
+                break
+        row, col = self.meta["dates"].index(date), self.column(ticker)
+        close, returns = self._map("close.f32", "r+"), self._map("returns.f32", "r+")
+        close[row, col] = value
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns[row, col] = np.float64(value) / prev - 1.0
+        close.flush()
+        returns.flush()
+        self.meta["last_close"][ticker] = None if np.isnan(value) else value
+
+    def _collect(self, history: NaverHistory, tickers, after: dict):
+        """종목별로 after[종목](YYYYMMDD)보다 뒤 날짜의 종가만 모읍니다. 인덱스로 새 행만 읽습니다."""
+        closes = {}
+        for ticker in tickers:
+            since = after.get(ticker, 0)
+            if not since:
+                records = history.load(ticker, PERIOD_TYPE)
+            else:
+                keys = sorted(k for k in history.index(ticker, PERIOD_TYPE) if int(k) > since)
+                records = [history.get(ticker, PERIOD_TYPE, k) for k in keys]
+            closes[ticker] = {int(r["localDate"]): _close(r) for r in records}
+        return closes
+
+    def _append(self, history: NaverHistory, closes, tickers, last_close):
+        dates = sorted({d for per_ticker in closes.values() for d in per_ticker})
+        if not dates:
+            return 0
+        row_of = {d: i for i, d in enumerate(dates)}
+        block = np.full((len(dates), len(tickers)), np.nan, dtype=np.float64)
+        for j, ticker in enumerate(tickers):
+            for d, value in closes.get(ticker, {}).items():
+                block[row_of[d], j] = value
+
+        # 직전 종가 (기존 행렬의 마지막 값) 뒤에 붙여서 수익률 계산. 빈 날은 직전 종가를 이어 씀
+        prev = np.array([last_close.get(t, np.nan) for t in tickers], dtype=np.float64)
+        filled = np.vstack([prev, block])
+        valid = ~np.isnan(filled)
+        idx = np.where(valid, np.arange(len(filled))[:, None], 0)
+        np.maximum.accumulate(idx, axis=0, out=idx)
+        carried = np.take_along_axis(filled, idx, axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = np.where(np.isnan(block), np.nan, block / carried[:-1] - 1.0)
+
+        os.makedirs(self.root, exist_ok=True)
+        with open(self._path("returns.f32"), "ab") as f:
+            f.write(returns.astype(DTYPE).tobytes())
+        with open(self._path("close.f32"), "ab") as f:
+            f.write(block.astype(DTYPE).tobytes())
+        last_date = self._last_dates()
+        for ticker, per_ticker in closes.items():
+            if per_ticker:
+                last_date[ticker] = max(per_ticker)
+        self.meta["dates"].extend(dates)
+        self.meta["last_close"] = {t: (None if np.isnan(v) else float(v)) for t, v in zip(tickers, carried[-1])}
+        self.meta["last_date"] = last_date
+        read = self.meta.setdefault("read", {})
+        for ticker, per_ticker in closes.items():
+            if per_ticker:
+                read[ticker] = self._fingerprint(history, ticker, last_date[ticker])
+        self._write_meta()
+        return len(dates)
+
+    def build(self, history: NaverHistory, tickers) -> int:
+        """행렬을 처음부터 다시 만듭니다. (종목을 추가/삭제할 때)"""
+        tickers = list(dict.fromkeys(tickers))
+        for name in ("returns.f32", "close.f32"):
+            try:
+                os.remove(self._path(name))
+            except FileNotFoundError:
+                pass
+        self.meta = {"tickers": tickers, "dates": [], "last_close": {}, "last_date": {}, "read": {}}
+        return self._append(history, self._collect(history, tickers, {}), tickers, {})
+
+    def update(self, history: NaverHistory) -> int:
+        """
+        종목마다 이력에서 마지막으로 읽은 날짜 이후의 행만 모아 덧붙입니다.
+        어떤 종목의 이력이 늦게 채워져 행렬 마지막 날짜 이전 날짜가 들어오면
+        그 뒤 수익률이 모두 바뀌므로 build로 다시 만듭니다.
+        이미 읽은 행이 나중에 바뀌었는지는 이력 인덱스의 crc로 확인합니다. 종목의 마지막으로 읽은 행만
+        바뀌었으면(장중 일봉 확정 등) 그 칸만 고쳐 쓰고, 그보다 앞 행이 바뀌었으면 build로 다시 만듭니다.
+        결과는 항상 build와 같습니다.
+
+        Returns:
+            int: 추가된 날짜 수
+        """
+        if not self.tickers:
+            return 0
+        last_dates = self._last_dates()
+        read = self.meta.get("read")
+        revised = []
+        rebuild = read is None  # crc를 기록하기 전의 예전 meta
+        for ticker, last in ([] if rebuild else last_dates.items()):
+            now = self._fingerprint(history, ticker, last)
+            if now == read.get(ticker):
+                continue
+            if read.get(ticker) is None or now[0] != read[ticker][0]:
+                rebuild = True
+                break
+            revised.append(ticker)
+        closes = {} if rebuild else self._collect(history, self.tickers, last_dates)
+        tail = self.meta["dates"][-1] if self.meta["dates"] else 0
+        if rebuild or any(d <= tail for per_ticker in closes.values() for d in per_ticker):
+            before = self.shape[0]
+            self.build(history, self.tickers)
+            return self.shape[0] - before
+
+        for ticker in revised:
+            self._revise(history, ticker, last_dates[ticker])
+            read[ticker] = self._fingerprint(history, ticker, last_dates[ticker])
+        if revised:
+            self._write_meta()
+        last_close = {t: v for t, v in self.meta["last_close"].items() if v is not None}
+        return self._append(history, closes, self.tickers, last_close)
+
+    # ---------- 분석 ----------
+    def window(self, window: int | None = None, end: int | None = None):
+        """최근 window개 날짜의 수익률 (float64 복사본). end를 주면 그 날짜(YYYYMMDD)까지."""
+        stop = self.shape[0] if end is None else int(np.searchsorted(self.dates, end, side="right"))
+        start = 0 if window is None else max(0, stop - window)
+        return np.asarray(self.returns[start:stop], dtype=np.float64)
+
+    def index_returns(self, index: str | None = None, block=None):
+        """지수 수익률: index 종목(예: KODEX 200 '069500')의 열, 생략하면 종목 동일가중 평균."""
+        block = self.returns if block is None else block
+        if index is not None:
+            return np.asarray(block[:, self.column(index)], dtype=np.float64)
+        with np.errstate(invalid="ignore"):
+            counts = (~np.isnan(block)).sum(axis=1)
+            return np.where(counts > 0, np.nansum(block, axis=1, dtype=np.float64) / np.maximum(counts, 1), np.nan)
+
+    def correlation(self, window: int = 60, min_periods: int = 20):
+        """
+        최근 window일 수익률의 종목 간 상관계수 행렬 (종목 수 × 종목 수).
+        둘 다 값이 있는 날만 쓰는(pairwise) 방식을 행렬 곱으로 한 번에 계산합니다.
+        """
+        x = self.window(window)
+        mask = (~np.isnan(x)).astype(np.float64)
+        x = np.nan_to_num(x)
+        n = mask.T @ mask
+        sx = x.T @ mask           # sx[i, j] = j도 값이 있는 날의 i 합
+        sxx = (x * x).T @ mask
+        sxy = x.T @ x
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = sxy / n - (sx / n) * (sx.T / n)
+            var_i = sxx / n - (sx / n) ** 2
+            corr = cov / np.sqrt(var_i * var_i.T)
+        corr[n < min_periods] = np.nan
+        return corr
+
+    def rolling_beta(self, window: int = 60, index: str | None = None, min_periods: int = 20):
+        """
+        날짜마다 직전 window일 기준 종목별 지수 대비 베타 (날짜 수 × 종목 수).
+        누적합 차분으로 모든 날짜/종목을 한 번에 계산합니다.
+        """
+        x = np.asarray(self.returns, dtype=np.float64)
+        m = self.index_returns(index, x)
+        mask = ~np.isnan(x) & ~np.isnan(m)[:, None]
+        x = np.where(mask, x, 0.0)
+        mm = np.where(mask, m[:, None], 0.0)
+
+        def rolling(values):
+            c = np.cumsum(values, axis=0)
+            c[window:] = c[window:] - c[:-window].copy()
+            return c
+
+        n = rolling(mask.astype(np.float64))
+        sx, sm, sxm, smm = rolling(x), rolling(mm), rolling(x * mm), rolling(mm * mm)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = sxm / n - sx * sm / n ** 2
+            var = smm / n - (sm / n) ** 2
+            beta = cov / var
+        beta[n < min_periods] = np.nan
+        return beta
+
+    def top_movers(self, date: int | None = None, k: int = 10):
+        """해당 날짜(생략하면 마지막 날짜)의 상승/하락 상위 k개 [(종목, 수익률), ...]."""
+        row = -1 if date is None else int(np.searchsorted(self.dates, date))
+        if date is not None and (row >= self.shape[0] or self.dates[row] != date):
+            raise ValueError(f"행렬에 없는 날짜입니다: {date}")
+        r = np.asarray(self.returns[row], dtype=np.float64)
+        valid = np.nonzero(~np.isnan(r))[0]
+        order = valid[np.argsort(r[valid])]
+        pick = lambda cols: [(self.tickers[c], float(r[c])) for c in cols]
+        return {"date": int(self.dates[row]), "gainers": pick(order[::-1][:k]), "losers": pick(order[:k])}
+
+    def sector_returns(self, sectors: dict, window: int | None = None):
+        """
+        업종별 동일가중 평균 수익률 (날짜 수 × 업종 수).
+
+        Args:
+            sectors (dict): 종목 코드 → 업종 이름 (없는 종목은 제외)
+
+        Returns:
+            tuple: (업종 이름 목록, 행렬)
+        """
+        names = sorted(set(sectors.values()))
+        group = np.zeros((len(self.tickers), len(names)))
+        for j, ticker in enumerate(self.tickers):
+            if ticker in sectors:
+                group[j, names.index(sectors[ticker])] = 1.0
+        x = self.window(window)
+        mask = ~np.isnan(x)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return names, (np.where(mask, x, 0.0) @ group) / (mask @ group)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="날짜 × 종목 수익률 행렬 (메모리 매핑)")
+    parser.add_argument("command", choices=["build", "update", "movers", "corr", "beta"])
+    parser.add_argument("--codes", nargs="+", default=None, help="build: 종목 코드 목록 (생략하면 이력 폴더 전체)")
+    parser.add_argument("--history", default=HISTORY_ROOT)
+    parser.add_argument("--root", default=DEFAULT_ROOT)
+    parser.add_argument("--window", type=int, default=60)
+    parser.add_argument("--index", default=None, help="베타 기준 종목 (생략하면 동일가중 평균)")
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    history = NaverHistory(args.history)
+    matrix = ReturnsMatrix(args.root)
+    if args.command == "build":
+        codes = args.codes or sorted(
+            name[:-len(f"_{PERIOD_TYPE}.idx")] for name in os.listdir(args.history)
+            if name.endswith(f"_{PERIOD_TYPE}.idx"))
+        print(f"{matrix.build(history, codes)}일 × {len(codes)}종목 → {args.root}/")
+    elif args.command == "update":
+        print(f"{matrix.update(history)}일 추가 (총 {matrix.shape[0]}일 × {matrix.shape[1]}종목)")
+    elif args.command == "movers":
+        print(json.dumps(matrix.top_movers(k=args.k), ensure_ascii=False, indent=2))
+    elif args.command == "corr":
+        corr = matrix.correlation(args.window)
+        pairs = [(corr[i, j], matrix.tickers[i], matrix.tickers[j])
+                 for i in range(len(corr)) for j in range(i + 1, len(corr)) if not np.isnan(corr[i, j])]
+        for value, a, b in sorted(pairs, reverse=True)[:args.k]:
+            print(f"{a} - {b}: {value:.3f}")
+    elif args.command == "beta":
+        beta = matrix.rolling_beta(args.window, args.index)[-1]
+        for ticker, value in sorted(zip(matrix.tickers, beta.tolist()), key=lambda p: -np.nan_to_num(p[1]))[:args.k]:
+            print(f"{ticker}: {value:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,46 +1,193 @@
 import os
+import sys
 import json
+import time
+import argparse
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+import requests
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from transport import default_transport
+from trending_archive import DEFAULT_ROOT as ARCHIVE_ROOT, TrendingArchive
+from trending_history import DEFAULT_ROOT as HISTORY_ROOT, TIME_FORMAT, TrendingHistory, chart_name
+
+PAGE_SIZE = 50        # videos.list 한 번에 받을 수 있는 최대 개수
+MAX_WORKERS = 8       # 지역/카테고리 동시 요청 수
+# 공용 Transport가 재시도 후에도 실패하면 그대로 올리는 연결 오류/타임아웃 (HttpError와 같이 처리)
+TRANSPORT_ERRORS = (requests.RequestException,)
+
+_clients = {}         # API 키 → (youtube 서비스, videos 리소스)
+_clients_lock = threading.Lock()
+
+
+def youtube_client(api_key):
+    """
+    API 키별로 프로세스에서 한 번만 만드는 YouTube 클라이언트를 돌려줍니다.
+
+    build()와 youtube.videos()는 호출할 때마다 디스커버리 문서로 메서드를 새로 만들기 때문에
+    get_trending_videos를 부를 때마다 만들면 그만큼 느려집니다. 라이브러리에 들어 있는 정적
+    디스커버리 문서를 쓰고(네트워크 요청 없음), 요청은 스레드 안전한 공용 Transport로 보내므로
+    여러 작업 스레드가 같은 클라이언트를 같이 써도 됩니다.
+
+    Returns:
+        tuple: (youtube 서비스, videos 리소스)
+    """
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            youtube = build('youtube', 'v3', developerKey=api_key, http=default_transport().httplib2(),
+                            static_discovery=True, cache_discovery=False)
+            client = _clients[api_key] = (youtube, youtube.videos())
+        return client
+
+
 def get_trending_videos(api_key, region_code="KR", category_id=None, max_results=50):
     """
     YouTube API를 사용하여 특정 지역의 인기 급상승 동영상을 가져옵니다.
+    max_results가 50보다 크면 nextPageToken을 따라 다음 페이지까지 받습니다 (인기 차트는 보통 최대 200개).
     
     Args:
         api_key (str): YouTube Data API v3 키
         region_code (str): 국가 코드 (기본값: 'KR' for Korea)
         category_id (str, optional): 비디오 카테고리 ID
-        max_results (int): 가져올 최대 결과 수 (최대 50)
+        max_results (int): 가져올 최대 결과 수 (None이면 차트 끝까지)
     
     Returns:
-        list: 인기 급상승 동영상 목록
+        list: 인기 급상승 동영상 목록 (차트 순위 순). 중간 페이지에서 API 오류나 연결 오류가 나면
+              그 전까지 받은 목록
     """
+    items = []
     try:
-        # YouTube API 클라이언트 생성
-        youtube = build('youtube', 'v3', developerKey=api_key)
+        # 캐시된 YouTube API 클라이언트 (요청은 공용 Transport로: keep-alive 연결 재사용, gzip, 재시도)
+        _, videos = youtube_client(api_key)
         
         # videos.list 요청 파라미터 설정
         request_params = {
             'part': 'snippet,contentDetails,statistics',
             'chart': 'mostPopular',
             'regionCode': region_code,
-            'maxResults': max_results
         }
         
         # 카테고리 ID가 제공된 경우 파라미터에 추가
         if category_id:
             request_params['videoCategoryId'] = category_id
             
-        # API 요청 실행
-        request = youtube.videos().list(**request_params)
-        response = request.execute()
+        # API 요청 실행 (페이지 단위)
+        page_token = None
+        while max_results is None or len(items) < max_results:
+            remaining = PAGE_SIZE if max_results is None else max_results - len(items)
+            request = videos.list(maxResults=min(PAGE_SIZE, remaining), pageToken=page_token,
+                                            **request_params)
+            response = request.execute()
+            items.extend(response.get('items', []))
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
         
-        return response.get('items', [])
+        return items
     
     except HttpError as e:
-        print(f'YouTube API 오류 발생: {e}')
-        return []
+        print(f'YouTube API 오류 발생 ({region_code}, 카테고리 {category_id}): {e}')
+        return items
+    except TRANSPORT_ERRORS as e:
+        # 재시도 후에도 연결이 안 되면 이 차트만 받은 데까지 돌려줌 (다른 지역 결과는 그대로)
+        print(f'YouTube API 연결 오류 ({region_code}, 카테고리 {category_id}): {e}')
+        return items
+
+def get_trending_charts(api_key, region_codes, category_ids=None, max_results=None, workers=MAX_WORKERS):
+    """
+    여러 지역 × 카테고리의 인기 급상승 차트를 스레드 풀로 동시에 가져옵니다.
+    
+    Args:
+        api_key (str): YouTube Data API v3 키
+        region_codes (list): 국가 코드 목록 (예: ['KR', 'US', 'JP'])
+        category_ids (list, optional): 카테고리 ID 목록 (생략하면 전체 차트)
+        max_results (int, optional): 차트별 최대 결과 수 (None이면 차트 끝까지)
+        workers (int): 동시 요청 수
+    
+    Returns:
+        dict: {(지역 코드, 카테고리 ID 또는 None): 동영상 목록 (차트 순위 순)}
+    """
+    categories = list(category_ids) if category_ids else [None]
+    jobs = [(region, category) for region in region_codes for category in categories]
+
+    def run(job):
+        return get_trending_videos(api_key, region_code=job[0], category_id=job[1], max_results=max_results)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(run, jobs))
+    return dict(zip(jobs, results))
+
+def merge_charts(charts, region_codes):
+    """
+    get_trending_charts 결과를 지역별로 합칩니다. 카테고리 순서대로 이어 붙이고
+    같은 동영상은 처음 나온 것만 남깁니다.
+    """
+    merged = {region: [] for region in region_codes}
+    seen = {region: set() for region in region_codes}
+    for (region, _), items in charts.items():
+        for item in items:
+            if item['id'] not in seen[region]:
+                seen[region].add(item['id'])
+                merged[region].append(item)
+    return merged
+
+def get_trending_batch(api_key, region_codes, category_ids=None, max_results=None, workers=MAX_WORKERS):
+    """
+    여러 지역 × 카테고리의 인기 급상승 동영상을 동시에 가져와 지역별로 합칩니다.
+    
+    Returns:
+        dict: {지역 코드: 동영상 목록}. 카테고리가 여러 개면 카테고리 순서대로 이어 붙이고
+              같은 동영상은 처음 나온 것만 남깁니다.
+    """
+    charts = get_trending_charts(api_key, region_codes, category_ids, max_results, workers)
+    return merge_charts(charts, region_codes)
+
+def extract_video_info(video):
+    """API 응답의 동영상 하나에서 저장할 필드만 뽑습니다."""
+    return {
+        'id': video['id'],
+        'title': video['snippet']['title'],
+        'channelTitle': video['snippet']['channelTitle'],
+        'publishedAt': video['snippet']['publishedAt'],
+        'thumbnail': video['snippet']['thumbnails']['high']['url'],
+        'viewCount': video['statistics'].get('viewCount', '0'),
+        'likeCount': video['statistics'].get('likeCount', '0'),
+        'commentCount': video['statistics'].get('commentCount', '0'),
+        'duration': video['contentDetails']['duration']
+    }
+
+def benchmark_client(calls=200):
+    """
+    요청 객체를 만들기까지의 클라이언트 비용을 비교합니다 (네트워크 요청 없음).
+    - 매번 build(): 예전 get_trending_videos처럼 호출마다 클라이언트를 새로 만듦
+    - youtube_client(): 캐시된 클라이언트 재사용
+    """
+    params = {'part': 'snippet,contentDetails,statistics', 'chart': 'mostPopular', 'regionCode': 'KR',
+              'maxResults': PAGE_SIZE}
+    http = default_transport().httplib2()
+
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        build('youtube', 'v3', developerKey='benchmark', http=http).videos().list(**params)
+    per_build = (time.perf_counter() - t0) / calls
+
+    _clients.pop('benchmark', None)
+    t0 = time.perf_counter()
+    youtube_client('benchmark')[1].list(**params)
+    first = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        youtube_client('benchmark')[1].list(**params)
+    per_cached = (time.perf_counter() - t0) / calls
+
+    print(f'호출마다 build(): {per_build * 1000:.2f}ms/회')
+    print(f'캐시된 클라이언트: 첫 호출 {first * 1000:.2f}ms, 이후 {per_cached * 1000:.3f}ms/회 '
+          f'({per_build / per_cached:.0f}배)')
 
 def save_to_json(data, filename='trending_videos.json'):
     """
@@ -66,31 +213,62 @@ def main():
         print("API 키를 설정해주세요.")
         return
     
-    # 인기 급상승 동영상 가져오기
-    trending_videos = get_trending_videos(api_key, max_results=50)
+    parser = argparse.ArgumentParser(description="유튜브 인기 급상승 동영상 저장")
+    parser.add_argument('--regions', nargs='+', default=['KR'], help="국가 코드 (예: KR US JP)")
+    parser.add_argument('--categories', nargs='*', default=None, help="카테고리 ID (예: 10 20)")
+    parser.add_argument('--max-results', type=int, default=50, help="지역별 최대 개수 (0이면 차트 끝까지)")
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS)
+    parser.add_argument('--history', default=HISTORY_ROOT, help="스냅샷 이력 폴더 (순위/조회수 변화 기록)")
+    parser.add_argument('--no-history', action='store_true', help="이력에 덧붙이지 않음")
+    parser.add_argument('--archive', default=ARCHIVE_ROOT, help="컬럼형 아카이브 폴더 (숫자/기간/게시 시각을 타입 컬럼으로)")
+    parser.add_argument('--no-archive', action='store_true', help="아카이브에 덧붙이지 않음")
+    parser.add_argument('--benchmark', type=int, default=0, metavar='N',
+                        help="API 호출 없이 클라이언트 생성 비용만 N회 측정하고 종료")
+    args = parser.parse_args()
+    if args.benchmark:
+        benchmark_client(args.benchmark)
+        return
+    max_results = args.max_results or None
+    
+    history = None if args.no_history else TrendingHistory(args.history)
+    archive = None if args.no_archive else TrendingArchive(args.archive)
+    
+    # 지역 하나면 기존처럼 trending_videos.json (목록), 여러 지역이면 trending_by_region.json ({지역: 목록})
+    if len(args.regions) == 1 and not args.categories:
+        # 인기 급상승 동영상 가져오기
+        charts = {(args.regions[0], None): get_trending_videos(api_key, region_code=args.regions[0],
+                                                               max_results=max_results)}
+    else:
+        charts = get_trending_charts(api_key, args.regions, args.categories, max_results, args.workers)
     
-    if not trending_videos:
+    # 필요한 정보만 추출 (차트별), 저장 파일은 지역별로 합친 목록
+    chart_data = {chart: [extract_video_info(video) for video in videos] for chart, videos in charts.items()}
+    video_data = merge_charts(chart_data, args.regions)
+    if not any(video_data.values()):
         print("인기 급상승 동영상을 가져오지 못했습니다.")
         return
     
-    # 필요한 정보만 추출
-    video_data = []
-    for video in trending_videos:
-        video_info = {
-            'id': video['id'],
-            'title': video['snippet']['title'],
-            'channelTitle': video['snippet']['channelTitle'],
-            'publishedAt': video['snippet']['publishedAt'],
-            'thumbnail': video['snippet']['thumbnails']['high']['url'],
-            'viewCount': video['statistics'].get('viewCount', '0'),
-            'likeCount': video['statistics'].get('likeCount', '0'),
-            'commentCount': video['statistics'].get('commentCount', '0'),
-            'duration': video['contentDetails']['duration']
-        }
-        video_data.append(video_info)
-    
     # JSON 파일로 저장
-    save_to_json(video_data)
+    if len(args.regions) == 1:
+        save_to_json(video_data[args.regions[0]])
+    else:
+        for region, videos in video_data.items():
+            print(f'{region}: {len(videos)}개')
+        save_to_json(video_data, 'trending_by_region.json')
+    
+    # 스냅샷 이력에 덧붙이고 직전 스냅샷과 비교, 아카이브에는 타입 컬럼으로 덧붙임 (같은 스냅샷 시각)
+    # 카테고리를 이어 붙인 목록은 순위가 의미 없으므로 차트(지역 × 카테고리)별로 따로 기록 ('KR', 'KR-10')
+    ts = datetime.now(timezone.utc).strftime(TIME_FORMAT)
+    for (region, category), videos in chart_data.items():
+        if not videos:
+            continue
+        name = chart_name(region, category)
+        if history is not None:
+            diff = history.append(name, videos, ts)
+            print(f"{name} 이력: 새로 진입 {len(diff['entries'])}개, 이탈 {len(diff['dropouts'])}개 "
+                  f"→ {history.data_path(name)}")
+        if archive is not None:
+            archive.append(name, videos, ts)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,280 @@
+# enrich.py
+# 차트에서 빠진 동영상까지 통계를 계속 갱신하는 할당량(quota) 인식 배치 작업
+# - trending_history에 한 번이라도 나온 동영상 id를 모두 관심 목록(watchlist)에 보관
+# - videos.list(id=...)로 한 번에 최대 50개씩 statistics/contentDetails 갱신 (동영상별 호출 없음)
+#   videos.list는 part/개수와 상관없이 호출 1회 = 1 unit이라 50개를 꽉 채울수록 unit당 추적 수가 많음
+# - 우선순위: 최근(게시 후 경과 시간이 짧을수록) × 속도(시간당 조회수) × 마지막 갱신 후 경과 시간
+# - 하루 할당량 예산(태평양 시간 자정에 초기화)을 넘지 않음. quotaExceeded를 받으면 그날은 중단
+# - 배치마다 관심 목록을 저장하므로 도중에 연결이 끊겨도 이미 반영한 갱신(과 쓴 할당량)은 남음
+#
+# API 키는 환경 변수 YOUTUBE_API_KEY에서 읽습니다.
+#
+# 사용 예:
+#   python enrich.py --budget 500                    # 오늘 남은 예산 안에서 우선순위 높은 순으로 갱신
+#   python enrich.py --budget 500 --dry-run          # 호출 없이 이번에 갱신할 id 수만 확인
+
+import argparse
+import heapq
+import json
+import math
+import os
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from googleapiclient.errors import HttpError
+
+from download import PAGE_SIZE, TRANSPORT_ERRORS, youtube_client
+from trending_archive import parse_duration, to_epoch
+from trending_history import DEFAULT_ROOT as HISTORY_ROOT, TrendingHistory
+
+DEFAULT_ROOT = "enrich"
+DAILY_BUDGET = 1000          # 이 작업에 쓸 하루 할당량 (unit)
+CALL_COST = 1                # videos.list 1회 비용
+HALF_LIFE_HOURS = 48.0       # 게시 후 이 시간마다 우선순위 절반
+MIN_REFRESH_HOURS = 1.0      # 이보다 최근에 갱신한 동영상은 건너뜀
+QUOTA_TZ = ZoneInfo("America/Los_Angeles")  # YouTube 할당량은 태평양 시간 자정에 초기화
+FIELDS = "items(id,statistics,contentDetails/duration)"  # 응답에서 필요한 필드만 (할당량은 같고 전송량만 줄어듦)
+
+
+class QuotaLedger:
+    """
+    하루 할당량 사용량 기록 ({root}/quota.json).
+
+    Args:
+        path (str): 기록 파일 경로
+        budget (int): 하루 예산 (unit)
+    """
+
+    def __init__(self, path: str, budget: int = DAILY_BUDGET):
+        self.path = path
+        self.budget = budget
+        self.day = None
+        self.used = 0
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.day, self.used = data["day"], data["used"]
+        except FileNotFoundError:
+            pass
+        self._roll()
+
+    def _roll(self):
+        today = datetime.now(QUOTA_TZ).strftime("%Y-%m-%d")
+        if self.day != today:
+            self.day, self.used = today, 0
+
+    def remaining(self) -> int:
+        self._roll()
+        return max(0, self.budget - self.used)
+
+    def charge(self, units: int = CALL_COST):
+        self._roll()
+        self.used += units
+        self.save()
+
+    def exhaust(self):
+        """quotaExceeded를 받았을 때: 오늘 남은 예산을 0으로."""
+        self._roll()
+        self.used = max(self.used, self.budget)
+        self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"day": self.day, "used": self.used}, f)
+        os.replace(tmp, self.path)
+
+
+class Watchlist:
+    """
+    지금까지 본 모든 동영상과 마지막으로 아는 통계.
+
+    파일 구성 (root/):
+        watchlist.json  {id: {published, first_seen, last_seen, refreshed, views, likes, comments, duration,
+                              velocity, gone}} (시각은 epoch 초), 지역별 이력 커서
+        stats.ndjson    갱신 결과 1건당 1줄 {id, ts, views, likes, comments, duration} (숫자는 정수)
+    """
+
+    def __init__(self, root: str = DEFAULT_ROOT):
+        self.root = root
+        self.videos = {}
+        self.cursors = {}  # 지역 → 마지막으로 읽은 trending_history 스냅샷 시각
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.videos, self.cursors = data["videos"], data["cursors"]
+        except FileNotFoundError:
+            pass
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.root, "watchlist.json")
+
+    @property
+    def stats_path(self) -> str:
+        return os.path.join(self.root, "stats.ndjson")
+
+    def save(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"videos": self.videos, "cursors": self.cursors}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    # ---------- 갱신 ----------
+    def _update(self, video_id: str, now: int, views: int, likes: int, comments: int, duration: int):
+        entry = self.videos[video_id]
+        if entry["refreshed"] and now > entry["refreshed"]:
+            entry["velocity"] = max(0.0, (views - entry["views"]) / ((now - entry["refreshed"]) / 3600))
+        elif entry["published"] and now > entry["published"]:
+            entry["velocity"] = views / ((now - entry["published"]) / 3600)
+        entry.update(refreshed=now, views=views, likes=likes, comments=comments, duration=duration)
+
+    def observe(self, items, ts: str) -> int:
+        """
+        차트 스냅샷(video_info 목록)의 동영상을 목록에 넣고 통계를 갱신합니다.
+
+        Returns:
+            int: 새로 추가된 동영상 수
+        """
+        now = to_epoch(ts)
+        added = 0
+        for record in items:
+            entry = self.videos.get(record["id"])
+            if entry is None:
+                added += 1
+                entry = self.videos[record["id"]] = {
+                    "published": to_epoch(record.get("publishedAt")), "first_seen": now, "last_seen": now,
+                    "refreshed": 0, "views": 0, "likes": 0, "comments": 0, "duration": -1, "velocity": 0.0,
+                    "gone": False,
+                }
+            if now < entry["refreshed"]:
+                continue  # 이미 더 최근 통계가 있음
+            entry["last_seen"] = max(entry["last_seen"], now)
+            self._update(record["id"], now, int(record.get("viewCount") or 0), int(record.get("likeCount") or 0),
+                         int(record.get("commentCount") or 0), parse_duration(record.get("duration")))
+        return added
+
+    def sync_history(self, history: TrendingHistory) -> int:
+        """trending_history에서 지역별 커서 이후 스냅샷만 읽어 observe합니다."""
+        added = 0
+        regions = [name[:-len(".idx")] for name in os.listdir(history.root) if name.endswith(".idx")] \
+            if os.path.isdir(history.root) else []
+        for region in sorted(regions):
+            cursor = self.cursors.get(region)
+            for ts, items in history.snapshots(region, start=cursor):
+                if cursor is not None and ts <= cursor:
+                    continue
+                added += self.observe(items, ts)
+                self.cursors[region] = ts
+        return added
+
+    # ---------- 우선순위 ----------
+    def priority(self, entry: dict, now: int) -> float:
+        """최근성 × 속도 × 마지막 갱신 후 경과 시간. 갱신할 필요가 없으면 0."""
+        stale_hours = (now - entry["refreshed"]) / 3600
+        if entry["gone"] or stale_hours < MIN_REFRESH_HOURS:
+            return 0.0
+        age_hours = max(0.0, (now - entry["published"]) / 3600) if entry["published"] else 0.0
+        recency = 0.5 ** (age_hours / HALF_LIFE_HOURS)
+        return recency * math.log1p(entry["velocity"]) * stale_hours + 1e-9 * stale_hours
+
+    def pick(self, count: int, now: int):
+        """우선순위가 높은 동영상 id 최대 count개 (높은 순)."""
+        scored = ((self.priority(entry, now), video_id) for video_id, entry in self.videos.items())
+        return [video_id for score, video_id in heapq.nlargest(count, scored) if score > 0]
+
+    def apply(self, response_items, requested, now: int):
+        """videos.list 응답을 반영합니다. 요청했는데 응답에 없는 id(삭제/비공개)는 gone으로 표시."""
+        returned = set()
+        lines = []
+        for item in response_items:
+            stats, details = item.get("statistics", {}), item.get("contentDetails", {})
+            row = {"views": int(stats.get("viewCount") or 0), "likes": int(stats.get("likeCount") or 0),
+                   "comments": int(stats.get("commentCount") or 0),
+                   "duration": parse_duration(details.get("duration"))}
+            self._update(item["id"], now, **row)
+            returned.add(item["id"])
+            lines.append(json.dumps({"id": item["id"], "ts": now, **row}) + "\n")
+        for video_id in requested:
+            if video_id not in returned:
+                self.videos[video_id]["gone"] = True
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.stats_path, "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+        return len(returned)
+
+
+def refresh(api_key, watchlist: Watchlist, ledger: QuotaLedger, now: int | None = None, dry_run: bool = False):
+    """
+    남은 예산 안에서 우선순위 높은 동영상을 50개씩 묶어 갱신합니다.
+    배치를 반영할 때마다 관심 목록을 저장합니다 (stats.ndjson/할당량 기록과 어긋나지 않도록).
+
+    Returns:
+        dict: calls(호출 수), requested(요청 id 수), updated(응답 받은 수), gone(사라진 수)
+    """
+    now = now or int(time.time())
+    calls = ledger.remaining() // CALL_COST
+    ids = watchlist.pick(calls * PAGE_SIZE, now)
+    batches = [ids[i:i + PAGE_SIZE] for i in range(0, len(ids), PAGE_SIZE)]
+    result = {"calls": 0, "requested": 0, "updated": 0, "gone": 0}
+    if dry_run:
+        result.update(calls=len(batches), requested=len(ids))
+        return result
+
+    _, videos = youtube_client(api_key)
+    for batch in batches:
+        try:
+            response = videos.list(part="statistics,contentDetails", id=",".join(batch), maxResults=PAGE_SIZE,
+                                   fields=FIELDS).execute()
+        except HttpError as e:
+            ledger.charge()
+            if e.status_code == 403 and "quotaExceeded" in str(e):
+                print("할당량을 모두 썼습니다. 태평양 시간 자정 이후 다시 실행하세요.")
+                ledger.exhaust()
+                break
+            print(f"YouTube API 오류 발생: {e}")
+            continue
+        except TRANSPORT_ERRORS as e:
+            # 재시도 후에도 연결이 안 되면 여기서 중단 (요청이 도달했을 수 있으므로 할당량은 차감)
+            ledger.charge()
+            print(f"연결 오류로 중단합니다: {e}")
+            break
+        ledger.charge()
+        updated = watchlist.apply(response.get("items", []), batch, now)
+        watchlist.save()
+        result["calls"] += 1
+        result["requested"] += len(batch)
+        result["updated"] += updated
+        result["gone"] += len(batch) - updated
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="관심 동영상 통계 배치 갱신 (하루 할당량 예산 안에서)")
+    parser.add_argument("--root", default=DEFAULT_ROOT)
+    parser.add_argument("--history", default=HISTORY_ROOT, help="동영상 id를 모을 trending_history 폴더")
+    parser.add_argument("--budget", type=int, default=DAILY_BUDGET, help="하루 예산 (unit)")
+    parser.add_argument("--dry-run", action="store_true", help="API 호출 없이 갱신 대상만 계산")
+    args = parser.parse_args()
+
+    api_key = os.environ.get("YOUTUBE_API_KEY")
+    if not api_key and not args.dry_run:
+        parser.error("환경 변수 YOUTUBE_API_KEY를 설정하세요.")
+
+    watchlist = Watchlist(args.root)
+    added = watchlist.sync_history(TrendingHistory(args.history))
+    ledger = QuotaLedger(os.path.join(args.root, "quota.json"), args.budget)
+    print(f"관심 목록 {len(watchlist.videos)}개 (새로 {added}개), 오늘 남은 예산 {ledger.remaining()} unit")
+
+    result = refresh(api_key, watchlist, ledger, dry_run=args.dry_run)
+    watchlist.save()
+    per_unit = result["requested"] / result["calls"] if result["calls"] else 0
+    print(f"호출 {result['calls']}회, 요청 {result['requested']}개, 갱신 {result['updated']}개, "
+          f"사라짐 {result['gone']}개 (unit당 {per_unit:.1f}개), 오늘 사용 {ledger.used}/{ledger.budget} unit")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,11 +6,14 @@
 # Windows 전용
 
 import os, sys, time, json, socket, subprocess, shutil
-import urllib.request
 from typing import Optional, List, Dict
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+from transport import default_transport
+
 # --- 외부 모듈에서 함수 import (파일명/함수명은 그대로 사용) ---
-from download import get_trending_videos
+from download import extract_video_info, get_trending_videos
+from trending_history import DEFAULT_ROOT as HISTORY_ROOT, TrendingHistory, fastest_risers
 from posts_helper import generate_twitter_posts  # import.py를 posts_helper.py로 이름 변경해 주세요
 
 # --- Selenium ---
@@ -27,6 +30,7 @@ REGION_CODE = "KR"
 MAX_RESULTS = 50
 POST_TOP_N = 10
 POST_DELAY_SEC = 3
+POST_ORDER = "chart"   # "chart": 차트 순위 순, "risers": 직전 스냅샷 대비 시간당 조회수 증가가 큰 순
 
 # -----------------------------
 # 경로/도움 함수
@@ -72,11 +76,14 @@ def find_chromedriver_exe() -> str:
     return "chromedriver"
 
 def fetch_json(url: str, timeout=0.6):
+    # 포트 확인은 호출 측에서 반복하므로 재시도 없이 한 번만 (연결은 공용 Transport가 재사용)
     try:
-        with urllib.request.urlopen(url, timeout=timeout) as r:
-            return r.status, r.read().decode("utf-8", "ignore")
+        r = default_transport().get(url, timeout=timeout, retries=0)
     except Exception as e:
         return None, str(e)
+    if r.status_code >= 400:  # urlopen처럼 4xx/5xx는 실패로 취급
+        return None, f"HTTP Error {r.status_code}: {r.reason}"
+    return r.status_code, r.content.decode("utf-8", "ignore")
 
 def is_debug_port_ready(port: int, timeout_sec: float = 5.0) -> bool:
     hosts = ["127.0.0.1", "localhost", "::1"]
@@ -310,6 +317,13 @@ def main():
 
     items = get_trending_videos(api_key, region_code=REGION_CODE, max_results=MAX_RESULTS)
     print(items)
+
+    # 스냅샷 이력에 기록 (직전 실행과 비교한 순위/조회수 변화)
+    if items:
+        diff = TrendingHistory(HISTORY_ROOT).append(REGION_CODE, [extract_video_info(v) for v in items])
+        if POST_ORDER == "risers":
+            order = {v["id"]: i for i, v in enumerate(fastest_risers(diff, len(items)))}
+            items = sorted(items, key=lambda v: order.get(v["id"], len(order)))
     simple_items = []
     for v in items:
         simple_items.append({
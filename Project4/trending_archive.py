@@ -0,0 +1,462 @@
+# trending_archive.py
+# 인기 급상승 스냅샷의 컬럼형 타입 아카이브
+# - video_info의 문자열 필드를 저장할 때 한 번만 파싱:
+#   viewCount/likeCount/commentCount → int64, duration("PT5H17M9S") → 초(int32), publishedAt → epoch 초(int64)
+# - channelTitle과 동영상 id는 사전(dictionary) 인코딩 → 행에는 int32 코드만 저장
+# - 컬럼마다 바이너리 파일 하나에 스냅샷 단위로 이어 쓰고(append), 읽을 때는 메모리 매핑
+#   → 몇 달치 시간별 스냅샷도 JSON 파싱 없이 수 ms에 열리고, 채널별 조회수 같은 집계는 numpy로 벡터화
+# - 여러 프로세스(download.py, --from-history, trend_automation)가 같은 지역에 써도 되도록
+#   append는 지역 폴더의 잠금 파일로 직렬화하고, 사전은 다른 프로세스가 덧붙인 항목을 다시 읽은 뒤 코드를 정함
+#
+# 사용 예:
+#   archive = TrendingArchive("trending_archive")
+#   archive.append("KR", [extract_video_info(v) for v in items])
+#   table = archive.load("KR")
+#   table.views_per_channel()                  # 마지막 스냅샷의 채널별 조회수 합
+#   table.column("view_count")[table.rows()]   # 마지막 스냅샷 조회수 (numpy 뷰)
+
+import argparse
+import contextlib
+import json
+import os
+import re
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from trending_history import TIME_FORMAT
+
+DEFAULT_ROOT = "trending_archive"
+
+# (컬럼 이름, dtype). ts는 스냅샷 시각(epoch 초), rank는 스냅샷 안 순위(1부터)
+COLUMNS = [
+    ("ts", "<i8"),
+    ("rank", "<i4"),
+    ("video", "<i4"),
+    ("channel", "<i4"),
+    ("view_count", "<i8"),
+    ("like_count", "<i8"),
+    ("comment_count", "<i8"),
+    ("duration", "<i4"),
+    ("published_at", "<i8"),
+]
+
+DURATION_RE = re.compile(r"^P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
+
+
+def parse_duration(value) -> int:
+    """ISO-8601 기간('PT5H17M9S', 'P1DT2H', 'P0D') → 초. 형식이 다르면(생방송 등) -1."""
+    match = DURATION_RE.match(value or "")
+    if not match:
+        return -1
+    weeks, days, hours, minutes, seconds = (int(g) if g else 0 for g in match.groups())
+    return (((weeks * 7 + days) * 24 + hours) * 60 + minutes) * 60 + seconds
+
+
+def to_epoch(value) -> int:
+    """'2025-10-14T07:00:08Z' (소수점 초 허용) → epoch 초. 없으면 0."""
+    if not value:
+        return 0
+    return int(datetime.strptime(value[:19], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc).timestamp())
+
+
+@contextlib.contextmanager
+def _locked(path: str):
+    """폴더 안 .lock 파일의 배타 잠금 (다른 프로세스의 쓰기가 끝날 때까지 대기)."""
+    with open(os.path.join(path, ".lock"), "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)  # 10초 동안 못 얻으면 OSError
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class _Dictionary:
+    """
+    값 ↔ int32 코드. {dir}/{name}.ndjson에 새 항목만 덧붙임 (줄 번호 = 코드).
+    key를 주면 값 전체 대신 key(값)으로 코드를 정합니다 (동영상: [id, 제목] 중 id).
+    """
+
+    def __init__(self, path: str, key=None):
+        self.path = path
+        self.key = key or (lambda value: value)
+        self.values = []
+        self.codes = {}
+        self.size = 0  # 지금까지 읽은(또는 쓴) 바이트 수. 완전한 줄까지만
+        self._pending = []
+        self.refresh()
+
+    def refresh(self):
+        """파일 크기가 마지막으로 읽은 위치와 다르면 다른 프로세스가 덧붙인 항목을 이어서 읽습니다."""
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return
+        if size == self.size:
+            return
+        if size < self.size:  # 파일이 새로 만들어짐
+            self.values, self.codes, self.size = [], {}, 0
+        with open(self.path, "rb") as f:
+            f.seek(self.size)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # 끊긴 쓰기의 꼬리 (flush 때 잘라냄)
+                self.size += len(line)
+                if line.strip():
+                    value = json.loads(line)
+                    self.codes[self.key(value)] = len(self.values)
+                    self.values.append(value)
+
+    def encode(self, value) -> int:
+        key = self.key(value)
+        code = self.codes.get(key)
+        if code is None:
+            code = self.codes[key] = len(self.values)
+            self.values.append(value)
+            self._pending.append(value)
+        return code
+
+    def flush(self):
+        if self._pending:
+            data = "".join(json.dumps(v, ensure_ascii=False) + "\n" for v in self._pending).encode("utf-8")
+            with open(self.path, "ab") as f:
+                f.truncate(self.size)  # 이전에 끊긴 쓰기의 꼬리 정리
+                f.seek(0, os.SEEK_END)
+                f.write(data)
+            self.size += len(data)
+            self._pending = []
+
+
+def _video_key(value):
+    return value[0]
+
+
+class TrendingTable:
+    """
+    지역 하나의 아카이브를 메모리 매핑해서 읽은 결과. 컬럼은 복사 없이 numpy 뷰로 제공됩니다.
+    사전(채널 이름, 동영상 id/제목)은 필요할 때만 읽습니다.
+    """
+
+    def __init__(self, path: str, count: int):
+        self.path = path
+        self.count = count
+        self.columns = {}
+        for name, dtype in COLUMNS:
+            file = os.path.join(path, f"{name}.bin")
+            if count:
+                self.columns[name] = np.memmap(file, dtype=dtype, mode="r", shape=(count,))
+            else:
+                self.columns[name] = np.empty(0, dtype=dtype)
+        self._channels = None
+        self._videos = None
+
+    def __len__(self):
+        return self.count
+
+    def column(self, name: str):
+        return self.columns[name]
+
+    @property
+    def channels(self):
+        """채널 코드 → 채널 이름."""
+        if self._channels is None:
+            self._channels = _Dictionary(os.path.join(self.path, "channels.ndjson")).values
+        return self._channels
+
+    @property
+    def videos(self):
+        """동영상 코드 → [id, 제목]."""
+        if self._videos is None:
+            self._videos = _Dictionary(os.path.join(self.path, "videos.ndjson"), _video_key).values
+        return self._videos
+
+    def snapshot_times(self):
+        """스냅샷 시각(epoch 초) 목록. 행이 시각 순이라 경계만 찾으면 됩니다."""
+        ts = self.columns["ts"]
+        if not len(ts):
+            return ts
+        return ts[np.flatnonzero(np.diff(ts, prepend=ts[0] - 1))]
+
+    def rows(self, start=None, end=None):
+        """
+        [start, end) 구간 스냅샷의 행 범위(slice). 둘 다 생략하면 마지막 스냅샷.
+        start/end는 epoch 초 또는 'YYYY-MM-DDTHH:MM:SSZ'.
+        """
+        ts = self.columns["ts"]
+        if not len(ts):
+            return slice(0, 0)
+        if start is None and end is None:
+            return slice(int(np.searchsorted(ts, ts[-1], side="left")), len(ts))
+        lo = 0 if start is None else int(np.searchsorted(ts, _as_epoch(start), side="left"))
+        hi = len(ts) if end is None else int(np.searchsorted(ts, _as_epoch(end), side="left"))
+        return slice(lo, hi)
+
+    def views_per_channel(self, rows=None, top: int | None = 20):
+        """
+        행 범위의 채널별 조회수 합 (np.bincount로 벡터화). 기본은 마지막 스냅샷.
+
+        Returns:
+            list: (채널 이름, 조회수 합) 내림차순
+        """
+        rows = self.rows() if rows is None else rows
+        channel = self.columns["channel"][rows]
+        if not len(channel):
+            return []
+        totals = np.bincount(channel, weights=self.columns["view_count"][rows].astype(np.float64))
+        order = np.argsort(totals)[::-1]
+        order = order[totals[order] > 0][:top]
+        return [(self.channels[i], int(totals[i])) for i in order]
+
+    def to_records(self, rows=None):
+        """행 범위를 download.py의 video_info와 같은 dict 목록으로 되돌립니다 (숫자 필드는 int)."""
+        rows = self.rows() if rows is None else rows
+        cols = {name: self.columns[name][rows] for name, _ in COLUMNS}
+        records = []
+        for i in range(len(cols["ts"])):
+            video_id, title = self.videos[int(cols["video"][i])]
+            records.append({
+                "ts": datetime.fromtimestamp(int(cols["ts"][i]), tz=timezone.utc).strftime(TIME_FORMAT),
+                "rank": int(cols["rank"][i]),
+                "id": video_id,
+                "title": title,
+                "channelTitle": self.channels[int(cols["channel"][i])],
+                "publishedAt": _from_epoch(int(cols["published_at"][i])),
+                "viewCount": int(cols["view_count"][i]),
+                "likeCount": int(cols["like_count"][i]),
+                "commentCount": int(cols["comment_count"][i]),
+                "duration": int(cols["duration"][i]),
+            })
+        return records
+
+
+def _from_epoch(value: int):
+    """epoch 초 → 'YYYY-MM-DDTHH:MM:SSZ'. 0(저장할 때 값이 없었음)은 None."""
+    return datetime.fromtimestamp(value, tz=timezone.utc).strftime(TIME_FORMAT) if value else None
+
+
+def _as_epoch(value) -> int:
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return to_epoch(value)
+
+
+class TrendingArchive:
+    """
+    지역별 컬럼형 아카이브.
+
+    파일 구성 (root/{region}/):
+        {column}.bin      COLUMNS의 컬럼마다 리틀 엔디언 고정 폭 배열 (행 = 스냅샷 × 순위, 시각 순)
+        channels.ndjson   채널 이름 사전 (줄 번호 = 코드)
+        videos.ndjson     [동영상 id, 처음 본 제목] 사전 (줄 번호 = 코드, id로 찾음)
+        schema.json       행 수/스냅샷 수/마지막 시각/컬럼 dtype. 컬럼 파일보다 나중에 씀
+                          (중간에 끊기면 schema의 행 수를 넘는 꼬리는 다음 쓰기 때 잘라냄)
+    """
+
+    def __init__(self, root: str = DEFAULT_ROOT):
+        self.root = root
+        self._dictionaries = {}  # region → (channels, videos)
+
+    def path(self, region: str) -> str:
+        return os.path.join(self.root, region)
+
+    def schema(self, region: str) -> dict:
+        try:
+            with open(os.path.join(self.path(region), "schema.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"count": 0, "snapshots": 0, "last": None}
+
+    def _dictionary(self, region: str):
+        """지역의 (채널, 동영상) 사전. 다른 프로세스가 덧붙인 항목이 있으면 다시 읽어 옵니다."""
+        if region not in self._dictionaries:
+            path = self.path(region)
+            self._dictionaries[region] = (_Dictionary(os.path.join(path, "channels.ndjson")),
+                                          _Dictionary(os.path.join(path, "videos.ndjson"), _video_key))
+        for dictionary in self._dictionaries[region]:
+            dictionary.refresh()
+        return self._dictionaries[region]
+
+    def append(self, region: str, items, ts: str | None = None) -> int:
+        """
+        스냅샷 하나를 파싱해서 컬럼 끝에 덧붙입니다.
+
+        Args:
+            region (str): 국가 코드
+            items (list): 순위 순 video_info 목록 (download.extract_video_info 결과)
+            ts (str, optional): 스냅샷 시각 'YYYY-MM-DDTHH:MM:SSZ'. 생략하면 현재 UTC
+
+        Returns:
+            int: 추가한 행 수
+
+        Raises:
+            ValueError: ts가 마지막 스냅샷보다 이르거나 같은 경우
+        """
+        ts = ts or datetime.now(timezone.utc).strftime(TIME_FORMAT)
+        path = self.path(region)
+        os.makedirs(path, exist_ok=True)
+        with _locked(path):  # 다른 프로세스의 append와 겹치지 않게 (사전 코드/행 수를 같이 정함)
+            return self._append(region, list(items), ts)
+
+    def _append(self, region: str, items, ts: str) -> int:
+        schema = self.schema(region)
+        if schema["last"] is not None and ts <= schema["last"]:
+            raise ValueError(f"{region}: 스냅샷 시각 {ts}이 마지막 스냅샷({schema['last']})보다 늦어야 합니다.")
+        path = self.path(region)
+        channels, videos = self._dictionary(region)
+
+        n = len(items)
+        columns = {
+            "ts": np.full(n, to_epoch(ts), dtype="<i8"),
+            "rank": np.arange(1, n + 1, dtype="<i4"),
+            "video": np.fromiter((videos.encode([v["id"], v.get("title", "")]) for v in items), dtype="<i4",
+                                 count=n),
+            "channel": np.fromiter((channels.encode(v.get("channelTitle") or "") for v in items), dtype="<i4",
+                                   count=n),
+            "view_count": np.fromiter((int(v.get("viewCount") or 0) for v in items), dtype="<i8", count=n),
+            "like_count": np.fromiter((int(v.get("likeCount") or 0) for v in items), dtype="<i8", count=n),
+            "comment_count": np.fromiter((int(v.get("commentCount") or 0) for v in items), dtype="<i8", count=n),
+            "duration": np.fromiter((parse_duration(v.get("duration")) for v in items), dtype="<i4", count=n),
+            "published_at": np.fromiter((to_epoch(v.get("publishedAt")) for v in items), dtype="<i8", count=n),
+        }
+        # 사전을 먼저 기록해야 컬럼의 코드가 항상 사전 안에 있음
+        channels.flush()
+        videos.flush()
+        for name, dtype in COLUMNS:
+            with open(os.path.join(path, f"{name}.bin"), "ab") as f:
+                f.truncate(schema["count"] * np.dtype(dtype).itemsize)  # 이전에 끊긴 쓰기의 꼬리 정리
+                f.seek(0, os.SEEK_END)
+                columns[name].tofile(f)
+
+        schema = {
+            "count": schema["count"] + n,
+            "snapshots": schema["snapshots"] + 1,
+            "last": ts,
+            "columns": {name: dtype for name, dtype in COLUMNS},
+        }
+        tmp = os.path.join(path, "schema.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(schema, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, os.path.join(path, "schema.json"))
+        return n
+
+    def load(self, region: str) -> TrendingTable:
+        """아카이브를 메모리 매핑해서 엽니다 (JSON 파싱 없음)."""
+        return TrendingTable(self.path(region), self.schema(region)["count"])
+
+
+# -----------------------------
+# 벤치마크
+# -----------------------------
+def _synthesize(items, snapshots: int):
+    """벤치마크용으로 스냅샷을 시간별로 반복합니다 (조회수는 조금씩 늘림)."""
+    start = to_epoch("2025-01-01T00:00:00Z")
+    for s in range(snapshots):
+        ts = datetime.fromtimestamp(start + s * 3600, tz=timezone.utc).strftime(TIME_FORMAT)
+        yield ts, [dict(v, viewCount=str(int(v.get("viewCount") or 0) + s * 1000)) for v in items]
+
+
+def benchmark(items, snapshots: int):
+    """
+    시간별 스냅샷 n개를 NDJSON(trending_history 형식)과 아카이브로 저장해 전체 로드 + 채널별 조회수 집계를 비교합니다.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        ndjson_path = os.path.join(tmp, "KR.ndjson")
+        archive = TrendingArchive(os.path.join(tmp, "archive"))
+        with open(ndjson_path, "w", encoding="utf-8") as f:
+            for ts, snapshot in _synthesize(items, snapshots):
+                f.write(json.dumps({"ts": ts, "items": snapshot}, ensure_ascii=False) + "\n")
+                archive.append("KR", snapshot, ts)
+
+        t0 = time.perf_counter()
+        totals = {}
+        with open(ndjson_path, "r", encoding="utf-8") as f:
+            for line in f:
+                for v in json.loads(line)["items"]:
+                    totals[v["channelTitle"]] = totals.get(v["channelTitle"], 0) + int(v["viewCount"])
+        json_sec = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        table = archive.load("KR")
+        load_sec = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        table.views_per_channel(slice(None), top=None)
+        agg_sec = time.perf_counter() - t0
+
+        rows = len(table)
+        size = sum(os.path.getsize(os.path.join(archive.path("KR"), name)) for name in os.listdir(archive.path("KR")))
+        print(f"스냅샷 {snapshots}개 ({rows:,}행)")
+        print(f"  NDJSON: {os.path.getsize(ndjson_path):,} bytes, 로드+집계 {json_sec * 1000:.0f}ms")
+        print(f"  아카이브: {size:,} bytes, 로드 {load_sec * 1000:.2f}ms, 채널별 조회수 {agg_sec * 1000:.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="인기 급상승 스냅샷 → 컬럼형 아카이브")
+    parser.add_argument("files", nargs="*", help="download.py가 저장한 JSON (목록 또는 {지역: 목록})")
+    parser.add_argument("--region", default="KR", help="목록 형식 파일의 국가 코드")
+    parser.add_argument("--root", default=DEFAULT_ROOT)
+    parser.add_argument("--from-history", default=None, metavar="DIR",
+                        help="trending_history 폴더의 스냅샷을 시각 순으로 옮겨 담기 (이미 담은 시각은 건너뜀)")
+    parser.add_argument("--channels", type=int, default=0, help="지역별 마지막 스냅샷의 채널별 조회수 상위 N개 출력")
+    parser.add_argument("--bench", type=int, default=0, help="첫 파일을 시간별 스냅샷 N개로 늘려서 NDJSON과 비교")
+    args = parser.parse_args()
+
+    if args.bench:
+        with open(args.files[0], "r", encoding="utf-8") as f:
+            data = json.load(f)
+        benchmark(data if isinstance(data, list) else next(iter(data.values())), args.bench)
+        return
+
+    archive = TrendingArchive(args.root)
+    regions = set()
+    for path in args.files:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for region, items in (data.items() if isinstance(data, dict) else [(args.region, data)]):
+            print(f"{region}: {archive.append(region, items)}행 추가")
+            regions.add(region)
+
+    if args.from_history:
+        from trending_history import TrendingHistory
+
+        history = TrendingHistory(args.from_history)
+        for name in sorted(os.listdir(args.from_history)):
+            if not name.endswith(".idx"):
+                continue
+            region = name[:-len(".idx")]
+            last = archive.schema(region)["last"]
+            added = 0
+            for ts, items in history.snapshots(region):
+                if last is None or ts > last:
+                    added += archive.append(region, items, ts)
+            print(f"{region}: 이력에서 {added}행 추가")
+            regions.add(region)
+
+    for region in sorted(regions) if args.channels else []:
+        print(f"\n[{region}] 채널별 조회수")
+        for channel, views in archive.load(region).views_per_channel(top=args.channels):
+            print(f"  {views:>14,}  {channel}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+# trending_history.py
+# 인기 급상승 스냅샷 이력 + 증분 순위/속도 diff
+# - trending_videos.json처럼 덮어쓰지 않고 지역별 스냅샷을 시간순으로 덧붙임 (스냅샷 안은 동영상 id로 조회)
+# - 새 스냅샷을 넣을 때 직전 스냅샷 하나와만 비교 → 비용은 스냅샷 크기(O(items))에 비례, 이력 전체를 다시 읽지 않음
+# - diff: 순위 변화, 새로 들어온/빠진 동영상, 시간당 조회수/좋아요 증가량(velocity)
+# - fastest_risers()로 차트 순서 대신 "가장 빨리 오르는" 동영상을 고를 수 있음
+#
+# 사용 예:
+#   history = TrendingHistory("trending_history")
+#   diff = history.append("KR", [extract_video_info(v) for v in items])
+#   for video in fastest_risers(diff, 10):
+#       print(video["id"], video["view_velocity"])
+
+import argparse
+import bisect
+import json
+import os
+from datetime import datetime, timezone
+
+DEFAULT_ROOT = "trending_history"
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.strptime(value, TIME_FORMAT).replace(tzinfo=timezone.utc)
+
+
+def _hours(start: str, end: str) -> float:
+    return (_parse_time(end) - _parse_time(start)).total_seconds() / 3600
+
+
+def _count(record, key) -> int:
+    return int(record.get(key) or 0)
+
+
+def diff_snapshots(prev, curr, prev_ts, ts):
+    """
+    직전 스냅샷과 현재 스냅샷을 비교합니다. 두 스냅샷 크기에 비례하는 시간(O(items))이 걸립니다.
+
+    Args:
+        prev (list): 직전 스냅샷 (순위 순 video_info 목록, 없으면 빈 목록)
+        curr (list): 현재 스냅샷
+        prev_ts, ts (str): 두 스냅샷 시각 ('YYYY-MM-DDTHH:MM:SSZ')
+
+    Returns:
+        dict: ts, prev_ts, hours, entries(새로 들어온 id), dropouts(빠진 id),
+              videos(현재 순위 순: id, rank, prev_rank, rank_delta(+면 상승), views, view_velocity, like_velocity, new)
+              새 동영상의 velocity는 게시 시각 이후 평균(시간당)으로 어림합니다.
+    """
+    before = {record["id"]: (rank, record) for rank, record in enumerate(prev, start=1)}
+    hours = _hours(prev_ts, ts) if prev_ts else None
+    videos = []
+    for rank, record in enumerate(curr, start=1):
+        views, likes = _count(record, "viewCount"), _count(record, "likeCount")
+        old = before.get(record["id"])
+        if old is not None and hours:
+            prev_rank, prev_record = old
+            view_velocity = (views - _count(prev_record, "viewCount")) / hours
+            like_velocity = (likes - _count(prev_record, "likeCount")) / hours
+        else:
+            prev_rank = old[0] if old else None
+            age = _hours(record["publishedAt"], ts) if record.get("publishedAt") else None
+            view_velocity = views / age if age and age > 0 else None
+            like_velocity = likes / age if age and age > 0 else None
+        videos.append({
+            "id": record["id"], "rank": rank, "prev_rank": prev_rank,
+            "rank_delta": prev_rank - rank if prev_rank else None,
+            "views": views,
+            "view_velocity": round(view_velocity, 1) if view_velocity is not None else None,
+            "like_velocity": round(like_velocity, 1) if like_velocity is not None else None,
+            "new": old is None,
+        })
+    current = {record["id"] for record in curr}
+    return {
+        "ts": ts, "prev_ts": prev_ts, "hours": round(hours, 3) if hours is not None else None,
+        "entries": [v["id"] for v in videos if v["new"]] if prev else [],
+        "dropouts": [record["id"] for record in prev if record["id"] not in current],
+        "videos": videos,
+    }
+
+
+def chart_name(region: str, category=None) -> str:
+    """이력에 쓰는 차트 이름: 전체 차트는 지역 코드('KR'), 카테고리 차트는 '지역-카테고리'('KR-10')."""
+    return region if category is None else f"{region}-{category}"
+
+
+def fastest_risers(diff, k: int = 10, by: str = "view_velocity"):
+    """diff에서 by(view_velocity, like_velocity, rank_delta) 기준 상위 k개. 값이 없는 동영상은 뒤로."""
+    ranked = [v for v in diff["videos"] if v.get(by) is not None]
+    ranked.sort(key=lambda v: v[by], reverse=True)
+    return ranked[:k]
+
+
+class TrendingHistory:
+    """
+    지역별 인기 급상승 스냅샷 이력.
+
+    파일 구성 (root/):
+        {region}.ndjson       스냅샷 1개당 1줄 {"ts", "items"} (items는 순위 순 video_info)
+        {region}.idx          "시각<TAB>바이트 위치" 1줄씩 (시각 순)
+        {region}.diff.ndjson  스냅샷마다 직전 스냅샷과의 diff 1줄
+    """
+
+    def __init__(self, root: str = DEFAULT_ROOT):
+        self.root = root
+        self._index = {}  # region → ([시각], [바이트 위치])
+        self._last = {}   # region → (시각, items) 마지막 스냅샷
+
+    # ---------- 경로 ----------
+    def data_path(self, region: str) -> str:
+        return os.path.join(self.root, f"{region}.ndjson")
+
+    def index_path(self, region: str) -> str:
+        return os.path.join(self.root, f"{region}.idx")
+
+    def diff_path(self, region: str) -> str:
+        return os.path.join(self.root, f"{region}.diff.ndjson")
+
+    def index(self, region: str):
+        """(시각 목록, 바이트 위치 목록). 처음 한 번만 인덱스 파일을 읽습니다."""
+        if region not in self._index:
+            times, offsets = [], []
+            try:
+                with open(self.index_path(region), "r", encoding="utf-8") as f:
+                    for line in f:
+                        parts = line.rstrip("\n").split("\t")
+                        if line.endswith("\n") and len(parts) == 2:  # 쓰다 끊긴 줄은 무시
+                            times.append(parts[0])
+                            offsets.append(int(parts[1]))
+            except FileNotFoundError:
+                pass
+            self._index[region] = (times, offsets)
+        return self._index[region]
+
+    def _read(self, region: str, offset: int):
+        with open(self.data_path(region), "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def last(self, region: str):
+        """마지막 스냅샷 (시각, items). 없으면 (None, [])."""
+        if region not in self._last:
+            times, offsets = self.index(region)
+            if times:
+                snapshot = self._read(region, offsets[-1])
+                self._last[region] = (snapshot["ts"], snapshot["items"])
+            else:
+                self._last[region] = (None, [])
+        return self._last[region]
+
+    # ---------- 쓰기 ----------
+    def append(self, region: str, items, ts: str | None = None) -> dict:
+        """
+        스냅샷을 덧붙이고 직전 스냅샷과의 diff를 돌려줍니다 (diff도 파일에 덧붙임).
+
+        Args:
+            region (str): 국가 코드
+            items (list): 순위 순 video_info 목록 (download.extract_video_info 결과)
+            ts (str, optional): 스냅샷 시각. 생략하면 현재 UTC
+
+        Raises:
+            ValueError: ts가 마지막 스냅샷보다 이르거나 같은 경우
+        """
+        ts = ts or datetime.now(timezone.utc).strftime(TIME_FORMAT)
+        prev_ts, prev = self.last(region)
+        if prev_ts is not None and ts <= prev_ts:
+            raise ValueError(f"{region}: 스냅샷 시각 {ts}이 마지막 스냅샷({prev_ts})보다 늦어야 합니다.")
+        items = list(items)
+        diff = diff_snapshots(prev, items, prev_ts, ts)
+
+        os.makedirs(self.root, exist_ok=True)
+        line = (json.dumps({"ts": ts, "items": items}, ensure_ascii=False) + "\n").encode("utf-8")
+        with open(self.data_path(region), "ab") as data:
+            offset = data.seek(0, os.SEEK_END)
+            data.write(line)
+        # 데이터 → 인덱스 → diff 순서로 씀. 중간에 끊기면 데이터 파일에 인덱스에 없는 줄이 남는데,
+        # 읽을 때는 인덱스의 바이트 위치로만 찾아가므로 그 줄은 건너뜀 (diff가 빠지면 latest_diff가 다시 계산)
+        with open(self.index_path(region), "a+b") as idx:
+            end = idx.seek(0, os.SEEK_END)
+            if end:
+                idx.seek(max(0, end - 4096))
+                tail = idx.read()
+                if not tail.endswith(b"\n"):
+                    idx.truncate(end - len(tail) + tail.rfind(b"\n") + 1)  # 쓰다 끊긴 마지막 줄은 지움
+            idx.write(f"{ts}\t{offset}\n".encode("utf-8"))
+        with open(self.diff_path(region), "a", encoding="utf-8") as f:
+            f.write(json.dumps(diff, ensure_ascii=False) + "\n")
+
+        times, offsets = self.index(region)
+        times.append(ts)
+        offsets.append(offset)
+        self._last[region] = (ts, items)
+        return diff
+
+    # ---------- 조회 ----------
+    def snapshots(self, region: str, start: str | None = None, end: str | None = None):
+        """[start, end) 구간의 스냅샷 (시각, items)을 시간순으로 하나씩 돌려줍니다."""
+        times, offsets = self.index(region)
+        lo = bisect.bisect_left(times, start) if start else 0
+        hi = bisect.bisect_left(times, end) if end else len(times)
+        if lo >= hi:
+            return
+        with open(self.data_path(region), "rb") as f:
+            for offset in offsets[lo:hi]:
+                if f.tell() != offset:
+                    f.seek(offset)  # 인덱스에 없는 줄(쓰다 끊긴 append)은 건너뜀
+                snapshot = json.loads(f.readline())
+                yield snapshot["ts"], snapshot["items"]
+
+    def track(self, region: str, video_id: str, start: str | None = None, end: str | None = None):
+        """동영상 하나의 (시각, 순위, video_info) 목록. 차트에 없던 스냅샷은 건너뜁니다."""
+        history = []
+        for ts, items in self.snapshots(region, start, end):
+            for rank, record in enumerate(items, start=1):
+                if record["id"] == video_id:
+                    history.append((ts, rank, record))
+                    break
+        return history
+
+    def latest_diff(self, region: str):
+        """마지막 스냅샷의 diff. 기록된 diff가 마지막 스냅샷 것이 아니면(쓰다 끊김) 다시 계산합니다. 없으면 None."""
+        times, _ = self.index(region)
+        if not times:
+            return None
+        diff = self._last_diff_line(region)
+        if diff is None or diff["ts"] != times[-1]:
+            snapshots = list(self.snapshots(region, times[-2] if len(times) > 1 else None))
+            prev_ts, prev = snapshots[0] if len(snapshots) > 1 else (None, [])
+            ts, items = snapshots[-1]
+            diff = diff_snapshots(prev, items, prev_ts, ts)
+        return diff
+
+    def _last_diff_line(self, region: str):
+        try:
+            with open(self.diff_path(region), "rb") as f:
+                f.seek(0, os.SEEK_END)
+                end = f.tell()
+                block = b""
+                pos = end
+                while pos > 0 and block.count(b"\n") < 2:
+                    pos = max(0, pos - 65536)
+                    f.seek(pos)
+                    block = f.read(end - pos)
+        except FileNotFoundError:
+            return None
+        lines = block.rstrip(b"\n").split(b"\n")
+        try:
+            return json.loads(lines[-1]) if lines and lines[-1] else None
+        except ValueError:
+            return None  # 쓰다 끊긴 줄
+
+
+def main():
+    parser = argparse.ArgumentParser(description="인기 급상승 스냅샷을 이력에 덧붙이고 급상승 동영상 출력")
+    parser.add_argument("files", nargs="*", help="download.py가 저장한 JSON (목록 또는 {지역: 목록})")
+    parser.add_argument("--region", default="KR", help="목록 형식 파일의 국가 코드")
+    parser.add_argument("--root", default=DEFAULT_ROOT)
+    parser.add_argument("--risers", type=int, default=10, help="지역별로 출력할 급상승 동영상 수")
+    parser.add_argument("--by", default="view_velocity", choices=("view_velocity", "like_velocity", "rank_delta"))
+    args = parser.parse_args()
+
+    history = TrendingHistory(args.root)
+    regions = set()
+    for path in args.files:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for region, items in (data.items() if isinstance(data, dict) else [(args.region, data)]):
+            diff = history.append(region, items)
+            regions.add(region)
+            print(f"{region}: {len(items)}개 저장, 새로 진입 {len(diff['entries'])}개, 이탈 {len(diff['dropouts'])}개")
+    if not args.files:
+        regions = {name.split(".")[0] for name in os.listdir(args.root) if name.endswith(".idx")} \
+            if os.path.isdir(args.root) else set()
+
+    for region in sorted(regions):
+        diff = history.latest_diff(region)
+        if diff is None:
+            continue
+        print(f"\n[{region}] {diff['ts']} 급상승 ({args.by})")
+        for video in fastest_risers(diff, args.risers, args.by):
+            print(f"  {video['rank']:>3}위 ({video['rank_delta'] if video['rank_delta'] is not None else 'new'}) "
+                  f"{video['id']}  {video[args.by]}")
+
+
+if __name__ == "__main__":
+    main()
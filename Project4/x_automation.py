@@ -2,7 +2,7 @@
 # Windows 전용. A모드(무중단, 전용 user-data-dir) 기본.
 # 최초 1회 로그인만 하면 이후 자동 로그인 유지.
 
-import urllib.request, json
+import json
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
@@ -11,9 +11,12 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, StaleElementReferenceException, WebDriverException
 from selenium.webdriver.chrome.service import Service
 
-import os, sys, time, json as json2, socket, subprocess, shutil, urllib.request
+import os, sys, time, json as json2, socket, subprocess, shutil
 import winreg
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+from transport import default_transport
+
 # ========= 설정 =========
 REMOTE_PORT = 9222
 USE_MODE_A = True  # True: A모드(전용 user-data-dir, 기존 창 유지), False: B모드(기존 프로필 강제, 모든 크롬 종료 필요)
@@ -97,13 +100,15 @@ def ensure_dir(p):
     os.makedirs(p, exist_ok=True)
 
 def fetch_json(url: str, timeout=0.6):
-    """URL을 GET해서 (status, text) 반환. 실패 시 (None, 오류문자열)."""
+    """URL을 GET해서 (status, text) 반환. 실패 시 (None, 오류문자열).
+    포트 확인은 호출 측에서 반복하므로 재시도 없이 한 번만 요청 (연결은 공용 Transport가 재사용)."""
     try:
-        with urllib.request.urlopen(url, timeout=timeout) as r:
-            body = r.read()
-            return r.status, body.decode("utf-8", "ignore")
+        r = default_transport().get(url, timeout=timeout, retries=0)
     except Exception as e:
         return None, str(e)
+    if r.status_code >= 400:  # urlopen처럼 4xx/5xx는 실패로 취급
+        return None, f"HTTP Error {r.status_code}: {r.reason}"
+    return r.status_code, r.content.decode("utf-8", "ignore")
 
 def mark_profile_clean(user_data_dir: str, profile_name: str):
     # 복구 버블 예방용 플래그
@@ -170,9 +175,9 @@ def is_debug_port_ready(port: int, timeout_sec: float = 5.0) -> tuple[bool, str]
 
 def http_json(url, timeout=0.8):
     try:
-        with urllib.request.urlopen(url, timeout=timeout) as r:
-            if r.status == 200:
-                return json.loads(r.read().decode("utf-8"))
+        r = default_transport().get(url, timeout=timeout, retries=0)
+        if r.status_code == 200:
+            return json.loads(r.content.decode("utf-8"))
     except Exception:
         return None
     return None
@@ -0,0 +1,378 @@
+# alerts.py
+# 새로 들어오는 캔들마다 알림 규칙을 평가하는 증분 롤링 윈도 엔진 (Project1/Project2 공용)
+# - 업비트 캔들 dict와 네이버 priceInfos를 그대로 받음
+# - 규칙: N캔들 등락률(pct_change), 거래량 z-score(volume_z), N캔들 고가 돌파(breakout)
+# - 롤링 통계는 캔들 하나당 O(1) (deque + 누적 합/제곱합, 최댓값은 단조 deque)
+#   → 윈도 길이와 상관없이 갱신 비용이 일정하고, 창을 다시 계산하지 않음
+# - 같은 마켓에서 같은 (지표, N)을 쓰는 규칙은 윈도/지표 계산을 공유하고,
+#   임계값은 정렬해 두어 이진 탐색으로 발동한 규칙만 골라냄 (규칙 수에 거의 무관)
+# - 진행 중인 최신 캔들이 다시 들어오면(같은 시각) 윈도에 넣지 않고 다시 평가만 함.
+#   같은 규칙은 캔들 하나당 한 번만 알림
+#
+# 사용 예:
+#   engine = AlertEngine()
+#   engine.add_rule(Rule("pct_change", 5, 3.0))                  # 5캔들 전 대비 +3% 초과
+#   engine.add_rule(Rule("pct_change", 5, -3.0, "below"))        # 5캔들 전 대비 -3% 미만
+#   engine.add_rule(Rule("volume_z", 20, 3.0), markets=["KRW-BTC"])
+#   engine.add_rule(Rule("breakout", 20))                        # 직전 20캔들 고가 돌파
+#   for alert in engine.on_candles("KRW-BTC", candles):
+#       print(format_alert(alert))
+
+import argparse
+import json
+import math
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import deque
+
+from ohlcv import NAVER_FIELDS, UPBIT_FIELDS
+
+RESYNC_EVERY = 4096  # 누적 합의 부동소수점 오차가 쌓이지 않도록 이 횟수마다 윈도에서 다시 계산
+
+
+# -----------------------------
+# 롤링 윈도
+# -----------------------------
+class RollingStats:
+    """최근 n개 값의 합/평균/표준편차. push는 O(1)."""
+
+    __slots__ = ("n", "values", "total", "total_sq", "_pushes")
+
+    def __init__(self, n: int):
+        self.n = n
+        self.values = deque()
+        self.total = 0.0
+        self.total_sq = 0.0
+        self._pushes = 0
+
+    def push(self, x: float):
+        self.values.append(x)
+        self.total += x
+        self.total_sq += x * x
+        if len(self.values) > self.n:
+            old = self.values.popleft()
+            self.total -= old
+            self.total_sq -= old * old
+        self._pushes += 1
+        if self._pushes % RESYNC_EVERY == 0:
+            self.total = math.fsum(self.values)
+            self.total_sq = math.fsum(v * v for v in self.values)
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.n
+
+    def mean(self) -> float:
+        return self.total / len(self.values)
+
+    def std(self) -> float:
+        count = len(self.values)
+        mean = self.total / count
+        return math.sqrt(max(self.total_sq / count - mean * mean, 0.0))
+
+
+class RollingMax:
+    """최근 n개 값의 최댓값. 단조 감소 deque라서 push는 분할 상환 O(1), max는 O(1)."""
+
+    __slots__ = ("n", "items", "count")
+
+    def __init__(self, n: int):
+        self.n = n
+        self.items = deque()  # (순번, 값), 값이 단조 감소
+        self.count = 0
+
+    def push(self, x: float):
+        while self.items and self.items[-1][1] <= x:
+            self.items.pop()
+        self.items.append((self.count, x))
+        self.count += 1
+        if self.items[0][0] <= self.count - 1 - self.n:
+            self.items.popleft()
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.n
+
+    def max(self) -> float:
+        return self.items[0][1]
+
+
+# -----------------------------
+# 지표 (직전 윈도 vs 현재 캔들)
+# -----------------------------
+def _pct_change(window: RollingStats, point):
+    """n캔들 전 종가 대비 현재 종가 등락률(%)."""
+    if not window.full or not window.values[0]:
+        return None
+    return (point[1] / window.values[0] - 1) * 100
+
+
+def _volume_z(window: RollingStats, point):
+    """직전 n캔들 거래량 분포에서 현재 거래량의 z-score."""
+    if not window.full:
+        return None
+    std = window.std()
+    return (point[3] - window.mean()) / std if std > 0 else None
+
+
+def _breakout(window: RollingMax, point):
+    """직전 n캔들 최고가 대비 현재 종가(%). 0보다 크면 고가 돌파."""
+    if not window.full or not window.max():
+        return None
+    return (point[1] / window.max() - 1) * 100
+
+
+# 지표 이름 → (윈도 종류, 윈도에 넣을 값의 위치, 계산 함수). point = (시각, 종가, 고가, 거래량)
+SIGNALS = {
+    "pct_change": (RollingStats, 1, _pct_change),
+    "volume_z": (RollingStats, 3, _volume_z),
+    "breakout": (RollingMax, 2, _breakout),
+}
+
+
+def candle_point(candle):
+    """업비트 캔들 또는 네이버 priceInfo → (시각 키, 종가, 고가, 거래량)."""
+    if "candle_date_time_utc" in candle:
+        _, high, _, close, volume = UPBIT_FIELDS
+        key = candle["candle_date_time_utc"]
+    else:
+        _, high, _, close, volume = NAVER_FIELDS
+        key = candle.get("localDateTime") or candle["localDate"]
+        close = close if candle.get(close) is not None else "currentPrice"
+    return key, float(candle[close]), float(candle.get(high) or candle[close]), float(candle.get(volume) or 0)
+
+
+class Rule:
+    """
+    알림 규칙 하나.
+
+    Args:
+        kind (str): SIGNALS의 지표 이름
+        n (int): 윈도 길이(캔들 수)
+        threshold (float): 임계값 (pct_change/breakout은 %, volume_z는 표준편차 배수)
+        direction (str): 'above'면 지표 > 임계값, 'below'면 지표 < 임계값일 때 알림
+        name (str, optional): 알림에 표시할 이름
+    """
+
+    __slots__ = ("kind", "n", "threshold", "direction", "name")
+
+    def __init__(self, kind: str, n: int, threshold: float = 0.0, direction: str = "above", name: str | None = None):
+        if kind not in SIGNALS:
+            raise ValueError(f"지원하지 않는 규칙입니다: {kind} (가능: {', '.join(SIGNALS)})")
+        if direction not in ("above", "below"):
+            raise ValueError(f"direction은 above 또는 below여야 합니다: {direction}")
+        if n < 1:
+            raise ValueError(f"n은 1 이상이어야 합니다: {n}")
+        self.kind = kind
+        self.n = int(n)
+        self.threshold = float(threshold)
+        self.direction = direction
+        self.name = name or f"{kind}({n}){'>' if direction == 'above' else '<'}{threshold:g}"
+
+    def __repr__(self):
+        return f"Rule({self.name})"
+
+
+class _Signal:
+    """마켓 하나의 (지표, n) 하나: 윈도 1개 + 방향별로 정렬한 임계값/규칙."""
+
+    __slots__ = ("compute", "field", "window", "above", "above_rules", "below", "below_rules")
+
+    def __init__(self, kind: str, n: int, rules):
+        window_type, self.field, self.compute = SIGNALS[kind]
+        self.window = window_type(n)
+        above = sorted((r for r in rules if r.direction == "above"), key=lambda r: r.threshold)
+        below = sorted((r for r in rules if r.direction == "below"), key=lambda r: r.threshold)
+        self.above, self.above_rules = [r.threshold for r in above], above
+        self.below, self.below_rules = [r.threshold for r in below], below
+
+    def fired(self, value: float):
+        """value > 임계값인 above 규칙과 value < 임계값인 below 규칙."""
+        return self.above_rules[:bisect_left(self.above, value)] + self.below_rules[bisect_right(self.below, value):]
+
+
+class _Market:
+    __slots__ = ("signals", "pending", "fired", "version")
+
+    def __init__(self):
+        self.signals = {}   # (kind, n) → _Signal
+        self.pending = None  # 아직 윈도에 넣지 않은 최신 캔들 (진행 중일 수 있음)
+        self.fired = {}     # 규칙 이름 → 마지막으로 알린 캔들 시각
+        self.version = -1
+
+
+class AlertEngine:
+    """
+    마켓별 롤링 상태를 들고 캔들이 들어올 때마다 규칙을 평가합니다 (스레드 안전).
+
+    규칙은 "직전 n캔들 윈도"와 "현재 캔들"을 비교합니다. 새 시각의 캔들이 오면 그때
+    이전 캔들을 윈도에 넣으므로, 진행 중인 캔들이 여러 번 갱신돼도 윈도는 그대로입니다.
+    """
+
+    def __init__(self):
+        self.rules = []  # (Rule, 마켓 set 또는 None=전체)
+        self._markets = {}
+        self._version = 0
+        self._lock = threading.Lock()
+        self.candles = 0
+        self.alerts = 0
+
+    def add_rule(self, rule: Rule, markets=None):
+        """규칙을 추가합니다. markets를 생략하면 모든 마켓에 적용합니다."""
+        with self._lock:
+            self.rules.append((rule, set(markets) if markets else None))
+            self._version += 1
+
+    def _plan(self, market: str, state: _Market):
+        """규칙이 바뀌었으면 마켓의 지표 묶음을 다시 만듭니다. 이미 있던 윈도는 그대로 씁니다."""
+        grouped = {}
+        for rule, markets in self.rules:
+            if markets is None or market in markets:
+                grouped.setdefault((rule.kind, rule.n), []).append(rule)
+        signals = {}
+        for key, rules in grouped.items():
+            signal = _Signal(key[0], key[1], rules)
+            old = state.signals.get(key)
+            if old is not None:
+                signal.window = old.window
+            signals[key] = signal
+        state.signals = signals
+        state.version = self._version
+
+    def _evaluate(self, market: str, state: _Market, point):
+        alerts = []
+        for signal in state.signals.values():
+            value = signal.compute(signal.window, point)
+            if value is None:
+                continue
+            for rule in signal.fired(value):
+                if state.fired.get(rule.name) != point[0]:
+                    state.fired[rule.name] = point[0]
+                    alerts.append({"market": market, "rule": rule.name, "time": point[0],
+                                   "value": round(value, 4), "threshold": rule.threshold})
+        return alerts
+
+    def _advance(self, state: _Market, point) -> bool:
+        """point를 최신 캔들로 둡니다. 이전 캔들보다 과거면 False."""
+        pending = state.pending
+        if pending is not None:
+            if point[0] < pending[0]:
+                return False
+            if point[0] > pending[0]:
+                for signal in state.signals.values():
+                    signal.window.push(pending[signal.field])
+        state.pending = point
+        return True
+
+    def on_candle(self, market: str, candle):
+        """캔들 하나를 넣고 발동한 알림 목록을 돌려줍니다."""
+        return self.on_candles(market, [candle])
+
+    def on_candles(self, market: str, candles):
+        """
+        시간순(과거→최신) 캔들 목록을 넣고 발동한 알림 목록을 돌려줍니다.
+        이미 본 캔들보다 과거인 캔들은 건너뜁니다. 처음 보는 마켓이면 마지막 캔들 이전은
+        윈도를 채우는 데만 쓰고(과거 알림을 쏟아내지 않음) 마지막 캔들만 평가합니다.
+        """
+        if not candles:
+            return []
+        with self._lock:
+            state = self._markets.get(market)
+            warmup = state is None
+            if warmup:
+                state = self._markets[market] = _Market()
+            if state.version != self._version:
+                self._plan(market, state)
+
+            # 응답에 이미 본 구간이 섞여 와도 새 캔들만 처리 (뒤에서부터 찾으므로 새 캔들 수에 비례)
+            start = len(candles)
+            last = state.pending[0] if state.pending else None
+            while start > 0 and (last is None or candle_point(candles[start - 1])[0] >= last):
+                start -= 1
+
+            alerts = []
+            for i in range(start, len(candles)):
+                point = candle_point(candles[i])
+                if self._advance(state, point) and not (warmup and i < len(candles) - 1):
+                    alerts.extend(self._evaluate(market, state, point))
+            self.candles += len(candles) - start
+            self.alerts += len(alerts)
+            return alerts
+
+    def markets(self):
+        with self._lock:
+            return list(self._markets)
+
+    def last_time(self, market: str):
+        """마켓에서 마지막으로 넣은 캔들 시각 키. 처음 보는 마켓이면 None."""
+        with self._lock:
+            state = self._markets.get(market)
+            return state.pending[0] if state is not None and state.pending else None
+
+
+def load_rules(engine: AlertEngine, path: str) -> int:
+    """
+    JSON 규칙 파일을 읽어 엔진에 추가합니다.
+
+    형식: [{"kind": "pct_change", "n": 5, "threshold": 3, "direction": "above", "markets": ["KRW-BTC"]}, ...]
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        specs = json.load(f)
+    for spec in specs:
+        spec = dict(spec)
+        markets = spec.pop("markets", None)
+        engine.add_rule(Rule(**spec), markets)
+    return len(specs)
+
+
+def format_alert(alert: dict) -> str:
+    return f"[알림] {alert['market']} {alert['time']} {alert['rule']} (값 {alert['value']:g})"
+
+
+def _benchmark(markets: int, rules: int, ticks: int):
+    """마켓 × 규칙 조합으로 틱당 평가 시간을 잽니다."""
+    import random
+
+    engine = AlertEngine()
+    kinds = list(SIGNALS)
+    for i in range(rules):
+        kind = kinds[i % len(kinds)]
+        n = (5, 10, 20, 60)[(i // len(kinds)) % 4]
+        direction = "below" if kind == "pct_change" and i % 2 else "above"
+        threshold = random.uniform(3, 6) if kind == "volume_z" else random.uniform(5, 30)
+        engine.add_rule(Rule(kind, n, -threshold if direction == "below" else threshold, direction, name=f"r{i}"))
+
+    names = [f"M{m:04d}" for m in range(markets)]
+    prices = {m: 100.0 for m in names}
+
+    def candle(market, t):
+        prices[market] *= 1 + random.gauss(0, 0.005)
+        p = prices[market]
+        return {"candle_date_time_utc": f"{t:010d}", "trade_price": p, "high_price": p * 1.01,
+                "candle_acc_trade_volume": random.expovariate(1.0)}
+
+    for t in range(100):  # 윈도 채우기
+        for m in names:
+            engine.on_candle(m, candle(m, t))
+    t0 = time.perf_counter()
+    fired = 0
+    for t in range(100, 100 + ticks):
+        for m in names:
+            fired += len(engine.on_candle(m, candle(m, t)))
+    elapsed = (time.perf_counter() - t0) / ticks
+    print(f"마켓 {markets}개 × 규칙 {rules}개: 틱당 {elapsed * 1000:.1f}ms "
+          f"(마켓당 {elapsed / markets * 1e6:.1f}µs), 알림 {fired / ticks:.0f}건/틱")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="롤링 윈도 알림 엔진 처리량 측정")
+    parser.add_argument("--markets", type=int, default=300)
+    parser.add_argument("--rules", type=int, default=3000)
+    parser.add_argument("--ticks", type=int, default=20)
+    args = parser.parse_args()
+    _benchmark(args.markets, args.rules, args.ticks)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+# http_cache.py
+# 시세 API 응답용 디스크 HTTP 캐시 (Project1/Project2 공용)
+# - URL + 쿼리 파라미터를 키로 응답 본문과 헤더를 디스크에 저장
+# - 기간 종류별 TTL, 만료 후에는 If-None-Match / If-Modified-Since로 조건부 재검증(304)
+# - 최근 응답은 메모리에도 보관해서 마이크로초 단위로 응답
+# - 디스크 용량 기준 LRU 제거, 적중/실패 카운터
+#
+# 사용 예:
+#   cache = HttpCache(".http_cache")
+#   response = cache.get(session, url, params=params, headers=headers, ttl=ttl_for(params))
+#   response.json()
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+
+DEFAULT_ROOT = ".http_cache"
+MAX_DISK_BYTES = 256 * 1024 * 1024
+MAX_MEMORY_BYTES = 32 * 1024 * 1024
+DEFAULT_TTL = 60
+
+# 기간 종류별 TTL(초). 네이버 periodType, 업비트 캔들 단위를 모두 받습니다.
+TTL_BY_PERIOD = {
+    "minute": 30,
+    "minutes": 30,
+    "dayCandle": 600,
+    "days": 300,
+    "weekCandle": 3600,
+    "weeks": 3600,
+    "monthCandle": 6 * 3600,
+    "months": 6 * 3600,
+    "yearCandle": 24 * 3600,
+}
+
+# 재검증에 필요한 헤더만 저장
+KEPT_HEADERS = ("content-type", "etag", "last-modified", "cache-control", "date")
+
+
+def ttl_for(params=None, url: str = "") -> int:
+    """요청 파라미터(periodType) 또는 업비트 캔들 URL로 TTL을 고릅니다."""
+    period = (params or {}).get("periodType")
+    if period in TTL_BY_PERIOD:
+        return TTL_BY_PERIOD[period]
+    for unit in ("minutes", "days", "weeks", "months"):
+        if f"/candles/{unit}" in url:
+            return TTL_BY_PERIOD[unit]
+    return DEFAULT_TTL
+
+
+def cache_key(url: str, params=None, method: str = "GET") -> str:
+    query = json.dumps(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+    return hashlib.sha256(f"{method} {url} {query}".encode("utf-8")).hexdigest()
+
+
+class CachedResponse:
+    """requests.Response와 비슷하게 쓸 수 있는 캐시 응답."""
+
+    __slots__ = ("status_code", "headers", "content", "url", "stored_at", "expires_at", "from_cache")
+
+    def __init__(self, status_code, headers, content, url, stored_at, expires_at, from_cache=False):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+        self.from_cache = from_cache
+
+    @property
+    def ok(self):
+        return 200 <= self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", "replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.HTTPError(f"{self.status_code} for url: {self.url}")
+
+
+class HttpCache:
+    """
+    디스크 + 메모리 2단계 HTTP 응답 캐시 (스레드 안전).
+
+    Args:
+        root (str): 캐시 폴더
+        max_bytes (int): 디스크 용량 상한 (넘으면 가장 오래 안 쓴 항목부터 삭제)
+        memory_bytes (int): 메모리에 둘 응답 용량 상한
+    """
+
+    def __init__(self, root: str = DEFAULT_ROOT, max_bytes: int = MAX_DISK_BYTES,
+                 memory_bytes: int = MAX_MEMORY_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self._lock = threading.RLock()
+        self._memory = OrderedDict()   # key → CachedResponse
+        self._memory_size = 0
+        self._disk = OrderedDict()     # key → 본문 크기 (오래 안 쓴 순)
+        self._disk_size = 0
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "stored": 0, "evicted": 0}
+        self._scan()
+
+    # ---------- 경로 ----------
+    def _paths(self, key: str):
+        base = os.path.join(self.root, key[:2], key)
+        return base + ".body", base + ".meta.json"
+
+    def _scan(self):
+        """기존 캐시 파일을 마지막 사용 시각 순으로 읽어 LRU 순서를 복원합니다."""
+        if not os.path.isdir(self.root):
+            return
+        found = []
+        for sub in os.listdir(self.root):
+            folder = os.path.join(self.root, sub)
+            if not os.path.isdir(folder):
+                continue
+            for name in os.listdir(folder):
+                if name.endswith(".body"):
+                    st = os.stat(os.path.join(folder, name))
+                    found.append((st.st_atime, name[:-5], st.st_size))
+        for _, key, size in sorted(found):
+            self._disk[key] = size
+            self._disk_size += size
+
+    # ---------- 읽기/쓰기 ----------
+    def _remember(self, key: str, entry: CachedResponse):
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_size -= len(old.content)
+        if len(entry.content) > self.memory_bytes:
+            return
+        self._memory[key] = entry
+        self._memory_size += len(entry.content)
+        while self._memory_size > self.memory_bytes:
+            _, dropped = self._memory.popitem(last=False)
+            self._memory_size -= len(dropped.content)
+
+    def _read(self, key: str):
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            return entry
+        if key not in self._disk:
+            return None
+        body_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                content = f.read()
+        except (FileNotFoundError, ValueError):
+            self._forget(key)
+            return None
+        entry = CachedResponse(meta["status"], meta["headers"], content, meta["url"],
+                               meta["stored_at"], meta["expires_at"])
+        self._remember(key, entry)
+        return entry
+
+    def _write(self, key: str, entry: CachedResponse):
+        body_path, meta_path = self._paths(key)
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+        with open(body_path + ".tmp", "wb") as f:
+            f.write(entry.content)
+        os.replace(body_path + ".tmp", body_path)
+        self._write_meta(key, entry)
+
+        self._disk_size -= self._disk.pop(key, 0)
+        self._disk[key] = len(entry.content)
+        self._disk_size += len(entry.content)
+        self._remember(key, entry)
+        self.stats["stored"] += 1
+        while self._disk_size > self.max_bytes and len(self._disk) > 1:
+            oldest = next(iter(self._disk))
+            self._forget(oldest)
+            self.stats["evicted"] += 1
+
+    def _write_meta(self, key: str, entry: CachedResponse):
+        _, meta_path = self._paths(key)
+        meta = {"url": entry.url, "status": entry.status_code, "headers": entry.headers,
+                "stored_at": entry.stored_at, "expires_at": entry.expires_at}
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def _forget(self, key: str):
+        self._disk_size -= self._disk.pop(key, 0)
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_size -= len(old.content)
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _touch(self, key: str):
+        if key in self._disk:
+            self._disk.move_to_end(key)
+
+    # ---------- 공개 API ----------
+    def get(self, session, url: str, params=None, headers=None, ttl: float | None = None, timeout: float = 10):
+        """
+        캐시를 거쳐 GET 요청합니다.
+
+        - 만료 전: 네트워크 요청 없이 캐시 응답
+        - 만료 후 ETag/Last-Modified가 있으면 조건부 요청, 304면 본문 재사용
+        - 그 외: 새로 받아 200 응답만 저장
+
+        Args:
+            session: requests.Session (또는 requests 모듈)
+            ttl (float, optional): 생략하면 ttl_for(params, url)
+
+        Returns:
+            CachedResponse: from_cache가 True면 본문을 네트워크에서 받지 않은 응답
+        """
+        key = cache_key(url, params)
+        ttl = ttl_for(params, url) if ttl is None else ttl
+        now = time.time()
+        with self._lock:
+            entry = self._read(key)
+            if entry is not None and now < entry.expires_at:
+                self._touch(key)
+                self.stats["hits"] += 1
+                entry.from_cache = True
+                return entry
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if entry.headers.get("etag"):
+                request_headers["If-None-Match"] = entry.headers["etag"]
+            if entry.headers.get("last-modified"):
+                request_headers["If-Modified-Since"] = entry.headers["last-modified"]
+
+        response = session.get(url, params=params, headers=request_headers, timeout=timeout)
+        now = time.time()
+
+        with self._lock:
+            if response.status_code == 304 and entry is not None:
+                entry.stored_at, entry.expires_at, entry.from_cache = now, now + ttl, True
+                self._write_meta(key, entry)
+                self._touch(key)
+                self.stats["revalidated"] += 1
+                return entry
+
+            self.stats["misses"] += 1
+            kept = {h: response.headers[h] for h in KEPT_HEADERS if h in response.headers}
+            fresh = CachedResponse(response.status_code, kept, response.content, url, now, now + ttl)
+            if response.status_code == 200:
+                self._write(key, fresh)
+            return fresh
+
+    def invalidate(self, url: str, params=None):
+        with self._lock:
+            self._forget(cache_key(url, params))
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._disk):
+                self._forget(key)
+
+    def summary(self) -> str:
+        s = self.stats
+        total = s["hits"] + s["revalidated"] + s["misses"]
+        ratio = (s["hits"] + s["revalidated"]) / total if total else 0.0
+        return (f"캐시 적중 {s['hits']}회, 재검증(304) {s['revalidated']}회, 실패 {s['misses']}회 "
+                f"(적중률 {ratio:.0%}), 디스크 {self._disk_size / 1024:.0f}KB/{len(self._disk)}개, "
+                f"제거 {s['evicted']}회")
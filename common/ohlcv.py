@@ -0,0 +1,171 @@
+# ohlcv.py
+# 업비트 캔들과 네이버 priceInfos를 같은 모양으로 담는 컬럼형 OHLCV 시계열 (Project1/Project2 공용)
+# - 컬럼마다 연속된 numpy 배열 하나 (dict 목록 대비 캔들당 수백 바이트 → 수십 바이트)
+# - 슬라이스는 복사 없이 같은 배열의 뷰를 공유
+# - 캔들당 56바이트 (시각 + OHLCV + 부가 컬럼 1개: 업비트 value / 네이버 foreign_rate, 각 8바이트)
+# - compact=True면 가격/거래량 float32, 시각 uint32로 캔들당 28바이트
+#   (float32는 정수를 2^24≈1,677만까지만 정확히 표현하므로 BTC 원화 가격처럼 큰 값은 수십 원 단위로 반올림됨)
+#
+# 사용 예:
+#   series = OhlcvSeries.from_upbit(candles)               # Project1 JSON/응답
+#   series = OhlcvSeries.from_naver(data["priceInfos"], code="005930")
+#   recent = series.between("2025-01-01", "2025-07-01")    # 뷰 (복사 없음)
+#   recent.close.mean()
+
+import numpy as np
+
+COLUMNS = ("time", "open", "high", "low", "close", "volume")
+
+# 출처별 필드 이름 (open, high, low, close, volume, 추가 컬럼)
+UPBIT_FIELDS = ("opening_price", "high_price", "low_price", "trade_price", "candle_acc_trade_volume")
+UPBIT_EXTRA = {"value": "candle_acc_trade_price"}
+NAVER_FIELDS = ("openPrice", "highPrice", "lowPrice", "closePrice", "accumulatedTradingVolume")
+NAVER_EXTRA = {"foreign_rate": "foreignRetentionRate"}
+
+KST_OFFSET = 9 * 3600
+
+
+def _dtypes(compact: bool):
+    return (np.uint32, np.float32) if compact else (np.int64, np.float64)
+
+
+def _column(records, key, dtype, fallback=None):
+    values = [r.get(key, r.get(fallback) if fallback else None) for r in records]
+    return np.array([np.nan if v is None else v for v in values], dtype=dtype)
+
+
+def to_epoch(value) -> int:
+    """'YYYY-MM-DD[ HH:MM:SS]', 'YYYYMMDD[HHMM[SS]]', datetime64 또는 epoch 초 → epoch 초 (UTC로 해석)."""
+    if isinstance(value, (int, np.integer, float)):
+        return int(value)
+    if isinstance(value, str) and value.isdigit():
+        value = _naver_iso(value)
+    return int(np.datetime64(str(value).replace(" ", "T"), "s").astype(np.int64))
+
+
+def _naver_iso(value: str) -> str:
+    """'20250424' / '202504240930' / '20250424093000' → ISO 문자열."""
+    iso = f"{value[:4]}-{value[4:6]}-{value[6:8]}"
+    if len(value) > 8:
+        iso += f"T{value[8:10]}:{value[10:12]}:{value[12:14] or '00'}"
+    return iso
+
+
+class OhlcvSeries:
+    """
+    시간순(과거→최신) OHLCV 시계열.
+
+    Attributes:
+        time: epoch 초 (UTC, 캔들 시작 시각)
+        open, high, low, close, volume: 가격/거래량 배열
+        extra (dict): 출처별 추가 컬럼 (업비트 value=누적 거래대금, 네이버 foreign_rate=외국인 보유율)
+        symbol (str): 마켓/종목 코드
+        unit (str): 'days', 'minutes/1', 'dayCandle' 등 원본 단위
+    """
+
+    __slots__ = COLUMNS + ("extra", "symbol", "unit")
+
+    def __init__(self, time, open, high, low, close, volume, extra=None, symbol="", unit="days"):
+        self.time = np.asarray(time)
+        self.open = np.asarray(open)
+        self.high = np.asarray(high)
+        self.low = np.asarray(low)
+        self.close = np.asarray(close)
+        self.volume = np.asarray(volume)
+        self.extra = {k: np.asarray(v) for k, v in (extra or {}).items()}
+        self.symbol = symbol
+        self.unit = unit
+        n = len(self.time)
+        if any(len(getattr(self, c)) != n for c in COLUMNS) or any(len(v) != n for v in self.extra.values()):
+            raise ValueError("컬럼 길이가 서로 다릅니다.")
+
+    # ---------- 어댑터 ----------
+    @classmethod
+    def from_upbit(cls, candles, market: str | None = None, unit: str = "days", compact: bool = False):
+        """업비트 캔들 목록(응답/JSON 파일, 최신순이어도 됨) → 시계열. market을 주면 해당 마켓만."""
+        if market is not None:
+            candles = [c for c in candles if c.get("market") == market]
+        time_dtype, value_dtype = _dtypes(compact)
+        times = np.array([c["candle_date_time_utc"] for c in candles], dtype="datetime64[s]").astype(np.int64)
+        columns = [_column(candles, key, value_dtype) for key in UPBIT_FIELDS]
+        extra = {name: _column(candles, key, value_dtype) for name, key in UPBIT_EXTRA.items()}
+        symbol = market or (candles[0].get("market", "") if candles else "")
+        return cls._sorted(times.astype(time_dtype), columns, extra, symbol, unit)
+
+    @classmethod
+    def from_naver(cls, price_infos, code: str = "", period_type: str = "dayCandle", compact: bool = False):
+        """
+        네이버 차트 priceInfos → 시계열.
+        localDate/localDateTime은 한국 시간이므로 UTC epoch로 바꿔 저장합니다.
+        (분봉처럼 closePrice 대신 currentPrice만 있으면 그 값을 종가로 씁니다)
+        """
+        time_dtype, value_dtype = _dtypes(compact)
+        keys = [_naver_iso(p.get("localDateTime") or p["localDate"]) for p in price_infos]
+        times = np.array(keys, dtype="datetime64[s]").astype(np.int64) - KST_OFFSET
+        columns = [_column(price_infos, key, value_dtype, "currentPrice" if key == "closePrice" else None)
+                   for key in NAVER_FIELDS]
+        extra = {name: _column(price_infos, key, value_dtype) for name, key in NAVER_EXTRA.items()
+                 if price_infos and key in price_infos[0]}
+        return cls._sorted(times.astype(time_dtype), columns, extra, code, period_type)
+
+    @classmethod
+    def _sorted(cls, times, columns, extra, symbol, unit):
+        if len(times) > 1 and np.any(np.diff(times.astype(np.int64)) < 0):
+            order = np.argsort(times, kind="stable")
+            times = times[order]
+            columns = [c[order] for c in columns]
+            extra = {k: v[order] for k, v in extra.items()}
+        return cls(times, *columns, extra=extra, symbol=symbol, unit=unit)
+
+    # ---------- 조회 ----------
+    def __len__(self):
+        return len(self.time)
+
+    def __getitem__(self, index):
+        """정수 → 캔들 하나(dict), 슬라이스 → 같은 배열을 공유하는 OhlcvSeries (복사 없음)."""
+        if isinstance(index, slice):
+            return OhlcvSeries(*(getattr(self, c)[index] for c in COLUMNS),
+                               extra={k: v[index] for k, v in self.extra.items()},
+                               symbol=self.symbol, unit=self.unit)
+        row = {c: getattr(self, c)[index].item() for c in COLUMNS}
+        row.update({k: v[index].item() for k, v in self.extra.items()})
+        return row
+
+    def between(self, start=None, end=None):
+        """[start, end) 구간의 뷰. start/end는 날짜 문자열, datetime64 또는 epoch 초 (UTC)."""
+        lo = 0 if start is None else int(np.searchsorted(self.time, to_epoch(start), side="left"))
+        hi = len(self) if end is None else int(np.searchsorted(self.time, to_epoch(end), side="left"))
+        return self[lo:hi]
+
+    def datetimes(self):
+        """time 컬럼을 datetime64[s] 뷰로 (compact면 변환 복사)."""
+        if self.time.dtype == np.int64:
+            return self.time.view("datetime64[s]")
+        return self.time.astype("datetime64[s]")
+
+    def arrays(self):
+        """
+        indicators.py/backtest.py가 받는 형태의 dict (배열은 뷰 그대로).
+        거래대금(value)이 없는 시계열(네이버)은 종가 × 거래량으로 어림한 새 배열을 넣습니다.
+        """
+        out = {c: getattr(self, c) for c in COLUMNS}
+        if "value" in self.extra:
+            out["value"] = self.extra["value"]
+        else:
+            out["value"] = self.close.astype(np.float64) * self.volume
+        return out
+
+    def matrix(self, columns=COLUMNS[1:]):
+        """(캔들 수 × 컬럼 수) 2차원 배열 (새 배열로 복사)."""
+        return np.column_stack([getattr(self, c) for c in columns])
+
+    @property
+    def nbytes(self) -> int:
+        """컬럼 배열이 차지하는 바이트 수 (뷰면 원본과 공유하는 부분만큼)."""
+        return sum(getattr(self, c).nbytes for c in COLUMNS) + sum(v.nbytes for v in self.extra.values())
+
+    def __repr__(self):
+        if not len(self):
+            return f"OhlcvSeries({self.symbol!r}, {self.unit!r}, 0개)"
+        first, last = self.datetimes()[[0, -1]]
+        return f"OhlcvSeries({self.symbol!r}, {self.unit!r}, {len(self)}개, {first} ~ {last})"
@@ -0,0 +1,280 @@
+# quote_server.py
+# 저장된 업비트/네이버 시계열을 대시보드에 내주는 로컬 비동기 API 서버 (aiohttp)
+# - GET /upbit/{market}?from=&to=&interval=&count=   candle_store + {market}_*.json (candle_repository)
+# - GET /naver/{code}?from=&to=&interval=            naver_history 이력 (네이버 응답과 같은 모양)
+# - 응답 본문을 gzip(+brotli 패키지가 있으면 br)으로 미리 압축해 메모리 LRU에 보관
+# - ETag / If-None-Match → 304, 원본 파일이 바뀌면 자동으로 다시 만듦
+# - 대시보드가 페이지를 열 때마다 업스트림을 호출하지 않고 로컬 데이터로 바로 응답
+#
+# 실행:
+#   python common/quote_server.py --port 8780 --upbit-json Project1/coin-chart-app/public
+#   curl "http://127.0.0.1:8780/upbit/KRW-BTC?from=2025-08-01&to=2025-09-01"
+#   curl "http://127.0.0.1:8780/naver/005930?interval=day&from=20250701"
+
+import argparse
+import asyncio
+import bisect
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+from aiohttp import web
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Project1"))
+sys.path.insert(0, os.path.join(ROOT, "Project2"))
+
+from candle_repository import CandleRepository  # noqa: E402
+from candle_resample import resample, timeframe_delta  # noqa: E402
+from candle_store import DEFAULT_ROOT as CANDLE_ROOT, CandleStore  # noqa: E402
+from naver_history import DEFAULT_ROOT as HISTORY_ROOT, NaverHistory, record_key  # noqa: E402
+from request_to_json import PERIOD_TYPES  # noqa: E402
+
+CACHE_BYTES = 64 * 1024 * 1024  # 미리 압축한 응답을 보관할 메모리 상한
+MIN_COMPRESS = 1024             # 이보다 작은 본문은 압축하지 않음
+COUNT_MAX = 10000
+
+# 내보내기 파일 이름의 단위('/' 없음) → 캔들 단위 (minutes60 → minutes/60)
+_UNIT_NAMES = {f"minutes{m}": f"minutes/{m}" for m in (1, 3, 5, 10, 15, 30, 60, 240)}
+
+
+class _Entry:
+    __slots__ = ("source", "etag", "bodies", "size")
+
+    def __init__(self, source, body: bytes):
+        self.source = source
+        self.etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        self.bodies = {"identity": body}
+        if len(body) >= MIN_COMPRESS:
+            self.bodies["gzip"] = gzip.compress(body, 6)
+            if brotli is not None:
+                self.bodies["br"] = brotli.compress(body, quality=5)
+        self.size = sum(len(b) for b in self.bodies.values())
+
+
+class ResponseCache:
+    """
+    (경로, 쿼리) → 미리 압축한 응답 (스레드 안전).
+    source는 응답을 만든 원본 객체(캔들 목록/파일 서명)이고, 원본이 다시 읽혀 다른 객체가 되면 무효.
+    """
+
+    def __init__(self, max_bytes: int = CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, source):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.source is not source:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, source, body: bytes) -> _Entry:
+        entry = _Entry(source, body)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old.size
+            self._entries[key] = entry
+            self._size += entry.size
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                _, dropped = self._entries.popitem(last=False)
+                self._size -= dropped.size
+        return entry
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "bytes": self._size}
+
+
+def _pick_encoding(accept: str, entry: _Entry) -> str:
+    accept = accept.lower()
+    for encoding in ("br", "gzip"):
+        if encoding in entry.bodies and encoding in accept:
+            return encoding
+    return "identity"
+
+
+def _naver_key(value: str) -> str:
+    """'2025-09-24' 또는 '20250924' → '20250924'."""
+    return value.replace("-", "").replace(":", "").replace("T", "").replace(" ", "")
+
+
+class QuoteService:
+    """
+    요청을 처리하는 부분 (HTTP와 분리해서 직접 호출/테스트 가능).
+
+    Args:
+        repo (CandleRepository): 업비트 시계열
+        history (NaverHistory): 네이버 이력
+    """
+
+    def __init__(self, repo: CandleRepository, history: NaverHistory, cache: ResponseCache | None = None):
+        self.repo = repo
+        self.history = history
+        self.cache = cache or ResponseCache()
+        self._naver = {}  # (code, periodType) → (파일 서명, 레코드 목록, 키 목록)
+        self._lock = threading.Lock()
+
+    # ---------- 원본 ----------
+    def upbit_units(self, market: str):
+        """저장소/내보내기 파일에 있는 캔들 단위 목록."""
+        units = set()
+        store = self.repo.store
+        if store is not None and os.path.isdir(os.path.join(store.root, market)):
+            units.update(name[:-len(".ndjson")].replace("_", "/")
+                         for name in os.listdir(os.path.join(store.root, market)) if name.endswith(".ndjson"))
+        for label in self.repo.json_units(market):
+            units.add(_UNIT_NAMES.get(label, label))
+        return units
+
+    def _upbit_source(self, market: str, interval: str):
+        """요청한 interval을 바로 주거나, 더 잘게 저장된 단위에서 리샘플할 원본 단위를 고릅니다."""
+        units = self.upbit_units(market)
+        if interval in units:
+            return interval
+        target = timeframe_delta(interval)
+        finer = [u for u in units if timeframe_delta(u) < target and not target % timeframe_delta(u)]
+        if not finer:
+            raise web.HTTPNotFound(text=f"{market} {interval} 데이터가 없습니다.")
+        return max(finer, key=timeframe_delta)
+
+    def _naver_series(self, code: str, period_type: str):
+        path = self.history.data_path(code, period_type)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            raise web.HTTPNotFound(text=f"{code} {period_type} 이력이 없습니다.")
+        signature = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._naver.get((code, period_type))
+        if cached is None or cached[0] != signature:
+            records = self.history.load(code, period_type)
+            cached = (signature, records, [record_key(r) for r in records])
+            with self._lock:
+                self._naver[(code, period_type)] = cached
+        return cached
+
+    # ---------- 응답 ----------
+    def upbit(self, market: str, query) -> _Entry:
+        interval = query.get("interval", "days")
+        try:
+            unit = self._upbit_source(market, interval)
+        except ValueError:
+            raise web.HTTPBadRequest(text=f"지원하지 않는 interval입니다: {interval}")
+        series = self.repo.series(market, unit)
+        key = ("upbit", market, tuple(sorted(query.items())))
+        entry = self.cache.get(key, series)
+        if entry is not None:
+            return entry
+
+        candles = self.repo.get_range(market, query.get("from"), query.get("to"), unit)
+        if unit != interval:
+            candles = list(resample(candles, interval))
+        if "count" in query:
+            count = min(COUNT_MAX, max(0, int(query["count"])))
+            candles = candles[-count:] if count else []
+        # 업비트 API와 같은 최신순
+        body = json.dumps(candles[::-1], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return self.cache.put(key, series, body)
+
+    def naver(self, code: str, query) -> _Entry:
+        interval = query.get("interval", query.get("periodType", "day"))
+        period_type = PERIOD_TYPES.get(interval, interval)
+        signature, records, keys = self._naver_series(code, period_type)
+        key = ("naver", code, tuple(sorted(query.items())))
+        entry = self.cache.get(key, signature)
+        if entry is not None:
+            return entry
+
+        lo = bisect.bisect_left(keys, _naver_key(query["from"])) if "from" in query else 0
+        hi = bisect.bisect_left(keys, _naver_key(query["to"])) if "to" in query else len(keys)
+        rows = records[lo:hi]
+        if "count" in query:
+            count = min(COUNT_MAX, max(0, int(query["count"])))
+            rows = rows[-count:] if count else []
+        payload = {"code": code, "periodType": period_type, "priceInfos": rows}
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return self.cache.put(key, signature, body)
+
+
+# -----------------------------
+# HTTP
+# -----------------------------
+def _respond(request: web.Request, entry: _Entry) -> web.Response:
+    headers = {
+        "ETag": entry.etag,
+        "Cache-Control": "no-cache",  # 매번 ETag로 확인 (304면 본문 없이 응답)
+        "Vary": "Accept-Encoding",
+        "Access-Control-Allow-Origin": "*",
+    }
+    if entry.etag in request.headers.get("If-None-Match", ""):
+        return web.Response(status=304, headers=headers)
+    encoding = _pick_encoding(request.headers.get("Accept-Encoding", ""), entry)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return web.Response(body=entry.bodies[encoding], headers=headers, content_type="application/json",
+                        charset="utf-8")
+
+
+def make_app(service: QuoteService) -> web.Application:
+    async def run(fn, *args):
+        # 원본 확인/파일 읽기/직렬화는 스레드에서 (이벤트 루프를 막지 않음)
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    async def upbit(request: web.Request):
+        try:
+            entry = await run(service.upbit, request.match_info["market"], dict(request.query))
+        except (KeyError, ValueError) as e:
+            raise web.HTTPBadRequest(text=str(e))
+        return _respond(request, entry)
+
+    async def naver(request: web.Request):
+        try:
+            entry = await run(service.naver, request.match_info["code"], dict(request.query))
+        except (KeyError, ValueError) as e:
+            raise web.HTTPBadRequest(text=str(e))
+        return _respond(request, entry)
+
+    async def stats(request: web.Request):
+        return web.json_response({"responses": service.cache.summary(),
+                                  "repository": {"hits": service.repo.hits, "misses": service.repo.misses}})
+
+    app = web.Application()
+    app.router.add_get("/upbit/{market}", upbit)
+    app.router.add_get("/naver/{code}", naver)
+    app.router.add_get("/stats", stats)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 시세 API 서버 (업비트/네이버 저장 데이터)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8780)
+    parser.add_argument("--upbit-json", default=os.path.join(ROOT, "Project1"), help="{market}_*.json 폴더")
+    parser.add_argument("--candles", default=os.path.join(ROOT, "Project1", CANDLE_ROOT), help="candle_store 폴더")
+    parser.add_argument("--history", default=os.path.join(ROOT, "Project2", HISTORY_ROOT), help="naver_history 폴더")
+    args = parser.parse_args()
+
+    service = QuoteService(CandleRepository(args.upbit_json, CandleStore(args.candles)), NaverHistory(args.history))
+    web.run_app(make_app(service), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
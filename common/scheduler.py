@@ -0,0 +1,451 @@
+# scheduler.py
+# 시세 수집 작업을 한 프로세스에서 계속 돌리는 폴링 스케줄러 (Project1/Project2 공용)
+# - 외부 cron 대신 소스(업비트, 네이버 등)별 주기/지터/동시 실행 수를 직접 관리
+# - 첫 실행 시각을 주기 안에 고르게 흩어서 한꺼번에 몰리는 요청(thundering herd)을 막음
+# - 같은 자원(key)에 대한 요청이 겹치면 진행 중인 요청 하나에 합침(single-flight)
+# - 실패/요청 제한(429) 시 지수 백오프 + 지터, 성공하면 원래 주기로 복귀
+# - 실행 횟수/실패/합쳐진 요청/지연 시간 등 지표를 dict 또는 HTTP(/metrics)로 제공
+#
+# 사용 예:
+#   scheduler = Scheduler()
+#   scheduler.add_source("upbit", interval=60, concurrency=2)
+#   scheduler.add_job("upbit", "KRW-BTC", lambda: store.sync("KRW-BTC"))
+#   scheduler.run_forever()
+#
+# 데몬 실행:
+#   python common/scheduler.py --upbit KRW-BTC KRW-ETH --naver 005930 000660 --metrics-port 8765
+#   python common/scheduler.py --upbit KRW-BTC --alerts rules.json   # 새 캔들마다 알림 규칙 평가 (alerts.py)
+
+import argparse
+import heapq
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY_SAMPLES = 256   # 소스별로 보관할 최근 실행 시간 수
+
+
+class Source:
+    """
+    폴링 대상 하나(업비트, 네이버 등)의 설정과 지표.
+
+    Args:
+        name (str): 소스 이름
+        interval (float): 작업별 실행 주기(초)
+        jitter (float): 주기에 곱하는 무작위 비율 (0.1이면 ±10%)
+        concurrency (int): 이 소스에서 동시에 실행할 작업 수
+        backoff_base (float): 첫 실패 후 대기 시간(초), 실패할 때마다 2배
+        backoff_max (float): 백오프 상한(초)
+    """
+
+    def __init__(self, name, interval, jitter=0.1, concurrency=4, backoff_base=5.0, backoff_max=600.0):
+        self.name = name
+        self.interval = interval
+        self.jitter = jitter
+        self.concurrency = concurrency
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.running = 0        # 풀에 제출된 작업 수 (concurrency 이하)
+        self.waiting = deque()  # 자리가 나길 기다리는 (key, fn, future), 풀 스레드를 점유하지 않음
+        self.runs = 0
+        self.failures = 0
+        self.coalesced = 0
+        self.in_flight = 0
+        self.backing_off = 0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.last_error = None
+
+    def next_delay(self):
+        return self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def backoff_delay(self, failures):
+        """지수 백오프에 지터를 섞은 대기 시간 (최소 절반은 기다림)."""
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (failures - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def snapshot(self):
+        samples = sorted(self.latencies)
+        pick = lambda q: round(samples[min(len(samples) - 1, int(q * len(samples)))], 4) if samples else None
+        return {
+            "interval": self.interval, "concurrency": self.concurrency,
+            "runs": self.runs, "failures": self.failures, "coalesced": self.coalesced,
+            "in_flight": self.in_flight, "queued": len(self.waiting), "backing_off": self.backing_off,
+            "latency_p50": pick(0.5), "latency_p99": pick(0.99), "last_error": self.last_error,
+        }
+
+
+class _Job:
+    __slots__ = ("source", "key", "fn", "failures", "next_run", "seq", "last_ok", "enabled")
+
+    def __init__(self, source, key, fn):
+        self.source = source
+        self.key = key
+        self.fn = fn
+        self.failures = 0
+        self.next_run = 0.0
+        self.seq = 0
+        self.last_ok = None
+        self.enabled = True
+
+
+class Scheduler:
+    """
+    소스별 주기/동시성/백오프를 지키며 작업을 반복 실행하는 스케줄러.
+
+    Args:
+        workers (int): 작업을 실행하는 스레드 수 (모든 소스 공용)
+        is_rate_limited (callable, optional): 예외를 받아 요청 제한이면 True.
+            True면 그 소스의 모든 작업을 함께 백오프합니다. 기본은 메시지/상태 코드에 429가 있는지 확인.
+    """
+
+    def __init__(self, workers: int = 16, is_rate_limited=None):
+        self.sources = {}
+        self.jobs = {}
+        self.is_rate_limited = is_rate_limited or _looks_rate_limited
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scheduler")
+        self._heap = []
+        self._seq = 0
+        self._flights = {}  # key → Future (진행 중인 요청)
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._stopped = False
+        self._pause_until = {}  # 소스 → 소스 전체 백오프가 끝나는 시각
+        self.started_at = time.time()
+
+    # ---------- 등록 ----------
+    def add_source(self, name, interval, **options) -> Source:
+        source = Source(name, interval, **options)
+        self.sources[name] = source
+        return source
+
+    def add_job(self, source: str, key: str, fn):
+        """
+        반복 작업을 등록합니다. 같은 소스의 작업들은 첫 실행 시각이 주기 안에 고르게 흩어집니다.
+
+        Args:
+            source (str): add_source로 등록한 소스 이름
+            key (str): 자원 이름 (같은 key의 요청은 하나로 합쳐짐, 예: 'upbit:KRW-BTC')
+            fn (callable): 인자 없는 함수
+        """
+        job = _Job(self.sources[source], key, fn)
+        with self._lock:
+            self.jobs[key] = job
+            self._respread(job.source)
+            self._wake.notify()
+        return job
+
+    def _respread(self, source: Source):
+        jobs = [j for j in self.jobs.values()
+                if j.source is source and j.last_ok is None and j.failures == 0 and j.next_run != float("inf")]
+        now = time.monotonic()
+        for i, job in enumerate(jobs):
+            self._push(job, now + source.interval * i / len(jobs))
+
+    def _push(self, job: _Job, when: float):
+        self._seq += 1
+        job.next_run, job.seq = when, self._seq
+        heapq.heappush(self._heap, (when, self._seq, job))
+
+    # ---------- single-flight ----------
+    def fetch(self, key: str, fn, source: str | None = None) -> Future:
+        """
+        fn을 실행한 Future를 돌려줍니다. 같은 key가 이미 실행 중이면 새로 실행하지 않고 그 Future를 돌려줍니다.
+        (수동 요청, API 서버 등에서 스케줄과 같은 자원을 요청할 때도 씀)
+        """
+        src = self.sources.get(source) if source else None
+        with self._lock:
+            running = self._flights.get(key)
+            if running is not None:
+                if src is not None:
+                    src.coalesced += 1
+                return running
+            future = Future()
+            self._flights[key] = future
+            if src is not None:
+                src.in_flight += 1
+                # 소스의 동시 실행 수가 찼으면 풀에 넣지 않고 소스별 대기열에 둠
+                # (풀 스레드 안에서 기다리면 다른 소스의 작업까지 막힘)
+                if src.running >= src.concurrency:
+                    src.waiting.append((key, fn, future))
+                    return future
+                src.running += 1
+        self._submit(key, fn, src, future)
+        return future
+
+    def _submit(self, key, fn, source, future):
+        try:
+            self._pool.submit(self._execute, key, fn, source, future)
+        except RuntimeError as e:  # stop() 이후 (풀이 닫힘)
+            self._finish(key, source, future, None, e, 0.0)
+
+    def _execute(self, key, fn, source, future):
+        t0 = time.perf_counter()
+        try:
+            result = fn()
+        except BaseException as e:
+            error = e
+            result = None
+        else:
+            error = None
+        self._finish(key, source, future, result, error, time.perf_counter() - t0)
+
+    def _finish(self, key, source, future, result, error, elapsed):
+        queued = None
+        with self._lock:
+            self._flights.pop(key, None)
+            if source is not None:
+                source.in_flight -= 1
+                source.runs += 1
+                source.latencies.append(elapsed)
+                if error is not None:
+                    source.failures += 1
+                    source.last_error = f"{type(error).__name__}: {error}"[:200]
+                # 자리를 반납하지 않고 같은 소스의 대기 작업에 넘김
+                if source.waiting:
+                    queued = source.waiting.popleft()
+                else:
+                    source.running -= 1
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+        if queued is not None:
+            self._submit(*queued[:2], source, queued[2])
+
+    # ---------- 실행 ----------
+    def _on_done(self, job: _Job, future: Future):
+        error = future.exception()
+        now = time.monotonic()
+        with self._lock:
+            source = job.source
+            if error is None:
+                job.failures = 0
+                job.last_ok = time.time()
+                delay = source.next_delay()
+            else:
+                job.failures += 1
+                delay = source.backoff_delay(job.failures)
+                if self.is_rate_limited(error):
+                    # 요청 제한은 소스 전체에 걸리므로 같은 소스의 다른 작업도 함께 쉼
+                    self._pause_until[source.name] = max(self._pause_until.get(source.name, 0), now + delay)
+            source.backing_off = sum(1 for j in self.jobs.values() if j.source is source and j.failures)
+            if job.enabled and not self._stopped:
+                self._push(job, now + delay)
+                self._wake.notify()
+
+    def _dispatch(self, job: _Job):
+        future = self.fetch(job.key, job.fn, job.source.name)
+        future.add_done_callback(lambda f: self._on_done(job, f))
+
+    def run_forever(self):
+        """stop()이 불릴 때까지 만기가 된 작업을 실행합니다. (현재 스레드를 점유)"""
+        with self._lock:
+            while not self._stopped:
+                now = time.monotonic()
+                if not self._heap:
+                    self._wake.wait(1.0)
+                    continue
+                when, seq, job = self._heap[0]
+                if job.seq != seq or not job.enabled:
+                    heapq.heappop(self._heap)  # 다시 예약되어 무효가 된 항목
+                    continue
+                paused = self._pause_until.get(job.source.name, 0)
+                if when > now or paused > now:
+                    self._wake.wait(max(0.0, max(when, paused) - now))
+                    continue
+                heapq.heappop(self._heap)
+                job.next_run = float("inf")  # 실행 중 (완료 시 다시 예약)
+                self._lock.release()
+                try:
+                    self._dispatch(job)
+                finally:
+                    self._lock.acquire()
+
+    def start(self) -> threading.Thread:
+        """백그라운드 스레드에서 run_forever를 실행합니다."""
+        thread = threading.Thread(target=self.run_forever, name="scheduler-loop", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self, wait: bool = True):
+        with self._lock:
+            self._stopped = True
+            self._wake.notify_all()
+        self._pool.shutdown(wait=wait)
+
+    def remove_job(self, key: str):
+        with self._lock:
+            job = self.jobs.pop(key, None)
+            if job is not None:
+                job.enabled = False
+
+    # ---------- 지표 ----------
+    def metrics(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            jobs = {
+                key: {"source": job.source.name, "failures": job.failures, "last_ok": job.last_ok,
+                      "next_run_in": None if job.next_run == float("inf") else round(job.next_run - now, 1)}
+                for key, job in self.jobs.items()
+            }
+            return {
+                "uptime": round(time.time() - self.started_at, 1),
+                "sources": {name: s.snapshot() for name, s in self.sources.items()},
+                "paused": {name: round(t - now, 1) for name, t in self._pause_until.items() if t > now},
+                "jobs": jobs,
+            }
+
+    def serve_metrics(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """GET /metrics 로 지표(JSON)를 내보내는 HTTP 서버를 백그라운드에서 띄웁니다."""
+        scheduler = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = json.dumps(scheduler.metrics(), ensure_ascii=False).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="scheduler-metrics", daemon=True).start()
+        return server
+
+
+def _looks_rate_limited(error) -> bool:
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    return "429" in str(error)
+
+
+# -----------------------------
+# 데몬: 업비트 마켓 + 네이버 종목 수집
+# -----------------------------
+def _project_path(name: str) -> str:
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), name)
+
+
+def _report(alerts):
+    from alerts import format_alert
+
+    for alert in alerts:
+        print(format_alert(alert), flush=True)
+
+
+def add_upbit_jobs(scheduler: Scheduler, markets, unit="days", root=None, interval=60.0, concurrency=2, alerts=None):
+    """
+    업비트 마켓별로 candle_store 동기화(가장 최근 캔들 이후만 요청)를 등록합니다.
+    alerts(AlertEngine)를 주면 동기화 후 저장소에 새로 덧붙은 캔들을 모두 시간순으로 평가합니다
+    (처음 한 번은 저장된 캔들로 윈도를 채움). 백오프 등으로 한 번에 여러 캔들이 들어와도 빠지지 않습니다.
+    """
+    sys.path.insert(0, _project_path("Project1"))
+    from candle_store import DEFAULT_ROOT, CandleStore
+    from upbit_backfill import TokenBucket
+
+    store = CandleStore(root or DEFAULT_ROOT)
+    bucket = TokenBucket()  # 동시에 도는 마켓 동기화 전체가 업비트 초당 요청 제한 하나를 나눠 씀
+    cursors = {}  # 마켓 → 알림 엔진에 넣은 저장소 파일 위치 (candle_store.read_from)
+
+    def feed(market):
+        candles, cursors[market] = store.read_from(market, unit, cursors.get(market))
+        last = alerts.last_time(market)
+        # 엔진이 마지막으로 본 캔들(진행 중이었을 수 있음)부터 그 뒤 캔들까지
+        candles = sorted((c for c in candles if last is None or c["candle_date_time_utc"] >= last),
+                         key=lambda c: c["candle_date_time_utc"])
+        _report(alerts.on_candles(market, candles))
+
+    def poll(market):
+        added = store.sync(market, unit, bucket=bucket)
+        if alerts is not None:
+            feed(market)
+        return added
+
+    scheduler.add_source("upbit", interval, concurrency=concurrency)
+    for market in markets:
+        scheduler.add_job("upbit", f"upbit:{market}:{unit}", lambda m=market: poll(m))
+
+
+def add_naver_jobs(scheduler: Scheduler, codes, period_type="dayCandle", history_root=None,
+                   interval=300.0, concurrency=4, alerts=None):
+    """
+    네이버 종목별로 차트 요청(HTTP 캐시 경유) → 이력 병합(새 행만 덧붙임)을 등록합니다.
+    alerts(AlertEngine)를 주면 응답의 새 priceInfos로 알림 규칙을 평가합니다.
+    """
+    sys.path.insert(0, _project_path("Project2"))
+    from http_cache import HttpCache
+    from naver_history import DEFAULT_ROOT, NaverHistory
+    from request_to_json import HostLimiter, fetch_chart, make_session
+
+    session = make_session(concurrency)
+    limiter = HostLimiter(concurrency)
+    cache = HttpCache()
+    history = NaverHistory(history_root or DEFAULT_ROOT)
+
+    def poll(code):
+        data = fetch_chart(session, code, period_type, limiter, cache)
+        if alerts is not None:
+            _report(alerts.on_candles(code, data.get("priceInfos", [])))
+        return history.merge(code, period_type, data.get("priceInfos", []))
+
+    scheduler.add_source("naver", interval, concurrency=concurrency)
+    for code in codes:
+        scheduler.add_job("naver", f"naver:{code}:{period_type}", lambda c=code: poll(c))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="시세 수집 스케줄러 데몬 (cron 대체)")
+    parser.add_argument("--upbit", nargs="*", default=[], help="업비트 마켓 (예: KRW-BTC KRW-ETH)")
+    parser.add_argument("--upbit-unit", default="days")
+    parser.add_argument("--upbit-interval", type=float, default=60)
+    parser.add_argument("--naver", nargs="*", default=[], help="네이버 종목 코드 (예: 005930)")
+    parser.add_argument("--naver-period", default="dayCandle")
+    parser.add_argument("--naver-interval", type=float, default=300)
+    parser.add_argument("--metrics-port", type=int, default=None, help="지정하면 http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--alerts", default=None, help="알림 규칙 JSON 파일 (alerts.load_rules 형식)")
+    args = parser.parse_args()
+
+    engine = None
+    if args.alerts:
+        from alerts import AlertEngine, load_rules
+
+        engine = AlertEngine()
+        print(f"알림 규칙 {load_rules(engine, args.alerts)}개")
+
+    scheduler = Scheduler()
+    if args.upbit:
+        add_upbit_jobs(scheduler, args.upbit, args.upbit_unit, interval=args.upbit_interval, alerts=engine)
+    if args.naver:
+        add_naver_jobs(scheduler, args.naver, args.naver_period, interval=args.naver_interval, alerts=engine)
+    if not scheduler.jobs:
+        parser.error("--upbit 또는 --naver로 수집할 대상을 지정하세요.")
+    if args.metrics_port:
+        scheduler.serve_metrics(args.metrics_port)
+        print(f"지표: http://127.0.0.1:{args.metrics_port}/metrics")
+
+    print(f"작업 {len(scheduler.jobs)}개 시작 (Ctrl+C로 종료)")
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        scheduler.stop(wait=False)
+        for name, stats in scheduler.metrics()["sources"].items():
+            print(f"{name}: 실행 {stats['runs']}회, 실패 {stats['failures']}회, 합쳐진 요청 {stats['coalesced']}회")
+
+
+if __name__ == "__main__":
+    main()
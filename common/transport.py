@@ -0,0 +1,252 @@
+# transport.py
+# 저장소 전체가 같이 쓰는 HTTP 전송 계층 (Project1/Project2/Project4 공용)
+# - 호스트별 keep-alive 연결 풀 (requests.Session + HTTPAdapter), 매 요청마다 새 연결을 열지 않음
+# - Accept-Encoding: gzip, deflate (brotli 패키지가 있으면 br도)
+# - 요청별 타임아웃, 연결 오류/429/5xx는 지수 백오프 + 지터로 재시도 (Retry-After 존중)
+# - 호스트별 지연 시간 히스토그램, 재시도/오류 횟수, 새로 연 연결 수
+# - googleapiclient.discovery.build(http=...)에 넘길 수 있는 httplib2 호환 어댑터
+#
+# 사용 예:
+#   from transport import default_transport
+#   response = default_transport().get(url, params=params, headers=headers)
+#   print(default_transport().summary())
+
+import random
+import threading
+import time
+from bisect import bisect_left
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import brotli  # noqa: F401  (있으면 urllib3가 br 응답을 풀어 줌)
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+TIMEOUT_SEC = 10
+RETRIES = 3
+BACKOFF_SEC = 0.5
+BACKOFF_MAX_SEC = 30
+POOL_SIZE = 8
+RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+
+# 지연 시간 히스토그램 구간 상한(ms). 마지막 칸은 그보다 긴 요청
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class HostStats:
+    """호스트 하나의 요청 지표."""
+
+    __slots__ = ("requests", "errors", "retries", "buckets", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float):
+        self.requests += 1
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def quantile(self, q: float):
+        """히스토그램 구간 상한으로 어림한 분위수(ms)."""
+        if not self.requests:
+            return None
+        target = q * self.requests
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                return LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> dict:
+        labels = [f"<={b}ms" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            "requests": self.requests, "errors": self.errors, "retries": self.retries,
+            "mean_ms": round(self.total_ms / self.requests, 1) if self.requests else None,
+            "p50_ms": self.quantile(0.5), "p99_ms": self.quantile(0.99), "max_ms": round(self.max_ms, 1),
+            "histogram": dict(zip(labels, self.buckets)),
+        }
+
+
+class Transport:
+    """
+    호스트별 연결 풀을 가진 HTTP 클라이언트 (스레드 안전). requests.Session 대신 넘겨도 됩니다.
+
+    Args:
+        headers (dict, optional): 모든 요청에 붙일 기본 헤더
+        timeout (float): 기본 타임아웃(초)
+        retries (int): 기본 재시도 횟수 (0이면 재시도 안 함)
+        backoff (float): 첫 재시도 대기(초), 재시도마다 2배
+        pool_size (int): 호스트당 keep-alive 연결 수
+    """
+
+    def __init__(self, headers=None, timeout: float = TIMEOUT_SEC, retries: int = RETRIES,
+                 backoff: float = BACKOFF_SEC, pool_size: int = POOL_SIZE):
+        self.headers = {"Accept-Encoding": ACCEPT_ENCODING, **(headers or {})}
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self._sessions = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    # ---------- 세션/지표 ----------
+    def session(self, host: str) -> requests.Session:
+        """호스트 전용 세션 (처음 요청할 때 만들고 계속 재사용)."""
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, pool_block=True)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[host] = session
+                self._stats[host] = HostStats()
+            return session
+
+    def _host_stats(self, host: str) -> HostStats:
+        with self._lock:
+            return self._stats.setdefault(host, HostStats())
+
+    def connections_opened(self, host: str) -> int:
+        """호스트에 지금까지 새로 연 TCP 연결 수 (연결 재사용이 잘 되면 풀 크기 이하로 유지)."""
+        session = self._sessions.get(host)
+        if session is None:
+            return 0
+        total = 0
+        adapters = {id(a): a for a in session.adapters.values()}  # http/https에 같은 어댑터를 씀
+        for adapter in adapters.values():
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                total += getattr(pools.get(key), "num_connections", 0)
+        return total
+
+    def stats(self) -> dict:
+        with self._lock:
+            hosts = dict(self._stats)
+        return {host: {**s.snapshot(), "connections_opened": self.connections_opened(host)}
+                for host, s in hosts.items()}
+
+    def summary(self) -> str:
+        lines = []
+        for host, s in self.stats().items():
+            lines.append(f"{host}: 요청 {s['requests']}회, 재시도 {s['retries']}회, 오류 {s['errors']}회, "
+                         f"새 연결 {s['connections_opened']}개, p50 {s['p50_ms']}ms, p99 {s['p99_ms']}ms")
+        return "\n".join(lines)
+
+    # ---------- 요청 ----------
+    def request(self, method: str, url: str, params=None, headers=None, timeout: float | None = None,
+                retries: int | None = None, **kwargs) -> requests.Response:
+        """
+        요청을 보내고 Response를 돌려줍니다. 연결 오류/타임아웃/429/5xx는 재시도합니다.
+        마지막 시도도 실패하면 연결 오류는 예외로, 상태 코드는 그대로 Response로 돌려줍니다.
+        """
+        host = urlparse(url).netloc
+        session = self.session(host)
+        stats = self._host_stats(host)
+        merged = {**self.headers, **(headers or {})}
+        timeout = self.timeout if timeout is None else timeout
+        retries = self.retries if retries is None else retries
+
+        for attempt in range(retries + 1):
+            t0 = time.perf_counter()
+            try:
+                response = session.request(method, url, params=params, headers=merged, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                with self._lock:
+                    stats.observe((time.perf_counter() - t0) * 1000)
+                    stats.errors += 1
+                if attempt == retries:
+                    raise
+            else:
+                with self._lock:
+                    stats.observe((time.perf_counter() - t0) * 1000)
+                    if response.status_code >= 400:
+                        stats.errors += 1
+                if response.status_code not in RETRY_STATUS or attempt == retries:
+                    return response
+                retry_after = _retry_after(response)
+                response.close()
+                if retry_after is not None:
+                    with self._lock:
+                        stats.retries += 1
+                    time.sleep(min(retry_after, BACKOFF_MAX_SEC))
+                    continue
+            with self._lock:
+                stats.retries += 1
+            delay = min(BACKOFF_MAX_SEC, self.backoff * 2 ** attempt)
+            time.sleep(delay / 2 + random.uniform(0, delay / 2))
+
+    def get(self, url: str, params=None, headers=None, timeout: float | None = None, **kwargs) -> requests.Response:
+        return self.request("GET", url, params=params, headers=headers, timeout=timeout, **kwargs)
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------- googleapiclient ----------
+    def httplib2(self):
+        """googleapiclient.discovery.build(..., http=transport.httplib2())용 어댑터."""
+        return Httplib2Adapter(self)
+
+
+class Httplib2Adapter:
+    """httplib2.Http.request()와 같은 모양으로 Transport를 감싼 객체."""
+
+    def __init__(self, transport: Transport):
+        self.transport = transport
+        self.redirect_codes = set()
+        self.timeout = transport.timeout
+
+    def request(self, uri, method="GET", body=None, headers=None, redirections=5, connection_type=None):
+        import httplib2
+
+        response = self.transport.request(method, uri, headers=headers, data=body,
+                                          allow_redirects=redirections > 0)
+        info = {k.lower(): v for k, v in response.headers.items()}
+        info.pop("content-encoding", None)  # requests가 이미 풀어 줌
+        info["status"] = str(response.status_code)
+        return httplib2.Response(info), response.content
+
+    def close(self):
+        pass
+
+
+def _retry_after(response):
+    value = response.headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_transport() -> Transport:
+    """프로세스 전체가 공유하는 기본 Transport."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = Transport()
+        return _default
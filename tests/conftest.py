@@ -0,0 +1,8 @@
+# conftest.py
+# 프로젝트 폴더의 스크립트들은 같은 폴더 모듈을 바로 import하므로 테스트에서도 경로에 넣어 둠
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for folder in ("common", "Project1", "Project2", "Project4"):
+    sys.path.insert(0, os.path.join(ROOT, folder))
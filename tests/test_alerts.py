@@ -0,0 +1,64 @@
+# alerts: 스케줄러의 업비트 작업이 저장소에 들어온 캔들을 빠짐없이 엔진에 넣는지 확인
+import random
+from datetime import datetime, timedelta, timezone
+
+import candle_store
+from alerts import AlertEngine, Rule
+from scheduler import Scheduler, add_upbit_jobs
+
+
+def _candles(count, seed=7):
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    price, candles = 100.0, []
+    for i in range(count):
+        price *= 1 + rng.gauss(0, 0.03)
+        candles.append({
+            "market": "KRW-BTC",
+            "candle_date_time_utc": (start + timedelta(days=i)).strftime("%Y-%m-%dT%H:%M:%S"),
+            "trade_price": round(price, 2), "high_price": round(price * 1.01, 2),
+            # 엔진이 거래량으로 읽는 필드 (ohlcv.UPBIT_FIELDS). 40번째 캔들에 거래량 급증
+            "candle_acc_trade_volume": 1000.0 if i == 40 else round(rng.uniform(1, 100), 3),
+        })
+    return candles
+
+
+def _engine():
+    engine = AlertEngine()
+    engine.add_rule(Rule("pct_change", 3, 4.0))
+    engine.add_rule(Rule("pct_change", 3, -4.0, "below"))
+    engine.add_rule(Rule("volume_z", 10, 1.5))
+    engine.add_rule(Rule("breakout", 5, 0.0))
+    return engine
+
+
+def test_upbit_poll_feeds_every_new_candle(tmp_path, monkeypatch):
+    candles = _candles(80)
+    # 폴링마다 들어오는 새 캔들 수: 처음 20개 이후 1개, 여러 개(백오프 후), 0개가 섞임
+    batches = [candles[:20], candles[20:21], candles[21:26], [], candles[26:27], candles[27:45], candles[45:]]
+
+    def fake_sync(self, market, unit="days", **kwargs):
+        return self.append(market, batches.pop(0), unit)
+
+    monkeypatch.setattr(candle_store.CandleStore, "sync", fake_sync)
+    engine = _engine()
+    scheduler = Scheduler(workers=1)
+    try:
+        add_upbit_jobs(scheduler, ["KRW-BTC"], root=str(tmp_path), alerts=engine)
+        poll = scheduler.jobs["upbit:KRW-BTC:days"].fn
+        fired = []
+        monkeypatch.setattr("scheduler._report", fired.extend)
+        while batches:
+            poll()
+    finally:
+        scheduler.stop(wait=False)
+
+    # 기준: 처음 20개로 윈도를 채운 뒤 나머지를 한 개씩 넣은 결과
+    reference = _engine()
+    expected = reference.on_candles("KRW-BTC", candles[:20])
+    for candle in candles[20:]:
+        expected += reference.on_candle("KRW-BTC", candle)
+    assert expected  # 규칙이 실제로 발동하는 데이터인지
+    assert any(alert["rule"].startswith("volume_z") for alert in fired)
+    assert fired == expected
+    assert engine.candles == reference.candles == len(candles)
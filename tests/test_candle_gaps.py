@@ -0,0 +1,67 @@
+# candle_gaps: 저장소 검사가 파일 순서 그대로 보고하고, 확인된 빈 구간은 다시 요청하지 않는지 확인
+from datetime import datetime, timedelta, timezone
+
+import candle_gaps
+from candle_gaps import check_market, repair
+from candle_store import CandleStore
+
+START = datetime(2025, 9, 1, tzinfo=timezone.utc)
+
+
+def _candle(hour, price=100.0):
+    key = (START + timedelta(hours=hour)).strftime("%Y-%m-%dT%H:%M:%S")
+    return {"market": "KRW-BTC", "candle_date_time_utc": key, "trade_price": price}
+
+
+def test_store_report_keeps_file_order(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.append("KRW-BTC", [_candle(h) for h in range(5)], "minutes/60")
+    store.append("KRW-BTC", [_candle(4, 101.0), _candle(5)], "minutes/60")  # 진행 중이던 캔들 갱신
+    store.append("KRW-BTC", [_candle(2, 99.0)], "minutes/60")                # 과거 캔들을 나중에 덧붙임
+    report = check_market(store, "KRW-BTC", "minutes/60")
+    assert report["count"] == 8
+    assert len(report["duplicates"]) == 2
+    assert report["out_of_order"] == [7]
+
+
+def test_held_ranges_are_not_refetched(tmp_path, monkeypatch):
+    store = CandleStore(str(tmp_path))
+    hours = [0, 1, 2, 6, 7, 10, 11]
+    store.append("KRW-BTC", [_candle(h) for h in hours], "minutes/60",
+                 covered=(START, START + timedelta(hours=8)))  # 0~8시는 요청해 봤음 → 3~5시는 체결 없음
+    store.append("KRW-BTC", [_candle(h) for h in (10, 11)], "minutes/60",
+                 covered=(START + timedelta(hours=10), START + timedelta(hours=12)))
+
+    report = check_market(store, "KRW-BTC", "minutes/60")
+    epoch = int(START.timestamp())
+    assert report["missing"] == [(epoch + 8 * 3600, epoch + 10 * 3600)]
+    assert report["missing_count"] == 2
+    assert report["held_count"] == 3
+
+    requested = []
+
+    def fake_refetch(market, gaps, unit="days", **kwargs):
+        requested.extend(gaps)
+        return []
+
+    monkeypatch.setattr(candle_gaps, "refetch", fake_refetch)
+    repair(store, "KRW-BTC", "minutes/60")
+    assert requested == report["missing"]
+
+
+def test_daily_hole_inside_covered_range_is_missing(tmp_path, monkeypatch):
+    store = CandleStore(str(tmp_path))
+    days = [0, 1, 2, 4, 5]  # 3일째가 페이지 커서 실수로 빠짐
+    key = lambda d: (START + timedelta(days=d)).strftime("%Y-%m-%dT%H:%M:%S")
+    store.append("KRW-BTC", [{"market": "KRW-BTC", "candle_date_time_utc": key(d), "trade_price": 1.0} for d in days],
+                 "days", covered=(START, START + timedelta(days=6)))
+
+    report = check_market(store, "KRW-BTC", "days")
+    epoch = int(START.timestamp())
+    assert report["missing"] == [(epoch + 3 * 86400, epoch + 4 * 86400)]
+    assert (report["missing_count"], report["held_count"]) == (1, 0)
+
+    requested = []
+    monkeypatch.setattr(candle_gaps, "refetch", lambda market, gaps, unit="days", **kw: requested.extend(gaps) or [])
+    repair(store, "KRW-BTC", "days")
+    assert requested == report["missing"]
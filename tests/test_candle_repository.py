@@ -0,0 +1,35 @@
+# candle_repository: 내보내기 파일을 단위별로 구분해서 읽는지 확인
+import json
+from datetime import datetime, timedelta, timezone
+
+from candle_repository import CandleRepository
+
+
+def _export(path, market, start, step, count):
+    candles = [{
+        "market": market,
+        "candle_date_time_utc": (start + step * i).strftime("%Y-%m-%dT%H:%M:%S"),
+        "trade_price": 100.0 + i,
+    } for i in range(count)]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(candles[::-1], f)  # 업비트 응답처럼 최신순
+    return candles
+
+
+def test_series_only_reads_exports_of_the_requested_unit(tmp_path):
+    start = datetime(2025, 9, 1, tzinfo=timezone.utc)
+    days = _export(tmp_path / "KRW-BTC_2025-09-10_10.json", "KRW-BTC", start, timedelta(days=1), 10)
+    days += _export(tmp_path / "KRW-BTC_days_20250911_20250915.json", "KRW-BTC",
+                    start + timedelta(days=10), timedelta(days=1), 5)
+    hours = _export(tmp_path / "KRW-BTC_minutes60_20250901_20250902.json", "KRW-BTC", start,
+                    timedelta(hours=1), 30)
+    weeks = _export(tmp_path / "KRW-BTC_weeks_20250901_20250929.json", "KRW-BTC", start, timedelta(weeks=1), 5)
+    _export(tmp_path / "KRW-ETH_2025-09-10_10.json", "KRW-ETH", start, timedelta(days=1), 10)
+    (tmp_path / "KRW-BTC_indicators.json").write_text('{"sma": []}', encoding="utf-8")  # indicators.py 출력
+
+    repo = CandleRepository(str(tmp_path))
+    assert repo.series("KRW-BTC", "days") == days
+    assert repo.series("KRW-BTC", "minutes/60") == hours
+    assert repo.series("KRW-BTC", "weeks") == weeks
+    assert repo.series("KRW-BTC", "minutes/1") == []
+    assert repo.json_units("KRW-BTC") == ["days", "minutes60", "weeks"]
@@ -0,0 +1,35 @@
+import json
+
+import numpy as np
+
+from chart_stream import ColumnarSink
+
+
+def test_columnar_promotes_int_column_on_first_fraction(tmp_path, monkeypatch):
+    monkeypatch.setattr(ColumnarSink, "FLUSH_ROWS", 2)
+    rows = [{"localDate": "20250101", "closePrice": 70000}, {"localDate": "20250102", "closePrice": 70100},
+            {"localDate": "20250103", "closePrice": 70200}, {"localDate": "20250106", "closePrice": 70250.5},
+            {"localDate": "20250107", "closePrice": 70300}]
+    with ColumnarSink(str(tmp_path)) as sink:
+        for row in rows:
+            sink.write(row)
+
+    schema = json.loads((tmp_path / "schema.json").read_text(encoding="utf-8"))
+    assert schema["columns"] == {"localDate": "int64", "closePrice": "float64"}
+    close = np.fromfile(tmp_path / "closePrice.bin", dtype="<f8")
+    assert close.tolist() == [70000.0, 70100.0, 70200.0, 70250.5, 70300.0]
+    assert np.fromfile(tmp_path / "localDate.bin", dtype="<i8").tolist()[-1] == 20250107
+
+
+def test_columnar_treats_blank_fields_as_missing(tmp_path):
+    rows = [{"localDate": "20250101", "closePrice": 70000, "foreignRetentionRate": ""},
+            {"localDate": "20250102", "closePrice": "", "foreignRetentionRate": 51.2},
+            {"localDate": "20250103", "closePrice": 70100.5, "foreignRetentionRate": " "}]
+    with ColumnarSink(str(tmp_path)) as sink:
+        for row in rows:
+            sink.write(row)
+
+    close = np.fromfile(tmp_path / "closePrice.bin", dtype="<f8")
+    assert close[0] == 70000.0 and np.isnan(close[1]) and close[2] == 70100.5  # 빈 값에서 float64로 바뀜
+    rate = np.fromfile(tmp_path / "foreignRetentionRate.bin", dtype="<f8")
+    assert np.isnan(rate[0]) and rate[1] == 51.2 and np.isnan(rate[2])
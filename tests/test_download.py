@@ -0,0 +1,30 @@
+# download: 한 지역의 연결 오류가 다른 지역 결과를 버리지 않는지 확인
+import requests
+
+import download
+
+
+class _Request:
+    def __init__(self, params):
+        self.params = params
+
+    def execute(self):
+        region, token = self.params["regionCode"], self.params.get("pageToken")
+        if region == "US" and token:
+            raise requests.ConnectionError("connection reset")  # 재시도 후에도 실패한 경우
+        return {"items": [{"id": f"{region}-{token or 1}"}], "nextPageToken": None if token else "2"}
+
+
+class _Videos:
+    def list(self, **params):
+        return _Request(params)
+
+
+def test_batch_returns_partial_results_on_transport_error(monkeypatch):
+    monkeypatch.setattr(download, "youtube_client", lambda api_key: (None, _Videos()))
+    result = download.get_trending_batch("key", ["KR", "US", "JP"], max_results=None, workers=3)
+    assert result == {
+        "KR": [{"id": "KR-1"}, {"id": "KR-2"}],
+        "US": [{"id": "US-1"}],  # 첫 페이지까지
+        "JP": [{"id": "JP-1"}, {"id": "JP-2"}],
+    }
@@ -0,0 +1,40 @@
+# enrich: 연결 오류로 중단돼도 이미 반영한 배치와 할당량 기록이 저장되는지 확인
+import json
+
+import requests
+
+import enrich
+
+
+class _Request:
+    def __init__(self, ids):
+        self.ids = ids
+
+    def execute(self):
+        if "v60" in self.ids:
+            raise requests.ConnectionError("connection reset")
+        return {"items": [{"id": i, "statistics": {"viewCount": "100"}, "contentDetails": {"duration": "PT1M"}}
+                          for i in self.ids]}
+
+
+class _Videos:
+    def list(self, id, **params):
+        return _Request(id.split(","))
+
+
+def test_refresh_saves_each_batch_before_transport_error(tmp_path, monkeypatch):
+    monkeypatch.setattr(enrich, "youtube_client", lambda api_key: (None, _Videos()))
+    watchlist = enrich.Watchlist(str(tmp_path))
+    now = 1_760_000_000
+    for n in range(100):
+        watchlist.videos[f"v{n}"] = {"published": now - 3600, "first_seen": now, "last_seen": now,
+                                     "refreshed": 0, "views": 0, "likes": 0, "comments": 0, "duration": -1,
+                                     "velocity": float(1000 - n), "gone": False}
+    ledger = enrich.QuotaLedger(str(tmp_path / "quota.json"), budget=10)
+
+    result = enrich.refresh("key", watchlist, ledger, now=now)
+
+    assert result["calls"] == 1 and ledger.used == 2
+    saved = json.loads((tmp_path / "watchlist.json").read_text(encoding="utf-8"))["videos"]
+    assert sum(1 for v in saved.values() if v["refreshed"] == now) == 50
+    assert len((tmp_path / "stats.ndjson").read_text(encoding="utf-8").splitlines()) == 50
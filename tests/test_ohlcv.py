@@ -0,0 +1,30 @@
+# ohlcv: OhlcvSeries.arrays()를 indicators.compute_all에 바로 넘길 수 있는지 확인
+import json
+import os
+
+import numpy as np
+
+from indicators import compute_all
+from ohlcv import OhlcvSeries
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_naver_series_arrays_work_with_compute_all():
+    with open(os.path.join(ROOT, "Project2", "response_data.json"), "r", encoding="utf-8") as f:
+        data = json.load(f)
+    series = OhlcvSeries.from_naver(data["priceInfos"])
+    arrays = series.arrays()
+    np.testing.assert_allclose(arrays["value"], series.close.astype(np.float64) * series.volume)
+    result = compute_all(arrays)
+    assert "vwap" in result
+
+
+def test_upbit_series_keeps_traded_value():
+    with open(os.path.join(ROOT, "Project1", "coin-chart-app", "public", "KRW-BTC_2025-09-24_100.json"),
+              "r", encoding="utf-8") as f:
+        candles = json.load(f)
+    series = OhlcvSeries.from_upbit(candles)
+    arrays = series.arrays()
+    assert arrays["value"] is series.extra["value"]
+    assert "vwap" in compute_all(arrays)
@@ -0,0 +1,56 @@
+# request_to_json: 배치/스트리밍 모드 모두 이력에 병합하고, 이력을 켜면 차트 JSON 전체를 다시 쓰지 않는지 확인
+import json
+import os
+
+from naver_history import NaverHistory
+from request_to_json import fetch_batch
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+with open(os.path.join(ROOT, "Project2", "response_data.json"), "rb") as f:
+    BODY = f.read()
+
+
+class _Response:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return json.loads(BODY)
+
+    def iter_content(self, size):
+        for i in range(0, len(BODY), 1000):  # 레코드 중간에서 끊기는 조각
+            yield BODY[i:i + 1000]
+
+
+class _Session:
+    def get(self, url, **kwargs):
+        return _Response()
+
+
+def test_batch_mode_merges_without_rewriting_chart(tmp_path):
+    history = NaverHistory(str(tmp_path / "history"))
+    out = tmp_path / "charts"
+    results = fetch_batch(["005930"], ["day"], str(out), workers=1, history=history, session=_Session())
+    assert results[("005930", "dayCandle")] == history.data_path("005930", "dayCandle")
+    assert not out.exists()
+    assert history.load("005930", "dayCandle") == sorted(json.loads(BODY)["priceInfos"], key=lambda r: r["localDate"])
+    # 다시 실행해도 바뀐 행이 없으면 아무것도 덧붙이지 않음
+    size = os.path.getsize(history.data_path("005930", "dayCandle"))
+    fetch_batch(["005930"], ["day"], str(out), workers=1, history=history, session=_Session())
+    assert os.path.getsize(history.data_path("005930", "dayCandle")) == size
+
+
+def test_stream_mode_merges_into_history(tmp_path):
+    history = NaverHistory(str(tmp_path / "history"))
+    out = tmp_path / "charts"
+    fetch_batch(["005930"], ["day"], str(out), workers=1, stream="ndjson", history=history, session=_Session())
+    expected = json.loads(BODY)["priceInfos"]
+    with open(out / "005930_dayCandle.ndjson", "r", encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == expected
+    assert history.load("005930", "dayCandle") == sorted(expected, key=lambda r: r["localDate"])
@@ -0,0 +1,97 @@
+# returns_matrix: update()가 항상 build()와 같은 행렬을 만드는지 확인
+import numpy as np
+
+from naver_history import NaverHistory
+from returns_matrix import ReturnsMatrix
+
+DATES = [20250901 + i for i in range(10)]
+PRICES = [100.0, 101.0, 99.5, 102.0, 104.0, 103.0, 107.0, 106.5, 108.0, 110.0]
+
+
+def _rows(dates):
+    return [{"localDate": str(d), "closePrice": PRICES[DATES.index(d)]} for d in dates]
+
+
+def _assert_same(a: ReturnsMatrix, b: ReturnsMatrix):
+    assert a.meta["dates"] == b.meta["dates"]
+    assert a.meta["last_close"] == b.meta["last_close"]
+    assert a.meta["last_date"] == b.meta["last_date"]
+    np.testing.assert_array_equal(np.asarray(a.returns), np.asarray(b.returns))
+    np.testing.assert_array_equal(np.asarray(a.close), np.asarray(b.close))
+
+
+def test_update_appends_new_dates_like_build(tmp_path):
+    history = NaverHistory(str(tmp_path / "history"))
+    history.merge("A", "dayCandle", _rows(DATES[:6]))
+    history.merge("B", "dayCandle", _rows(DATES[:6]))
+    matrix = ReturnsMatrix(str(tmp_path / "matrix"))
+    matrix.build(history, ["A", "B"])
+
+    history.merge("A", "dayCandle", _rows(DATES[6:]))
+    history.merge("B", "dayCandle", _rows(DATES[6:]))
+    assert matrix.update(history) == 4
+
+    full = ReturnsMatrix(str(tmp_path / "full"))
+    full.build(history, ["A", "B"])
+    _assert_same(matrix, full)
+
+
+def test_update_with_backfilled_ticker_matches_build(tmp_path):
+    history = NaverHistory(str(tmp_path / "history"))
+    history.merge("A", "dayCandle", _rows(DATES[:8]))
+    history.merge("B", "dayCandle", _rows(DATES[:5]))  # B 이력이 늦음
+    matrix = ReturnsMatrix(str(tmp_path / "matrix"))
+    matrix.build(history, ["A", "B"])
+
+    # B의 빠진 날짜가 나중에 도착하고, 두 종목 모두 새 날짜가 생김
+    history.merge("A", "dayCandle", _rows(DATES[8:]))
+    history.merge("B", "dayCandle", _rows(DATES[5:]))
+    assert matrix.update(history) == 2
+
+    full = ReturnsMatrix(str(tmp_path / "full"))
+    full.build(history, ["A", "B"])
+    _assert_same(matrix, full)
+    # 같은 가격 계열이므로 수익률도 완전히 같아야 함
+    np.testing.assert_array_equal(np.asarray(matrix.returns)[:, 0], np.asarray(matrix.returns)[:, 1])
+    assert np.isclose(matrix.correlation(window=10, min_periods=5)[0, 1], 1.0)
+
+
+def test_update_with_lagging_ticker_matches_build(tmp_path):
+    history = NaverHistory(str(tmp_path / "history"))
+    history.merge("A", "dayCandle", _rows(DATES[:6]))
+    history.merge("B", "dayCandle", _rows(DATES[:4]))
+    matrix = ReturnsMatrix(str(tmp_path / "matrix"))
+    matrix.build(history, ["A", "B"])
+
+    # B는 여전히 중간 날짜가 빠진 채 새 날짜만 생김 → 빈 칸은 NaN, 다음 수익률은 직전 종가 기준
+    history.merge("A", "dayCandle", _rows(DATES[6:]))
+    history.merge("B", "dayCandle", _rows(DATES[7:]))
+    assert matrix.update(history) == 4
+
+    full = ReturnsMatrix(str(tmp_path / "full"))
+    full.build(history, ["A", "B"])
+    _assert_same(matrix, full)
+
+
+def test_update_applies_revised_last_close(tmp_path):
+    history = NaverHistory(str(tmp_path / "history"))
+    history.merge("A", "dayCandle", _rows(DATES[:6]))
+    history.merge("B", "dayCandle", _rows(DATES[:6]))
+    matrix = ReturnsMatrix(str(tmp_path / "matrix"))
+    matrix.build(history, ["A", "B"])
+
+    # 장중에 읽은 마지막 일봉의 종가가 확정되며 바뀜 (B는 새 날짜 없이 값만 바뀜)
+    history.merge("A", "dayCandle", [{"localDate": str(DATES[5]), "closePrice": 103.7}] + _rows(DATES[6:8]))
+    history.merge("B", "dayCandle", [{"localDate": str(DATES[5]), "closePrice": 102.9}])
+    assert matrix.update(history) == 2
+
+    full = ReturnsMatrix(str(tmp_path / "full"))
+    full.build(history, ["A", "B"])
+    _assert_same(matrix, full)
+    assert matrix.meta["read"] == full.meta["read"]
+
+    # 마지막 행보다 앞 행이 바뀌면 다시 만들어서 같은 결과
+    history.merge("A", "dayCandle", [{"localDate": str(DATES[2]), "closePrice": 98.0}])
+    assert matrix.update(history) == 0
+    full.build(history, ["A", "B"])
+    _assert_same(matrix, full)
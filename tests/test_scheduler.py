@@ -0,0 +1,21 @@
+import threading
+
+from scheduler import Scheduler
+
+
+def test_full_source_does_not_starve_other_sources():
+    scheduler = Scheduler(workers=2)
+    scheduler.add_source("slow", interval=60, concurrency=1)
+    scheduler.add_source("fast", interval=60, concurrency=1)
+    release = threading.Event()
+    try:
+        blocked = [scheduler.fetch(f"slow:{i}", release.wait, "slow") for i in range(3)]
+        # slow는 1개만 풀에서 실행되고 나머지는 대기열에 있어야 fast가 남은 스레드를 씀
+        assert scheduler.fetch("fast:0", lambda: "ok", "fast").result(timeout=2) == "ok"
+        assert scheduler.sources["slow"].snapshot()["queued"] == 2
+    finally:
+        release.set()
+    assert all(f.result(timeout=2) for f in blocked)
+    slow = scheduler.sources["slow"]
+    assert (slow.running, slow.in_flight, len(slow.waiting)) == (0, 0, 0)
+    scheduler.stop()
@@ -0,0 +1,26 @@
+# trending_archive: 같은 지역에 두 인스턴스(프로세스)가 번갈아 써도 사전 코드가 겹치지 않는지 확인
+import json
+
+from trending_archive import TrendingArchive
+
+
+def _item(video, channel, published="2025-10-01T00:00:00Z"):
+    return {"id": video, "title": video.upper(), "channelTitle": channel, "publishedAt": published,
+            "viewCount": "10", "likeCount": "1", "commentCount": "0", "duration": "PT1M"}
+
+
+def test_two_writers_share_dictionaries(tmp_path):
+    first, second = TrendingArchive(str(tmp_path)), TrendingArchive(str(tmp_path))
+    first.append("KR", [_item("a", "ch1"), _item("b", "ch2")], "2025-10-01T00:00:00Z")
+    second.append("KR", [_item("c", "ch3"), _item("a", "ch1")], "2025-10-01T01:00:00Z")
+    first.append("KR", [_item("d", "ch4"), _item("c", "ch3", published=None)], "2025-10-01T02:00:00Z")
+
+    table = first.load("KR")
+    records = table.to_records(slice(None))
+    assert [(r["id"], r["channelTitle"]) for r in records] == [
+        ("a", "ch1"), ("b", "ch2"), ("c", "ch3"), ("a", "ch1"), ("d", "ch4"), ("c", "ch3")]
+    assert records[0]["publishedAt"] == "2025-10-01T00:00:00Z"
+    assert records[-1]["publishedAt"] is None
+
+    lines = (tmp_path / "KR" / "channels.ndjson").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == ["ch1", "ch2", "ch3", "ch4"]
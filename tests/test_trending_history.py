@@ -0,0 +1,67 @@
+# trending_history: append가 중간에 끊겨도 인덱스에 있는 스냅샷만 읽는지 확인
+import json
+
+from trending_history import TrendingHistory
+
+
+def _items(*ids, views=100):
+    return [{"id": video_id, "viewCount": str(views), "likeCount": "1", "publishedAt": "2025-10-01T00:00:00Z"}
+            for video_id in ids]
+
+
+def _crash_after_data_write(history, region, ts, items):
+    """데이터 줄만 쓰고 인덱스/diff를 쓰기 전에 끊긴 append."""
+    with open(history.data_path(region), "ab") as f:
+        f.write((json.dumps({"ts": ts, "items": items}) + "\n").encode("utf-8"))
+
+
+def test_snapshots_skip_unindexed_lines(tmp_path):
+    root = str(tmp_path)
+    history = TrendingHistory(root)
+    history.append("KR", _items("a", "b", "c"), "2025-10-14T00:00:00Z")
+    history.append("KR", _items("b", "a", "c"), "2025-10-14T01:00:00Z")
+    _crash_after_data_write(history, "KR", "2025-10-14T02:00:00Z", _items("x", "y", "z"))
+
+    # 다시 열었을 때: 끊긴 줄은 보이지 않음
+    reopened = TrendingHistory(root)
+    assert [ts for ts, _ in reopened.snapshots("KR")] == ["2025-10-14T00:00:00Z", "2025-10-14T01:00:00Z"]
+    assert reopened.last("KR")[0] == "2025-10-14T01:00:00Z"
+
+    # 그 뒤 정상 append: 끊긴 줄을 건너뛰고 새 스냅샷이 마지막
+    diff = reopened.append("KR", _items("c", "b", "a", views=200), "2025-10-14T03:00:00Z")
+    assert diff["prev_ts"] == "2025-10-14T01:00:00Z"
+    assert [(ts, [v["id"] for v in items]) for ts, items in TrendingHistory(root).snapshots("KR")] == [
+        ("2025-10-14T00:00:00Z", ["a", "b", "c"]),
+        ("2025-10-14T01:00:00Z", ["b", "a", "c"]),
+        ("2025-10-14T03:00:00Z", ["c", "b", "a"]),
+    ]
+    assert [ts for ts, _ in TrendingHistory(root).snapshots("KR", start="2025-10-14T01:00:00Z")] == [
+        "2025-10-14T01:00:00Z", "2025-10-14T03:00:00Z"]
+
+
+def test_latest_diff_recomputed_when_diff_write_was_lost(tmp_path):
+    root = str(tmp_path)
+    history = TrendingHistory(root)
+    history.append("KR", _items("a", "b"), "2025-10-14T00:00:00Z")
+    expected = history.append("KR", _items("b", "a", views=300), "2025-10-14T02:00:00Z")
+    # 인덱스까지 쓰고 diff 줄을 쓰기 전에 끊긴 경우
+    with open(history.diff_path("KR"), "rb") as f:
+        lines = f.read().splitlines(keepends=True)
+    with open(history.diff_path("KR"), "wb") as f:
+        f.writelines(lines[:-1])
+    assert TrendingHistory(root).latest_diff("KR") == expected
+
+
+def test_torn_index_line_does_not_swallow_next_entry(tmp_path):
+    root = str(tmp_path)
+    history = TrendingHistory(root)
+    history.append("KR", _items("a"), "2025-10-14T00:00:00Z")
+    _crash_after_data_write(history, "KR", "2025-10-14T01:00:00Z", _items("x"))
+    with open(history.index_path("KR"), "a", encoding="utf-8") as f:
+        f.write("2025-10-14T01:00:00Z\t1")  # 인덱스 줄도 쓰다 끊김
+
+    reopened = TrendingHistory(root)
+    assert reopened.last("KR")[0] == "2025-10-14T00:00:00Z"
+    reopened.append("KR", _items("b"), "2025-10-14T02:00:00Z")
+    assert [(ts, items[0]["id"]) for ts, items in TrendingHistory(root).snapshots("KR")] == [
+        ("2025-10-14T00:00:00Z", "a"), ("2025-10-14T02:00:00Z", "b")]
@@ -0,0 +1,29 @@
+# upbit_ws: 핸드셰이크 시간 초과는 종료가 아니라 재연결 대상인지 확인
+import asyncio
+
+import pytest
+
+import upbit_ws
+
+
+class _Stop(Exception):
+    pass
+
+
+def test_handshake_timeout_reconnects_without_deadline(monkeypatch):
+    attempts = []
+
+    def connect(url, **kwargs):
+        attempts.append(url)
+        if len(attempts) == 3:
+            raise _Stop
+        raise TimeoutError("timed out during opening handshake")
+
+    async def no_sleep(seconds):
+        pass
+
+    monkeypatch.setattr(upbit_ws.websockets, "connect", connect)
+    monkeypatch.setattr(upbit_ws.asyncio, "sleep", no_sleep)
+    with pytest.raises(_Stop):
+        asyncio.run(upbit_ws.ingest(["KRW-BTC"], upbit_ws.CandleBuilder(), url="ws://127.0.0.1:1"))
+    assert len(attempts) == 3